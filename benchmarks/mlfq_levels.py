@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""Benchmark the MLFQ level selection with many priority levels.
+
+Compares the bitmap level selection of :class:`~schedsi.schedulers.MLFQ`
+to scanning the levels for the first non-empty ready queue.
+"""
+
+import sys
+import time
+from schedsi import schedulers, sweep, threads
+from schedsi.util import hierarchy_builder
+
+#: The numbers of levels to benchmark
+LEVELS = [8, 64, 140]
+
+#: The number of threads in the benchmarked module
+THREADS = 200
+
+#: The simulated time of each run
+UNTIL = 20000
+
+#: The number of runs per measurement, of which the fastest counts
+REPEAT = 3
+
+
+class ScanMLFQ(schedulers.MLFQ):
+    """:class:`~schedsi.schedulers.MLFQ` scanning the levels for the first ready queue."""
+
+    @staticmethod
+    def _highest_level(rcu_data):
+        """See :meth:`MLFQ._highest_level <schedsi.schedulers.MLFQ._highest_level>`."""
+        return next((level for level, queue in enumerate(rcu_data.ready_queues) if queue), 0)
+
+
+def make_kernel(scheduler, levels):
+    """Create a kernel with a `scheduler` MLFQ of `levels` levels.
+
+    Most threads are CPU-bound and sink to the lowest levels,
+    the others do short periodic bursts and stay on the top levels.
+    """
+    kernel = hierarchy_builder.ModuleBuilder(scheduler=scheduler.builder(
+        level_time_slices=[1 + level // 8 for level in range(0, levels)],
+        priority_boost_time=UNTIL // 4))
+    for idx in range(0, THREADS):
+        if idx % 4:
+            kernel.add_thread(threads.Thread)
+        else:
+            kernel.add_thread(threads.PeriodicWorkThread, ready_time=idx, units=None,
+                              period=THREADS, burst=1)
+    return kernel.module
+
+
+def run(scheduler, levels):
+    """Run the benchmark for a `scheduler` with `levels` levels.
+
+    Returns a tuple (fastest run time in seconds, :class:`~schedsi.sweep.Result`).
+    """
+    times = []
+    for _ in range(0, REPEAT):
+        start = time.perf_counter()
+        result = sweep.run_point(make_kernel, {'scheduler': scheduler, 'levels': levels}, UNTIL,
+                                 local_timer_scheduling=True)
+        times.append(time.perf_counter() - start)
+    return min(times), result
+
+
+def main():
+    """Run the benchmark and print the run times."""
+    print('levels', 'bitmap', 'scan', sep='\t')
+    for levels in LEVELS:
+        bitmap_time, bitmap_result = run(schedulers.MLFQ, levels)
+        scan_time, scan_result = run(ScanMLFQ, levels)
+        if bitmap_result.threads != scan_result.threads:
+            print('Results differ for', levels, 'levels.', file=sys.stderr)
+            sys.exit(1)
+        print(levels, '{:.3f}s'.format(bitmap_time), '{:.3f}s'.format(scan_time), sep='\t')
+
+
+if __name__ == '__main__':
+    main()
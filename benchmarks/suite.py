@@ -0,0 +1,396 @@
+#!/usr/bin/env python3
+"""Benchmark the simulator throughput on generated hierarchies.
+
+Each case simulates a generated :class:`~schedsi.module.Module`-hierarchy
+(see :class:`Workload`) with one of the :data:`SCHEDULERS` in every module.
+The simulated events (everything that is logged) are counted
+and reported per second of wall time, together with the peak RSS of the process.
+Each case runs in a fresh process, so the peak RSS is not skewed by earlier cases.
+
+The results are compared against the baselines stored in :data:`BASELINE_FILE`.
+A case regresses if its throughput drops or its peak RSS grows by more than :data:`TOLERANCE`.
+A changed number of events means the simulation itself behaves differently.
+Cases that fail are recorded as such, so only new failures count as regression.
+The cases in :data:`EXCLUDED` are known to fail and are not run.
+Baselines are machine-specific, so they should be re-generated (with `--save`)
+on the machine the benchmarks are compared on.
+
+Usage::
+
+    PYTHONPATH=. benchmarks/suite.py [--save] [--scale=FACTOR] [--repeat=COUNT] [PATTERN...]
+
+Only cases whose name contains one of the `PATTERN`\\ s are run.
+`--scale` multiplies the number of threads per module.
+"""
+
+import collections
+import json
+import multiprocessing
+import os
+import random
+import sys
+import time
+import traceback
+from schedsi import schedulers, threads, world
+from schedsi.util import hierarchy_builder
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+#: The file the baselines are stored in
+BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+
+#: The relative change of throughput or peak RSS that counts as regression
+TOLERANCE = 0.4
+
+#: The number of runs per case, of which the fastest counts
+REPEAT = 3
+
+#: The seed for the random thread parameters
+SEED = 0
+
+PRR = schedulers.addons.Penalizer.attach('PRR', schedulers.RoundRobin)
+PCFS = schedulers.addons.Penalizer.attach('PCFS', schedulers.CFS)
+MRR = schedulers.addons.TimeSliceMaxer.attach('MRR', schedulers.RoundRobin)
+MMLFQ = schedulers.addons.TimeSliceMaxer.attach('MMLFQ', schedulers.MLFQ)
+FSJF = schedulers.addons.TimeSliceFixer.attach('FSJF', schedulers.SJF)
+
+#: The benchmarked schedulers
+#:
+#: Maps a name to a function returning the scheduler builder.
+SCHEDULERS = collections.OrderedDict([
+    ('FCFS', schedulers.FCFS.builder),
+    ('RR', lambda: schedulers.RoundRobin.builder(time_slice=10)),
+    ('MLFQ', lambda: schedulers.MLFQ.builder(level_time_slices=[5, 10, 20, 40],
+                                             priority_boost_time=500)),
+    ('CFS', lambda: schedulers.CFS.builder(default_shares=400, min_period=30, min_slice=6)),
+    ('SJF', schedulers.SJF.builder),
+    ('PSJF', schedulers.PSJF.builder),
+    ('PRR', lambda: PRR.builder(time_slice=10)),
+    ('PCFS', lambda: PCFS.builder(default_shares=400, min_period=30, min_slice=6)),
+    ('MRR', lambda: MRR.builder(time_slice=10, override_time_slice=8)),
+    ('MMLFQ', lambda: MMLFQ.builder(level_time_slices=[5, 10, 20, 40],
+                                    priority_boost_time=500)),
+    ('FSJF', lambda: FSJF.builder(override_time_slice=10)),
+])
+
+#: The schedulers without a time-slice
+#:
+#: They run a thread until it blocks or finishes, so a periodic thread with infinite work
+#: would keep all the threads behind it waiting.
+#: Their periodic threads get a finite number of bursts instead.
+FINITE_WORK_SCHEDULERS = frozenset(['FCFS', 'SJF', 'PSJF'])
+
+#: The schedulers that cannot schedule the kernel
+#:
+#: The addons block threads by yielding to the parent, which the kernel cannot do.
+#: The generated hierarchy is instead put into a child-module
+#: of a kernel with the scheduler this maps to.
+PARENT_SCHEDULERS = {'PRR': 'RR', 'PCFS': 'CFS', 'MRR': 'RR', 'MMLFQ': 'MLFQ', 'FSJF': 'SJF'}
+
+#: The cases that are not run, mapped to the reason
+#:
+#: Both fail ``assert last_chain`` in :meth:`Penalizer.start_schedule
+#: <schedsi.schedulers.addons.penalizer.Penalizer.start_schedule>`:
+#: a thread sits out, and the scheduler starts the next schedule without a previous chain.
+EXCLUDED = {
+    'PRR/deep': 'the Penalizer loses track of a sat-out thread in nested modules',
+    'PCFS/deep': 'the Penalizer loses track of a sat-out thread in nested modules',
+}
+
+#: The parameters of a generated hierarchy
+#:
+#: `threads` is the number of threads per module,
+#: `depth` the number of module levels below the kernel
+#: and `fanout` the number of children of each non-leaf module.
+#: `periodic` is the fraction of threads doing periodic bursts,
+#: the others are batch threads with a fixed amount of work.
+#: If `spawn` is set, the modules below the kernel are created during the
+#: simulation by :class:`~schedsi.util.hierarchy_builder.ModuleBuilderThread`\\ s.
+#: `until` is the simulated time.
+Workload = collections.namedtuple('Workload',
+                                  ['threads', 'depth', 'fanout', 'periodic', 'spawn', 'until'])
+
+#: The benchmarked workloads
+WORKLOADS = collections.OrderedDict([
+    ('flat', Workload(threads=400, depth=0, fanout=0, periodic=0.5, spawn=False, until=20000)),
+    ('batch', Workload(threads=400, depth=0, fanout=0, periodic=0.1, spawn=False, until=20000)),
+    ('wide', Workload(threads=25, depth=1, fanout=16, periodic=0.5, spawn=False, until=20000)),
+    ('deep', Workload(threads=10, depth=4, fanout=2, periodic=0.5, spawn=False, until=20000)),
+    ('spawn', Workload(threads=20, depth=2, fanout=3, periodic=0.5, spawn=True, until=20000)),
+])
+
+#: The result of a case
+#:
+#: `events` is the number of simulated events,
+#: `seconds` the wall time of the fastest run
+#: and `peak_rss` the peak resident set size in KiB (`None` if unknown).
+#: `error` is the traceback of a failed case, which has no other results,
+#: and is `None` otherwise.
+Result = collections.namedtuple('Result', ['events', 'seconds', 'peak_rss', 'error'])
+
+
+class _CountingLog:
+    """Log that only counts the events."""
+
+    def __init__(self):
+        """Create a :class:`_CountingLog`."""
+        self.events = 0
+
+    def init_core(self, cpu):
+        """Register a :class:`Core`."""
+        pass
+
+    def context_switch(self, cpu, split_index, appendix, time):
+        """Count a context switch event."""
+        self.events += 1
+
+    def thread_execute(self, cpu, runtime):
+        """Count a thread execution event."""
+        self.events += 1
+
+    def thread_yield(self, cpu):
+        """Count a thread yield event."""
+        self.events += 1
+
+    def cpu_idle(self, cpu, idle_time):
+        """Count a CPU idle event."""
+        self.events += 1
+
+    def timer_interrupt(self, cpu, idx, delay):
+        """Count a timer interrupt event."""
+        self.events += 1
+
+    def thread_statistics(self, stats):
+        """Log thread statistics."""
+        pass
+
+    def cpu_statistics(self, stats):
+        """Log CPU statistics."""
+        pass
+
+
+def _add_threads(builder, workload, rng, finite):
+    """Add the threads of a module to `builder`.
+
+    Batch threads have a fixed amount of work.
+    If `finite` is set, periodic threads do too (see :data:`FINITE_WORK_SCHEDULERS`).
+    """
+    for _ in range(0, workload.threads):
+        if rng.random() < workload.periodic:
+            period = rng.randrange(50, 500)
+            ready_time = rng.randrange(period)
+            burst = rng.randrange(1, 8)
+            units = burst * rng.randrange(2, 10) if finite else None
+            builder.add_thread(threads.PeriodicWorkThread, ready_time=ready_time,
+                               units=units, period=period, burst=burst)
+        else:
+            builder.add_thread(threads.Thread, ready_time=rng.randrange(workload.until // 2),
+                               units=rng.randrange(10, 200))
+
+
+def _add_modules(builder, workload, scheduler, rng, depth, finite):
+    """Add the threads and the child-modules `depth` levels deep to `builder`.
+
+    See :func:`_add_threads` for `finite`.
+    """
+    _add_threads(builder, workload, rng, finite)
+    if depth == 0:
+        return
+    for _ in range(0, workload.fanout):
+        if isinstance(builder, hierarchy_builder.ModuleBuilderThread):
+            child = builder.add_module(scheduler=scheduler())
+        elif workload.spawn:
+            child = hierarchy_builder.ModuleBuilderThread(builder.module, time=rng.randrange(100),
+                                                          scheduler=scheduler())
+        else:
+            child = builder.add_module(scheduler=scheduler())
+        _add_modules(child, workload, scheduler, rng, depth - 1, finite)
+    if isinstance(builder, hierarchy_builder.ModuleBuilder):
+        builder.add_vcpus()
+
+
+def make_kernel(scheduler_name, workload, seed=SEED):
+    """Create the kernel :class:`~schedsi.module.Module` of `workload`.
+
+    `scheduler_name` is the name of the scheduler in :data:`SCHEDULERS`.
+    """
+    scheduler = SCHEDULERS[scheduler_name]
+    parent_scheduler_name = PARENT_SCHEDULERS.get(scheduler_name)
+    if parent_scheduler_name is None:
+        kernel = top = hierarchy_builder.ModuleBuilder(scheduler=scheduler())
+    else:
+        kernel = hierarchy_builder.ModuleBuilder(scheduler=SCHEDULERS[parent_scheduler_name]())
+        top = kernel.add_module(scheduler=scheduler())
+    finite = scheduler_name in FINITE_WORK_SCHEDULERS
+    _add_modules(top, workload, scheduler, random.Random(seed), workload.depth, finite)
+    if finite:
+        # the kernel cannot idle without a timer once all threads finished,
+        # so it waits for this thread, which ends the simulation
+        kernel.add_thread(threads.Thread, ready_time=workload.until, units=1)
+    kernel.add_vcpus()
+    return kernel.module
+
+
+def scaled(workload, scale):
+    """Return `workload` with the threads per module multiplied by `scale`."""
+    return workload._replace(threads=max(1, round(workload.threads * scale)))
+
+
+def _run_once(scheduler_name, workload):
+    """Run `workload` with the scheduler `scheduler_name` once.
+
+    Returns a tuple (number of events, wall time in seconds).
+    """
+    kernel = make_kernel(scheduler_name, workload)
+    counting_log = _CountingLog()
+    start = time.perf_counter()
+    the_world = world.World(1, kernel, counting_log, local_timer_scheduling=True)
+    the_world.run_until(workload.until)
+    return counting_log.events, time.perf_counter() - start
+
+
+def run_case(scheduler_name, workload, repeat=REPEAT):
+    """Run `workload` with the scheduler `scheduler_name`.
+
+    Returns a :class:`Result`.
+    """
+    events, seconds = zip(*(_run_once(scheduler_name, workload) for _ in range(0, repeat)))
+    assert len(set(events)) == 1, 'Simulation is not deterministic.'
+    peak_rss = None
+    if resource is not None:
+        peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        if sys.platform == 'darwin':
+            peak_rss //= 1024
+    return Result(events[0], min(seconds), peak_rss, None)
+
+
+def _run_isolated(args):
+    """Call :func:`run_case` with the tuple `args`.
+
+    This is run in a fresh worker process per case.
+    Exceptions are returned as failed :class:`Result`, with the traceback as error.
+    """
+    try:
+        return run_case(*args)
+    except Exception:  # pylint: disable=broad-except
+        return Result(None, None, None, traceback.format_exc())
+
+
+def cases(patterns=(), scale=1):
+    """Return a list of (name, scheduler name, :class:`Workload`) of the cases to run.
+
+    Only cases whose name contains one of the `patterns` are included,
+    or all if there are none.
+    """
+    all_cases = [(scheduler_name + '/' + workload_name, scheduler_name, scaled(workload, scale))
+                 for workload_name, workload in WORKLOADS.items()
+                 for scheduler_name in SCHEDULERS]
+    if scale != 1:
+        all_cases = [(name + '*' + str(scale), *case) for name, *case in all_cases]
+    return [case for case in all_cases
+            if not patterns or any(pattern in case[0] for pattern in patterns)]
+
+
+def load_baselines(filename=BASELINE_FILE):
+    """Return the stored baselines as a `dict` from case name to :class:`Result`."""
+    try:
+        with open(filename) as baseline_file:
+            return {name: Result(**result) for name, result in json.load(baseline_file).items()}
+    except FileNotFoundError:
+        return {}
+
+
+def save_baselines(baselines, filename=BASELINE_FILE):
+    """Store the `baselines`, a `dict` from case name to :class:`Result`."""
+    with open(filename, 'w') as baseline_file:
+        json.dump({name: result._asdict() for name, result in sorted(baselines.items())},
+                  baseline_file, indent=1, sort_keys=True)
+        baseline_file.write('\n')
+
+
+def compare(result, baseline, tolerance=TOLERANCE):
+    """Compare `result` to the `baseline`.
+
+    Returns a list of the problems found, which is empty if there are none.
+    """
+    if result.error is not None:
+        return [] if baseline.error is not None else ['failed']
+    if baseline.error is not None:
+        return []
+    problems = []
+    if result.events != baseline.events:
+        problems.append('events changed from {}'.format(baseline.events))
+    throughput = result.events / result.seconds
+    baseline_throughput = baseline.events / baseline.seconds
+    if throughput < baseline_throughput * (1 - tolerance):
+        problems.append('throughput dropped from {:.0f}/s'.format(baseline_throughput))
+    if result.peak_rss is not None and baseline.peak_rss is not None \
+       and result.peak_rss > baseline.peak_rss * (1 + tolerance):
+        problems.append('peak RSS grew from {}KiB'.format(baseline.peak_rss))
+    return problems
+
+
+def _usage():
+    """Print usage and exit with error."""
+    print('Usage:', sys.argv[0], '[--save] [--scale=FACTOR] [--repeat=COUNT] [PATTERN...]',
+          file=sys.stderr)
+    sys.exit(1)
+
+
+def main():
+    """Run the benchmarks, print the results and compare them against the baselines.
+
+    Exits with an error if a case regressed.
+    """
+    save = False
+    scale = 1
+    repeat = REPEAT
+    patterns = []
+    for arg in sys.argv[1:]:
+        if arg == '--save':
+            save = True
+        elif arg.startswith('--scale='):
+            scale = float(arg[len('--scale='):])
+            if scale.is_integer():
+                scale = int(scale)
+        elif arg.startswith('--repeat='):
+            repeat = int(arg[len('--repeat='):])
+        elif arg.startswith('-'):
+            _usage()
+        else:
+            patterns.append(arg)
+
+    baselines = load_baselines()
+    regressions = 0
+    print('case', 'events', 'events/s', 'peak RSS', sep='\t')
+    for name, scheduler_name, workload in cases(patterns, scale):
+        reason = EXCLUDED.get(name.partition('*')[0])
+        if reason is not None:
+            print(name, '-', '-', '-', 'excluded: ' + reason, sep='\t')
+            continue
+        with multiprocessing.Pool(1, maxtasksperchild=1) as pool:
+            result = pool.apply(_run_isolated, ((scheduler_name, workload, repeat),))
+        problems = compare(result, baselines[name]) if name in baselines else []
+        regressions += bool(problems)
+        if result.error is None:
+            print(name, result.events, '{:.0f}'.format(result.events / result.seconds),
+                  '{}KiB'.format(result.peak_rss), '; '.join(problems), sep='\t')
+        else:
+            error = result.error.rstrip().splitlines()[-1]
+            print(name, '-', '-', '-', '; '.join(problems + [error]), sep='\t')
+            print(result.error, file=sys.stderr)
+        if save:
+            baselines[name] = result
+
+    if save:
+        save_baselines(baselines)
+    elif regressions:
+        print(regressions, 'case(s) regressed.', file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
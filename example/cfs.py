@@ -7,21 +7,31 @@ from schedsi import schedulers, threads, world
 from schedsi.log import binarylog
 from schedsi.util import hierarchy_builder
 
-KERNEL = hierarchy_builder.ModuleBuilder(scheduler=schedulers.CFS.builder(default_shares=400,
-                                                                          min_period=30,
-                                                                          min_slice=6,
-                                                                          time_slice=None))
-
-KERNEL.add_thread(threads.Thread, {'shares': 1000}) \
-      .add_thread(threads.PeriodicWorkThread, {'shares': 250},
-                  ready_time=5, units=256, period=160, burst=4) \
-      .add_thread(threads.PeriodicWorkThread, {'shares': 250},
-                  ready_time=25, units=256, period=160, burst=4) \
-      .add_thread(threads.PeriodicWorkThread, {'shares': 250},
-                  ready_time=500, units=20, period=160, burst=4) \
-      .add_thread(threads.Thread, {'shares': 1600}) \
-      .add_thread(threads.Thread, {'shares': 100}) \
-      .add_thread(threads.Thread, {'shares': 100})
+
+def build_kernel(*, default_shares=400, min_period=30, min_slice=6):
+    """Build the hierarchy with the specified CFS parameters.
+
+    Returns the kernel :class:`~schedsi.util.hierarchy_builder.ModuleBuilder`.
+    """
+    kernel = hierarchy_builder.ModuleBuilder(scheduler=schedulers.CFS.builder(
+        default_shares=default_shares, min_period=min_period, min_slice=min_slice,
+        time_slice=None))
+
+    kernel.add_thread(threads.Thread, {'shares': 1000}) \
+          .add_thread(threads.PeriodicWorkThread, {'shares': 250},
+                      ready_time=5, units=256, period=160, burst=4) \
+          .add_thread(threads.PeriodicWorkThread, {'shares': 250},
+                      ready_time=25, units=256, period=160, burst=4) \
+          .add_thread(threads.PeriodicWorkThread, {'shares': 250},
+                      ready_time=500, units=20, period=160, burst=4) \
+          .add_thread(threads.Thread, {'shares': 1600}) \
+          .add_thread(threads.Thread, {'shares': 100}) \
+          .add_thread(threads.Thread, {'shares': 100})
+
+    return kernel
+
+
+KERNEL = build_kernel()
 
 
 def main():
@@ -34,8 +44,7 @@ def main():
 
         # Create and run the world.
         the_world = world.World(1, KERNEL.module, binary_log, local_timer_scheduling=True)
-        while the_world.step() <= 2000:
-            pass
+        the_world.run_until(2000)
 
         the_world.log_statistics()
 
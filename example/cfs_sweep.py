@@ -0,0 +1,27 @@
+#!/usr/bin/env python3
+"""Sample for a parameter sweep over the CFS example."""
+
+from schedsi import sweep
+from example import cfs
+
+
+def make_kernel(**params):
+    """Create the kernel of the CFS example."""
+    return cfs.build_kernel(**params).module
+
+
+def main():
+    """Run the sweep and print the mean waiting time of each point."""
+    points = sweep.grid(min_period=[20, 30, 40], min_slice=[2, 4, 6])
+    results = sweep.sweep(make_kernel, points, 2000, local_timer_scheduling=True)
+
+    for result in results:
+        waits = [sum(wait) for scheduler in result.threads.values()
+                 for stats in scheduler['children'].values() for wait in stats['wait']]
+        mean_wait = sum(waits) / len(waits) if waits else 0
+        print(', '.join('{}={}'.format(*param) for param in sorted(result.params.items())),
+              'mean wait: {:.2f}'.format(float(mean_wait)))
+
+
+if __name__ == '__main__':
+    main()
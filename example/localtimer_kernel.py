@@ -45,8 +45,7 @@ def main():
 
         # Create and run the world.
         the_world = world.World(1, KERNEL.module, binary_log, local_timer_scheduling=True)
-        while the_world.step() <= 400:
-            pass
+        the_world.run_until(400)
 
         the_world.log_statistics()
 
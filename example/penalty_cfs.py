@@ -35,8 +35,7 @@ def main():
 
         # Create and run the world.
         the_world = world.World(1, KERNEL.module, binary_log, local_timer_scheduling=False)
-        while the_world.step() <= 2000:
-            pass
+        the_world.run_until(2000)
 
         the_world.log_statistics()
 
@@ -15,6 +15,7 @@ import matplotlib
 import matplotlib.pyplot
 
 from schedsi.log import binarylog
+from schedsi.util import online_stats
 
 # TODO: parameterize
 BINS_CLUSTER = 10
@@ -45,14 +46,22 @@ class ThreadFigures:
         """Add subplots for the thread's timings."""
         for key, fig in self.figures.items():
             times = stats[key]
+            weights = None
             subplot = fig[1][self.plot_count]
 
+            if isinstance(times, dict):
+                # online aggregates, plot the buckets of the quantile sketch
+                histogram = online_stats.QuantileSketch.from_dict(times['sketch']).histogram()
+                times = [value for value, _ in histogram]
+                weights = [count for _, count in histogram]
+
             if not times:
                 max_time = 0
                 max_range = 0
             else:
                 if isinstance(times[0], collections.abc.Sequence):
                     times = [sum(elem) for elem in times]
+                times = list(map(float, times))
                 max_time = max(times)
                 max_range = max_time
                 if max_range != 0:
@@ -60,7 +69,7 @@ class ThreadFigures:
                     max_range = round(max_range,
                                       -math.floor(math.log(clamp_range, TIME_RANGE_CLAMPING)))
             bins = max(1, math.ceil(max_time / BINS_CLUSTER))
-            subplot.hist(times, bins, range=(0, max_range))
+            subplot.hist(times, bins, range=(0, max_range), weights=weights)
             subplot.set_title(title)
             subplot.set_xlabel('time')
             subplot.set_ylabel('count')
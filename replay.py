@@ -2,7 +2,12 @@
 """Converter for binary log files."""
 
 import datetime
+import functools
+import html
+import multiprocessing
+import os
 import sys
+from schedsi.cpu.time import Time
 from schedsi.log import binarylog
 from schedsi import log
 
@@ -29,7 +34,8 @@ def _extract_param(arg, name):
 def _usage():
     """Print usage and exit with error."""
     print('Usage:', sys.argv[0],
-          'IN_FILENAME [(--text[=FILENAME[TIME_PRECISION[TEXT_ALIGN]]]|--graph[=FILENAME])]')
+          'IN_FILENAME [(--text[=FILENAME[TIME_PRECISION[TEXT_ALIGN]]]|--graph[=FILENAME]'
+          '|--graph-windows=COUNT[:FILENAME])]')
     print('if IN_FILENAME is -, read from stdin.')
     print('If FILENAME is not set, create use using the current system time.')
     print('If FILENAME is -, write to stdout.')
@@ -38,10 +44,94 @@ def _usage():
     print('TEXT_ALIGN is in the format :cpu:time:module:thread:, '
           'where each element between to colons is a number '
           'specifying the padding of the fields in the text log.')
+    print('--graph-windows splits the timeline into COUNT windows and renders each '
+          'into its own SVG file in parallel.')
+    print('FILENAME is then an HTML page linking the SVG files, which are named after it.')
+    print('IN_FILENAME cannot be - for --graph-windows. '
+          'If IN_FILENAME.index exists, it is used to seek to the windows.')
     print('If neither --text nor --graph are specified, --text=- is assumed.')
     sys.exit(1)
 
 
+def _render_window(input_file_name, index_file_name, window):
+    """Render a time window of a binary log file to an SVG file.
+
+    `window` is a (start, end, filename) tuple.
+    Events at `end` are not rendered, unless `end` is `None`.
+    """
+    start, end, filename = window
+    with open(input_file_name, 'rb') as input_log:
+        index = None
+        if index_file_name is not None:
+            with open(index_file_name, 'rb') as index_file:
+                index = binarylog.read_index(index_file)
+        graph_log = log.GraphLog()
+        binarylog.replay(input_log, graph_log, start, end, index=index)
+    with open(filename, 'xb') as log_file:
+        graph_log.write(log_file)
+
+
+def _write_page(page_file, windows):
+    """Write an HTML page showing the SVG files of the `windows`.
+
+    `windows` is a list of (start, end, filename) tuples.
+    """
+    page_file.write('<!DOCTYPE html>\n<html>\n<head><meta charset="utf-8">'
+                    '<title>schedsi graph</title></head>\n<body>\n<ol>\n')
+    for start, end, filename in windows:
+        name = html.escape(os.path.basename(filename))
+        page_file.write('<li><a href="#{0}">{1:.2f} - {2:.2f}</a></li>\n'
+                        .format(name, float(start), float(end)))
+    page_file.write('</ol>\n')
+    for start, end, filename in windows:
+        name = html.escape(os.path.basename(filename))
+        page_file.write('<h2 id="{0}">{1:.2f} - {2:.2f}</h2>\n<img src="{0}" alt="{0}">\n'
+                        .format(name, float(start), float(end)))
+    page_file.write('</body>\n</html>\n')
+
+
+def _graph_windows(input_file_name, value):
+    """Render the binary log file `input_file_name` in multiple time windows.
+
+    `value` is the COUNT[:FILENAME] parameter of --graph-windows.
+    """
+    count, _, filename = value.partition(':')
+    count = int(count)
+    if count < 1:
+        _usage()
+    if not filename:
+        filename = NOW + '.html'
+    stem = os.path.splitext(filename)[0]
+
+    index_file_name = input_file_name + '.index'
+    if not os.path.exists(index_file_name):
+        index_file_name = None
+    with open(input_file_name, 'rb') as input_log:
+        index = None
+        if index_file_name is not None:
+            with open(index_file_name, 'rb') as index_file:
+                index = binarylog.read_index(index_file)
+        end = binarylog.get_end_time(input_log, index=index)
+    if end is None:
+        print('No events in', input_file_name)
+        sys.exit(1)
+
+    bounds = [Time(end) * idx / count for idx in range(0, count + 1)]
+    width = len(str(count - 1))
+    windows = [(bounds[idx], bounds[idx + 1], '{}-{:0{}}.svg'.format(stem, idx, width))
+               for idx in range(0, count)]
+
+    # the windows are half-open, except the last one includes the events at the end
+    render_windows = windows[:-1] + [(bounds[-2], None, windows[-1][2])]
+
+    with open(filename, 'x') as page_file:
+        render = functools.partial(_render_window, input_file_name, index_file_name)
+        with multiprocessing.Pool() as pool:
+            pool.map(render, render_windows)
+        _write_page(page_file, windows)
+    print('Wrote to', filename)
+
+
 def main():
     """Convert a schedsi binary log file."""
     if not 2 <= len(sys.argv) <= 3:
@@ -51,6 +141,14 @@ def main():
 
     input_file_name = sys.argv[1]
     log_from_file = input_file_name != '-'
+
+    value = _extract_param(param, '--graph-windows')
+    if value is not None:
+        if not log_from_file or not value:
+            _usage()
+        _graph_windows(input_file_name, value)
+        return
+
     with open(input_file_name, 'rb') if log_from_file else sys.stdin.buffer as input_log:
         value = _extract_param(param, '--text')
         if value is not None:
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""Checkpoints to resume a long simulation after its process died.
+
+A checkpoint contains the pickled state of the :class:`~schedsi.world.World`
+(see :mod:`schedsi.snapshot`) and of its :class:`~schedsi.log.binarylog.BinaryLog`,
+which records how much of the log and its index was written by then.
+Resuming restores the simulation from the checkpoint, truncates the log files there
+and continues the log where the checkpoint left it.
+
+The kernel is created by a factory, e.g.::
+
+    def make_kernel():
+        kernel = hierarchy_builder.ModuleBuilder(
+            scheduler=schedulers.CFS.builder(default_shares=400, min_period=30, min_slice=6,
+                                             time_slice=None))
+        kernel.add_thread(threads.Thread, {'shares': 1000})
+        return kernel.module
+
+    checkpoint.run(make_kernel, 10 ** 9, 'cfs.msgpack', 'cfs.checkpoint', interval=10 ** 6,
+                   local_timer_scheduling=True)
+
+If the process dies, the same call resumes from the last checkpoint.
+Like snapshots, checkpoints use :mod:`pickle`, so only resume from checkpoints you trust.
+"""
+
+import contextlib
+import os
+import pickle
+from schedsi import world
+from schedsi.log import binarylog
+
+#: The version of the checkpoint format
+FORMAT_VERSION = 2
+
+
+def _sync(stream):
+    """Write `stream` to disk."""
+    stream.flush()
+    os.fsync(stream.fileno())
+
+
+def save(file_name, checkpoint):
+    """Write the `checkpoint` :obj:`dict` to `file_name`.
+
+    The file is replaced atomically, so it is never left half-written.
+    """
+    temp_name = file_name + '.tmp'
+    with open(temp_name, 'wb') as temp_file:
+        pickle.dump(checkpoint, temp_file, pickle.HIGHEST_PROTOCOL)
+        _sync(temp_file)
+    os.replace(temp_name, file_name)
+
+
+def load(file_name):
+    """Read a checkpoint :obj:`dict` from `file_name`.
+
+    Returns `None` if there is no checkpoint.
+    """
+    try:
+        with open(file_name, 'rb') as checkpoint_file:
+            checkpoint = pickle.load(checkpoint_file)
+    except FileNotFoundError:
+        return None
+    if not isinstance(checkpoint, dict) or checkpoint.get('version') != FORMAT_VERSION:
+        raise RuntimeError('Unsupported checkpoint format.')
+    return checkpoint
+
+
+def _open_resumed(file_name, offset):
+    """Open `file_name` for writing from `offset` on.
+
+    Anything written after the checkpoint is discarded.
+    """
+    stream = open(file_name, 'r+b')
+    stream.truncate(offset)
+    stream.seek(offset)
+    return stream
+
+
+def run(make_kernel, until, log_file_name, checkpoint_file_name, *, interval,
+        index_file_name=None, cores=1, **world_kwargs):
+    """Run a simulation of the kernel `make_kernel()` with checkpoints.
+
+    The simulation runs until `until` (see :meth:`World.run_until
+    <schedsi.world.World.run_until>`) and writes a :class:`~schedsi.log.binarylog.BinaryLog`
+    to `log_file_name`, and optionally its index to `index_file_name`.
+    Each time the simulation passes a multiple of `interval`, the log is written to disk
+    and a checkpoint is saved to `checkpoint_file_name`.
+    If that file exists, the simulation resumes from the checkpoint instead of starting anew.
+    At the end, the statistics are logged and the checkpoint is removed.
+    `world_kwargs` are forwarded to the :class:`~schedsi.world.World`.
+
+    Returns the :class:`~schedsi.world.World`.
+    """
+    checkpoint = load(checkpoint_file_name)
+    with contextlib.ExitStack() as files:
+        index_file = None
+        if checkpoint is None:
+            current_time = 0
+            log_file = files.enter_context(open(log_file_name, 'wb'))
+            if index_file_name is not None:
+                index_file = files.enter_context(open(index_file_name, 'wb'))
+            log = binarylog.BinaryLog(log_file, index_file)
+            the_world = world.World(cores, make_kernel(), log, **world_kwargs)
+        else:
+            current_time = checkpoint['time']
+            the_world = checkpoint['world']
+            log = checkpoint['log']
+            log_file = files.enter_context(_open_resumed(log_file_name, log.offset))
+            if index_file_name is not None:
+                index_file = files.enter_context(_open_resumed(index_file_name,
+                                                               log.index_offset))
+            log.resume(log_file, index_file)
+            the_world.set_log(log, register=False)
+
+        # the simulation only runs for thresholds it has not passed yet,
+        # so it executes the same steps as a single call to run_until()
+        for threshold in range(interval, until, interval):
+            if current_time > threshold:
+                continue
+            current_time = the_world.run_until(threshold)
+            _sync(log_file)
+            if index_file is not None:
+                _sync(index_file)
+            save(checkpoint_file_name, {
+                'version': FORMAT_VERSION,
+                'time': current_time,
+                'world': the_world,
+                'log': log
+            })
+
+        if current_time <= until:
+            the_world.run_until(until)
+        the_world.log_statistics()
+    with contextlib.suppress(FileNotFoundError):
+        os.remove(checkpoint_file_name)
+    return the_world
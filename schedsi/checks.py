@@ -0,0 +1,19 @@
+#!/usr/bin/env python3
+"""Switch between the checked and the fast mode of the simulation.
+
+In the checked mode, :class:`Requests <schedsi.cpu.request.Request>` are validated
+when they are created and the schedulers (and their addons) check the invariants of their queues
+on every scheduling decision.
+Some of these checks scan all threads of a scheduler.
+The fast mode skips them; it produces the same results.
+Cheap sanity checks are still done with `assert`.
+
+The mode can be set via the `SCHEDSI_CHECKED` environment variable (`1` or `0`),
+otherwise it follows :obj:`__debug__`, i.e. it is fast when running with `python -O`.
+It can also be switched at runtime by setting :data:`ENABLED`.
+"""
+
+import os
+
+#: Whether the checked mode is enabled
+ENABLED = bool(int(os.environ.get('SCHEDSI_CHECKED', int(__debug__))))
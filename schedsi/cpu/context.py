@@ -7,26 +7,60 @@ class Context:
 
     The context has
         * the current :class:`Thread`
-        * the execution coroutine of the :class:`Thread`
+        * the execution coroutine of the :class:`Thread`,
+          or `None` if the :class:`Thread` provides
+          :meth:`~schedsi.threads.Thread.next_request`
         * a flag indicating whether the coroutine has run
-        * timeout of the local timer
+        * deadline of the local timer, relative to the :attr:`Chain.clock` it is in
         * an object to send to the execution coroutine (:attr:`buffer`)
     """
 
+    __slots__ = ('thread', 'next_request', 'execution', 'started', 'deadline', 'buffer')
+
     def __init__(self, thread):
         """Create a :class:`Context`."""
         self.thread = thread
-        self.execution = thread.execute()
+        self.next_request = thread.next_request
+        self.execution = None if self.next_request is not None else thread.execute()
         self.started = False
-        self.timeout = None
+        self.deadline = None
         self.buffer = None
 
+    def __getstate__(self):
+        """Return the state for :mod:`pickle`.
+
+        A coroutine cannot be saved, unless it has not run yet.
+        It is then created again by :meth:`__setstate__`.
+        """
+        if self.execution is not None and self.started:
+            raise RuntimeError('Cannot save the running coroutine of {} {}({}).'.format(
+                type(self.thread).__name__, self.thread.tid, self.thread.module.name))
+        return {name: getattr(self, name) for name in self.__slots__ if name != 'execution'}
+
+    def __setstate__(self, state):
+        """Restore the state from :mod:`pickle`."""
+        for name, value in state.items():
+            setattr(self, name, value)
+        self.execution = None if self.next_request is not None else self.thread.execute()
+
     def execute(self, current_time):
         """Run the execution coroutine.
 
         `current_time` is sent to the coroutine,
         unless a different reply is injected (see :meth:`reply`).
+
+        If the thread provides :meth:`~schedsi.threads.Thread.next_request`,
+        that is called with the same argument instead of resuming a coroutine.
         """
+        if self.next_request is not None:
+            if not self.started:
+                self.started = True
+                return self.next_request(None)
+            if self.buffer is None:
+                return self.next_request(current_time)
+            value = self.next_request(self.buffer)
+            self.buffer = None
+            return value
         if self.buffer is not None:
             value = self.execution.send(self.buffer)
             self.buffer = None
@@ -56,7 +90,8 @@ class Context:
         assert self.buffer is None, 'Cannot restart with pending reply.'
         assert self.started, 'Cannot restart if context never executed.'
         self.thread.finish(current_time)
-        self.execution = self.thread.execute()
+        if self.next_request is None:
+            self.execution = self.thread.execute()
         self.started = False
 
 
@@ -65,20 +100,29 @@ class Chain:
 
     The context chain represents the stack of contexts for a scheduling-chain.
     It may be a partial chain, i.e. the bottom is not the kernel.
+
+    Timers are kept as deadlines on the :attr:`clock` of the chain,
+    so elapsing time does not need to touch every context.
+    For each position in the chain, :attr:`_timeout_idxs` stores the index of the context
+    with the lowest deadline up to that position, so the next timeout is always found at the top.
     """
 
-    def __init__(self, *, chain, next_timeout_idx=None):
-        """Create a :class:`Chain`."""
+    __slots__ = ('contexts', 'clock', '_timeout_idxs')
+
+    def __init__(self, *, chain, clock=0):
+        """Create a :class:`Chain`.
+
+        `clock` is the time the deadlines of the contexts in `chain` refer to.
+        """
         self.contexts = chain
-        if next_timeout_idx is not None:
-            self.next_timeout_idx = next_timeout_idx
-        else:
-            self._update_timeout()
+        self.clock = clock
+        self._timeout_idxs = []
+        self._update_timeouts(0)
 
     @classmethod
     def from_context(cls, start):
         """Create a :class:`Chain` with a single context."""
-        return cls(chain=[start], next_timeout_idx=0)
+        return cls(chain=[start])
 
     @classmethod
     def from_thread(cls, start):
@@ -109,12 +153,18 @@ class Chain:
         """The parent thread."""
         return self.thread_at(-2) if len(self) > 1 else None
 
+    @property
+    def next_timeout_idx(self):
+        """The index of the context with the next timeout."""
+        return self._timeout_idxs[-1] if self._timeout_idxs else None
+
     @property
     def next_timeout(self):
         """The next timeout."""
-        if self.next_timeout_idx is None:
+        idx = self.next_timeout_idx
+        if idx is None:
             return None
-        return self.contexts[self.next_timeout_idx].timeout
+        return self.contexts[idx].deadline - self.clock
 
     def thread_at(self, idx):
         """Return the thread at index `idx` in the chain.
@@ -123,26 +173,35 @@ class Chain:
         """
         return self.contexts[idx].thread
 
-    def _update_timeout(self):
-        """Find the lowest timeout in the chain and set :attr:`next_timeout`.
+    def _update_timeouts(self, start):
+        """Recalculate :attr:`_timeout_idxs` from index `start` onwards.
 
-        This traverses the whole chain.
+        On equal deadlines the lower index wins.
         """
-        valid_timeouts = ((ctx.timeout, i) for i, ctx in enumerate(self.contexts)
-                          if ctx.timeout is not None)
-        self.next_timeout_idx = min(valid_timeouts, default=[None, None],
-                                    key=lambda pair: pair[0])[1]
+        timeout_idxs = self._timeout_idxs
+        del timeout_idxs[start:]
+        contexts = self.contexts
+        best_idx = timeout_idxs[-1] if timeout_idxs else None
+        best = None if best_idx is None else contexts[best_idx].deadline
+        for idx in range(start, len(contexts)):
+            deadline = contexts[idx].deadline
+            if deadline is not None and (best is None or deadline < best):
+                best_idx = idx
+                best = deadline
+            timeout_idxs.append(best_idx)
 
     def append_chain(self, tail):
         """Append a :class:`Chain`."""
-        # update self.next_timeout
-        tail_next_timeout = tail.next_timeout
-        next_timeout = self.next_timeout
-        if tail_next_timeout is not None \
-           and (next_timeout is None or tail_next_timeout < next_timeout):
-            self.next_timeout_idx = tail.next_timeout_idx + len(self)
-
+        # move the deadlines of the tail onto our clock
+        offset = self.clock - tail.clock
+        if offset:
+            for ctx in tail.contexts:
+                if ctx.deadline is not None:
+                    ctx.deadline += offset
+
+        start = len(self.contexts)
         self.contexts += tail.contexts
+        self._update_timeouts(start)
 
     def set_timer(self, timeout, idx=-1):
         """Set the timeout of a context in the chain.
@@ -153,50 +212,28 @@ class Chain:
             idx += len(self.contexts)
         assert idx >= 0
 
-        prev_timeout = self.next_timeout
-        self.contexts[idx].timeout = timeout
-
-        # update self.next_timeout
-        # check if we can avoid calling _update_timeout()
-        if self.next_timeout_idx is None:
-            self.next_timeout_idx = idx
-        else:
-            if timeout is not None and (
-                    prev_timeout is None or
-                    idx != self.next_timeout_idx or prev_timeout >= timeout):
-                if prev_timeout is None or prev_timeout > timeout or \
-                    (prev_timeout == timeout and idx < self.next_timeout_idx):
-                    self.next_timeout_idx = idx
-            elif self.next_timeout_idx == idx:
-                self._update_timeout()
+        self.contexts[idx].deadline = None if timeout is None else self.clock + timeout
+        self._update_timeouts(idx)
 
     def elapse(self, time):
         """Elapse all timers in the chain.
 
         Must not be called if a timeout in the chain has elapsed.
         """
-        if self.next_timeout_idx is None:
+        idx = self.next_timeout_idx
+        if idx is None:
             # no time to count down then
             return
         assert self.contexts
 
-        elapsed = self.next_timeout <= 0
+        if self.contexts[idx].deadline <= self.clock:
+            # don't elapse contexts further than the next_timeout
+            # they only move further away, so _timeout_idxs stays valid
+            for ctx in self.contexts[idx + 1:]:
+                if ctx.deadline is not None:
+                    ctx.deadline += time
 
-        # elapse contexts up to next_timeout_idx
-        for ctx in self.contexts[:self.next_timeout_idx + 1]:
-            if ctx.timeout is not None:
-                assert ctx.timeout > 0 or self.contexts.index(ctx) == self.next_timeout_idx
-                ctx.timeout -= time
-
-        # don't elapse contexts further than the next_timeout
-        if elapsed:
-            return
-
-        # elapse the rest
-        for ctx in self.contexts[self.next_timeout_idx + 1:]:
-            if ctx.timeout is not None:
-                assert ctx.timeout > 0
-                ctx.timeout -= time
+        self.clock += time
 
     def find_elapsed_timer(self):
         """Return the index of the first elapsed timer in the :class:`Chain`."""
@@ -214,15 +251,9 @@ class Chain:
             idx = len(self) + idx
         assert idx > 0, 'Index for split is out of bounds.'
 
-        tail_timeout_idx = None
-        if self.next_timeout_idx is not None and idx <= self.next_timeout_idx:
-            tail_timeout_idx = self.next_timeout_idx - idx
-
-        tail = Chain(chain=self.contexts[idx:], next_timeout_idx=tail_timeout_idx)
+        tail = Chain(chain=self.contexts[idx:], clock=self.clock)
         del self.contexts[idx:]
-
-        if tail_timeout_idx is not None:
-            self._update_timeout()
+        del self._timeout_idxs[idx:]
 
         return tail
 
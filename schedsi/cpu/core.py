@@ -1,7 +1,8 @@
 #!/usr/bin/env python3
 """Defines a :class:`Core`."""
 
-from . import context
+import time as walltime
+from . import context, profile as cpuprofile, time as cputime
 from .request import Type as RequestType
 from schedsi.threads import VCPUThread
 
@@ -28,6 +29,16 @@ class _TimeStats:  # pylint: disable=too-few-public-methods
         self.timer_delay = 0
 
 
+def _dispatch_table(status_class):
+    """Return a tuple of request handlers indexed by the :class:`~schedsi.cpu.request.Type`.
+
+    The handler of a request type is the method ``_handle_<type name>`` of `status_class`.
+    It takes the :class:`_Status` and the :class:`~schedsi.cpu.request.Request`
+    and returns whether time was spent handling the request.
+    """
+    return tuple(getattr(status_class, '_handle_' + rtype.name) for rtype in sorted(RequestType))
+
+
 class _Status:
     """Status of a CPU Core.
 
@@ -35,15 +46,17 @@ class _Status:
         * a reference to the :class:`Core` that owns it
         * a :class:`context.Chain`
         * the current time
+        * whether the kernel waits for the other cores
         * :class:`_TimeStats`
         * :class:`_ContextSwitchStats`
     """
 
-    def __init__(self, cpu, chain):
+    def __init__(self, cpu, chain, current_time):
         """Create a :class:`_Status`."""
         self.cpu = cpu
         self.chain = chain
-        self.current_time = 0
+        self.current_time = current_time
+        self.waiting_for_peers = False
         self.stats = _TimeStats()
         self.ctxsw_stats = _ContextSwitchStats()
 
@@ -168,8 +181,9 @@ class _Status:
         if len(self.chain) == 1:
             # kernel yields
             slice_left = self.chain.next_timeout
-            if slice_left is None:
-                raise RuntimeError('Kernel cannot yield without timeout.')
+            self.waiting_for_peers = slice_left is None
+            if self.waiting_for_peers:
+                slice_left = self._wait_for_peers()
             self.cpu.log.cpu_idle(self.cpu, slice_left)
             self.stats.idle_time += slice_left
             self._update_time(slice_left)
@@ -177,61 +191,104 @@ class _Status:
             prev_chain, _ = self._context_switch(split_index=-2)
             assert len(prev_chain) == 1
 
+    def _wait_for_peers(self):
+        """Return how long to idle until the other cores proceed.
+
+        On multiple cores a kernel may have nothing to run because
+        its threads are running on the other cores.
+        It then idles until another core might have made some progress.
+        """
+        peer_time = None
+        if self.cpu.peer_time is not None and not self.chain.bottom.is_finished():
+            peer_time = self.cpu.peer_time(self.current_time)
+        if peer_time is None:
+            raise RuntimeError('Kernel cannot yield without timeout.')
+        return peer_time - self.current_time
+
     def _append_chain(self, tail):
         """Continue execution of another :class:`Thread`.
 
         The thread must be of either the same :class:`Module` or a child :class:`Module`.
         """
+        self.waiting_for_peers = False
         prev_thread = self.chain.top
         if prev_thread.module not in (tail.bottom.module, tail.bottom.module.parent):
             raise RuntimeError('Switching thread to unrelated module')
         prev_chain, _ = self._context_switch(appendix=tail)
         assert prev_chain is None
 
+    def _handle_current_time(self, request):  # pylint: disable=no-self-use,unused-argument
+        """Handle a current-time :class:`~schedsi.cpu.request.Request`.
+
+        This is a no-op.
+        """
+        return False
+
+    def _handle_execute(self, request):
+        """Handle an execute :class:`~schedsi.cpu.request.Request`."""
+        time = self._calc_runtime(request.arg)
+        assert time > 0
+        assert request.arg is None or time <= request.arg or request.arg == -1
+        self.cpu.log.thread_execute(self.cpu, time)
+        self._update_time(time)
+        self.stats.crunch_time += time
+        self.chain.run_background_all(self.current_time, time)
+        self.chain.top.run_crunch(self.current_time, time)
+        return True
+
+    def _handle_idle(self, request):  # pylint: disable=unused-argument
+        """Handle an idle :class:`~schedsi.cpu.request.Request`."""
+        self.cpu.log.thread_yield(self.cpu)
+        self._switch_to_parent()
+        return True
+
+    def _handle_resume_chain(self, request):
+        """Handle a resume-chain :class:`~schedsi.cpu.request.Request`."""
+        self._append_chain(request.arg)
+        return True
+
+    def _handle_timer(self, request):
+        """Handle a timer :class:`~schedsi.cpu.request.Request`."""
+        self.chain.set_timer(request.arg)
+        return False
+
+    def __init_subclass__(cls, **kwargs):
+        """Build the :attr:`_dispatch` table of a subclass.
+
+        This picks up the request handlers the subclass overrides.
+        """
+        super().__init_subclass__(**kwargs)
+        cls._dispatch = _dispatch_table(cls)
+
     def _handle_request(self, request):
         """Handle a :class:`~schedsi.request.Request`.
 
-        Returns whether time was spent handling the request..
+        Returns whether time was spent handling the request.
         """
-        if request.rtype == RequestType.current_time:
-            # no-op
-            return False
-        elif request.rtype == RequestType.execute:
-            time = self._calc_runtime(request.arg)
-            assert time > 0
-            assert request.arg is None or time <= request.arg or request.arg == -1
-            self.cpu.log.thread_execute(self.cpu, time)
-            self._update_time(time)
-            self.stats.crunch_time += time
-            self.chain.run_background_all(self.current_time, time)
-            self.chain.top.run_crunch(self.current_time, time)
-        elif request.rtype == RequestType.idle:
-            self.cpu.log.thread_yield(self.cpu)
-            self._switch_to_parent()
-        elif request.rtype == RequestType.resume_chain:
-            self._append_chain(request.arg)
-        elif request.rtype == RequestType.timer:
-            self.chain.set_timer(request.arg)
-            return False
-        else:
-            assert False
-        return True
+        return self._dispatch[request.rtype](self, request)
 
     def execute(self):
         """Execute one step.
 
         One step is anything that takes time or switching context.
         """
-        # For multi-core emulation this should become a coroutine.
-        # It should yield whenever current_time is updated.
+        # Multiple cores are interleaved by the World at the granularity of these steps,
+        # ordered by current_time.
 
         next_timeout = self.chain.next_timeout
         if next_timeout is not None and next_timeout <= 0:
             self._timer_interrupt()
             return
 
-        while not self._handle_request(self.chain.current_context.execute(self.current_time)):
-            pass
+        chain = self.chain
+        dispatch = self._dispatch
+        request = chain.current_context.execute(self.current_time)
+        while not dispatch[request.rtype](self, request):
+            request = chain.current_context.execute(self.current_time)
+
+
+#: The request handlers indexed by the request type (see :func:`_dispatch_table`)
+_Status._dispatch = _dispatch_table(_Status)  # pylint: disable=protected-access
 
 
 class _KernelTimerOnlyStatus(_Status):
@@ -281,30 +338,76 @@ class _KernelTimerOnlyStatus(_Status):
             # reply with just a single thread, to reestablish the context chain when resuming
             current_context.reply(context.Chain.from_thread(prev_chain.bottom))
 
-    def _handle_request(self, request):
-        """See :meth:`_Status._handle_request`.
+    def _handle_resume_chain(self, request):
+        """Handle a resume-chain :class:`~schedsi.cpu.request.Request`.
 
-        Ensures that
+        Only :class:`context.Chains <schedsi.context.Chain>` of length 1
+        can be resumed, which restarts that one thread.
+        """
+        assert len(request.arg) == 1
+        chain = context.Chain.from_thread(request.arg.bottom)
+        self._append_chain(chain)
+        return True
+
+    def _handle_timer(self, request):
+        """Handle a timer :class:`~schedsi.cpu.request.Request`.
+
+        Only the kernel can set a timer.
+        """
+        if self.chain.top.module != self.cpu.kernel:
+            if request.arg is None:
+                return False
+            raise RuntimeError('Received timer request from non-kernel thread '
+                               + str(request.arg) + ' '
+                               + self.chain.top.tid + '(' + self.chain.top.module.name + ')')
+        return super()._handle_timer(request)
+
+
+class _Profiling:
+    """Mixin for a :class:`_Status` recording the :attr:`Core.profile`."""
 
-            * only :class:`context.Chains <schedsi.context.Chain>` of length 1
-              can be resumed and restarts that one thread
-            * only the kernel can set a timer.
+    def execute(self):
+        """See :meth:`_Status.execute`.
+
+        Measures the execution of each thread and the handling of its request separately.
+        """
+        profile = self.cpu.profile
+        next_timeout = self.chain.next_timeout
+        if next_timeout is not None and next_timeout <= 0:
+            start = walltime.perf_counter()
+            self._timer_interrupt()
+            profile.timer_interrupt(walltime.perf_counter() - start)
+            return
 
+        while True:
+            current_context = self.chain.current_context
+            start = walltime.perf_counter()
+            request = current_context.execute(self.current_time)
+            executed = walltime.perf_counter()
+            profile.thread_executed(current_context.thread, executed - start)
+            handled = self._handle_request(request)
+            profile.request_handled(request, walltime.perf_counter() - executed)
+            if handled:
+                return
+
+    def _context_switch(self, **kwargs):
+        """See :meth:`_Status._context_switch`.
+
+        Counts the context switch by the length of the resulting context chain.
         """
-        if request.rtype == RequestType.resume_chain:
-            assert len(request.arg) == 1
-            chain = context.Chain.from_thread(request.arg.bottom)
-            self._append_chain(chain)
-            return True
-        if request.rtype == RequestType.timer:
-            if self.chain.top.module != self.cpu.kernel:
-                if request.arg is None:
-                    return False
-                raise RuntimeError('Received timer request from non-kernel thread '
-                                   + str(request.arg) + ' '
-                                   + self.chain.top.tid + '(' + self.chain.top.module.name + ')')
-            # let super() handle the rest of this request
-        return super()._handle_request(request)
+        result = super()._context_switch(**kwargs)
+        self.cpu.profile.context_switch(len(self.chain))
+        return result
+
+
+class _ProfilingStatus(_Profiling, _Status):
+    """:class:`_Status` recording the :attr:`Core.profile`."""
+    pass
+
+
+class _ProfilingKernelTimerOnlyStatus(_Profiling, _KernelTimerOnlyStatus):
+    """:class:`_KernelTimerOnlyStatus` recording the :attr:`Core.profile`."""
+    pass
 
 
 class Core:
@@ -314,22 +417,46 @@ class Core:
         * a unique ID
         * the timer quantum
         * a log to report its actions to
+        * a function returning the time of the other cores (or `None`)
+        * a :class:`~schedsi.cpu.profile.Profile` (or `None` if not profiling)
         * the :class:`_Status`
 
     The values are not expected to change much during operation.
     """
 
-    def __init__(self, uid, init_thread, log, *, local_timer_scheduling):
-        """Create a :class:`Core`."""
+    def __init__(self, uid, kernel, log, *, local_timer_scheduling, time_backend=None,
+                 peer_time=None, profile=False):
+        """Create a :class:`Core` for the `kernel` :class:`~schedsi.module.Module`.
+
+        `time_backend` names the :mod:`time backend <schedsi.cpu.time>` to use.
+        `peer_time` is a function returning the earliest current time of the other cores
+        later than the passed time; it is required for multiple cores.
+        If `profile` is set, a :class:`~schedsi.cpu.profile.Profile` is recorded.
+        """
         self.uid = uid
 
         self.log = log
+        self.peer_time = peer_time
+        self.profile = cpuprofile.Profile() if profile else None
+
+        init_thread = kernel.register_vcpu(self)
 
-        status_class = _Status if local_timer_scheduling else _KernelTimerOnlyStatus
-        self.status = status_class(self, context.Chain.from_thread(init_thread))
+        if profile:
+            status_class = (_ProfilingStatus if local_timer_scheduling
+                            else _ProfilingKernelTimerOnlyStatus)
+        else:
+            status_class = _Status if local_timer_scheduling else _KernelTimerOnlyStatus
+        self.status = status_class(self, context.Chain.from_thread(init_thread),
+                                   cputime.get_backend(time_backend)(0))
 
         log.init_core(self)
 
+    def __getstate__(self):
+        """Return the state for :mod:`pickle`, without the :attr:`log`."""
+        state = self.__dict__.copy()
+        state['log'] = None
+        return state
+
     def execute(self):
         """Execute one step.
 
@@ -338,9 +465,15 @@ class Core:
         self.status.execute()
 
     def get_statistics(self):
-        """Obtain statistics."""
+        """Obtain statistics.
+
+        If profiling, this includes the :attr:`profile`
+        (see :meth:`Profile.to_dict <schedsi.cpu.profile.Profile.to_dict>`).
+        """
         stats = self.status.stats.__dict__.copy()
         stats.update(self.status.ctxsw_stats.__dict__)
+        if self.profile is not None:
+            stats['profile'] = self.profile.to_dict()
         return stats
 
     @property
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""Defines the :class:`Profile` of a :class:`~schedsi.cpu.core.Core`.
+
+Profiling is opt-in (see :class:`World <schedsi.world.World>`).
+It records where the wall time of a simulation goes:
+executing the threads, i.e. producing their requests,
+and handling the requests in the :class:`~schedsi.cpu.core.Core`.
+The former is broken down by :class:`~schedsi.module.Module`, thread class and scheduler class,
+the latter by request type.
+"""
+
+import collections
+from schedsi.threads import SchedulerThread
+
+
+class _Timer:  # pylint: disable=too-few-public-methods
+    """Count and accumulated wall time of something."""
+
+    __slots__ = ('count', 'seconds')
+
+    def __init__(self):
+        """Create a :class:`_Timer`."""
+        self.count = 0
+        self.seconds = 0.0
+
+    def add(self, seconds, count=1):
+        """Add `count` occurrences taking `seconds` in total."""
+        self.count += count
+        self.seconds += seconds
+
+    def to_dict(self):
+        """Return the count and time as a :obj:`dict`."""
+        return {'count': self.count, 'seconds': self.seconds}
+
+
+def _timers_to_dict(timers):
+    """Convert a :obj:`dict` of :class:`_Timer`\\ s with :meth:`_Timer.to_dict`."""
+    return {key: timer.to_dict() for key, timer in timers.items()}
+
+
+class Profile:
+    """Counters and wall-clock timers of a :class:`~schedsi.cpu.core.Core`.
+
+    The profile has
+        * per request type: how many requests were handled and how long the core took
+        * per :class:`~schedsi.module.Module`: how often and how long its threads executed
+        * per thread class: the same
+        * per scheduler class: the same for the scheduler threads
+        * per length of the context chain: how many context switches lead to it
+        * how many timer interrupts happened and how long handling them took
+    """
+
+    def __init__(self):
+        """Create an empty :class:`Profile`."""
+        self.requests = collections.defaultdict(_Timer)
+        self.modules = collections.defaultdict(_Timer)
+        self.threads = collections.defaultdict(_Timer)
+        self.schedulers = collections.defaultdict(_Timer)
+        self.context_switches = collections.Counter()
+        self.timer_interrupts = _Timer()
+
+    def thread_executed(self, thread, seconds):
+        """Record that `thread` took `seconds` to produce a request."""
+        self.modules[thread.module.name].add(seconds)
+        self.threads[type(thread).__name__].add(seconds)
+        if isinstance(thread, SchedulerThread):
+            self.schedulers[type(thread.scheduler).__name__].add(seconds)
+
+    def request_handled(self, request, seconds):
+        """Record that the core took `seconds` to handle `request`."""
+        self.requests[request.rtype.name].add(seconds)
+
+    def context_switch(self, depth):
+        """Record a context switch to a context chain of length `depth`."""
+        self.context_switches[depth] += 1
+
+    def timer_interrupt(self, seconds):
+        """Record that handling a timer interrupt took `seconds`."""
+        self.timer_interrupts.add(seconds)
+
+    def merge(self, other):
+        """Add all counters and timers of the :class:`Profile` `other`."""
+        for mine, theirs in ((self.requests, other.requests), (self.modules, other.modules),
+                             (self.threads, other.threads),
+                             (self.schedulers, other.schedulers)):
+            for key, timer in theirs.items():
+                mine[key].add(timer.seconds, timer.count)
+        self.context_switches.update(other.context_switches)
+        self.timer_interrupts.add(other.timer_interrupts.seconds, other.timer_interrupts.count)
+
+    def to_dict(self):
+        """Return the profile as a :obj:`dict` for the statistics.
+
+        The chain lengths of the context switches are converted to strings.
+        """
+        return {
+            'requests': _timers_to_dict(self.requests),
+            'modules': _timers_to_dict(self.modules),
+            'threads': _timers_to_dict(self.threads),
+            'schedulers': _timers_to_dict(self.schedulers),
+            'context_switches': {str(depth): count
+                                 for depth, count in self.context_switches.items()},
+            'timer_interrupts': self.timer_interrupts.to_dict(),
+            'thread_seconds': sum(timer.seconds for timer in self.threads.values()),
+            'core_seconds': sum(timer.seconds for timer in self.requests.values())
+                            + self.timer_interrupts.seconds
+        }
@@ -3,16 +3,33 @@
 
 import enum
 import numbers
+from schedsi import checks
 from schedsi.cpu import context
 
-Type = enum.Enum('Type', ['current_time', 'resume_chain', 'idle', 'execute', 'timer'])
+#: The request types, numbered from 0 to index dispatch tables
+Type = enum.IntEnum('Type', ['current_time', 'resume_chain', 'idle', 'execute', 'timer'], start=0)
 
 
 class Request:
-    """A request to the CPU."""
+    """A request to the CPU.
+
+    Requests are validated on creation if :data:`schedsi.checks.ENABLED` is set.
+    Requests without argument are shared,
+    e.g. :meth:`current_time` always returns the same :class:`Request`.
+    """
+
+    __slots__ = ('rtype', 'arg')
 
     def __init__(self, rtype, arg):
         """Create a :class:`Request`."""
+        if checks.ENABLED:
+            self._validate(rtype, arg)
+        self.rtype = rtype
+        self.arg = arg
+
+    @staticmethod
+    def _validate(rtype, arg):
+        """Check that `arg` is valid for a :class:`Request` of `rtype`."""
         if rtype == Type.current_time:
             assert arg is None
         elif rtype == Type.resume_chain:
@@ -21,16 +38,14 @@ class Request:
             assert arg is None or isinstance(arg, numbers.Rational) and arg > 0
         else:
             assert False, 'Unknown Type'
-        self.rtype = rtype
-        self.arg = arg
 
     @classmethod
     def current_time(cls):
-        """Create a :class:`Request` to get the current time.
+        """Return a :class:`Request` to get the current time.
 
         The CPU will not spend any virtual time doing this.
         """
-        return cls(Type.current_time, None)
+        return _CURRENT_TIME
 
     @classmethod
     def resume_chain(cls, chain):
@@ -39,8 +54,8 @@ class Request:
 
     @classmethod
     def idle(cls):
-        """Create a :class:`Request` to idle."""
-        return cls(Type.idle, None)
+        """Return a :class:`Request` to idle."""
+        return _IDLE
 
     @classmethod
     def execute(cls, amount):
@@ -51,3 +66,7 @@ class Request:
     def timer(cls, time):
         """Create a :class:`Request` to set a timer for the current context."""
         return cls(Type.timer, time)
+
+
+_CURRENT_TIME = Request(Type.current_time, None)
+_IDLE = Request(Type.idle, None)
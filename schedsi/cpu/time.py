@@ -1,7 +1,51 @@
 #!/usr/bin/env python3
-"""Defines a :class:`Time` type."""
+"""Defines a :class:`Time` type and the time backends.
+
+A time backend determines the type the :class:`~schedsi.cpu.core.Core`'s clock starts out as.
+Since all other times are derived from it, this decides the arithmetic used throughout:
+
+    * `'mpq'` uses :class:`gmpy2.mpq` for everything
+    * `'int'` uses plain :obj:`int`, which is considerably cheaper;
+      fractional times (e.g. from CFS share ratios) still become :class:`gmpy2.mpq`
+      and propagate from there
+
+The default backend can be set via the `SCHEDSI_TIME_BACKEND` environment variable.
+"""
 
 import numbers
+import os
 from gmpy2 import mpq as Time
 
 TimeType = numbers.Rational.register(type(Time(0)))
+
+#: The available time backends
+BACKENDS = {'mpq': Time, 'int': int}
+
+#: The backend used if none is specified
+DEFAULT_BACKEND = os.environ.get('SCHEDSI_TIME_BACKEND', 'mpq')
+
+
+def get_backend(name=None):
+    """Return the type of the time backend `name`.
+
+    If `name` is `None`, :data:`DEFAULT_BACKEND` is used.
+    """
+    if name is None:
+        name = DEFAULT_BACKEND
+    try:
+        return BACKENDS[name]
+    except KeyError:
+        raise RuntimeError('Unknown time backend ' + name) from None
+
+
+def div(dividend, divisor):
+    """Divide exactly.
+
+    Unlike `/` this does not produce a :obj:`float` for :obj:`int` operands.
+    The quotient stays an :obj:`int` if possible and becomes a :class:`Time` otherwise.
+    """
+    if isinstance(dividend, int) and isinstance(divisor, int):
+        if dividend % divisor == 0:
+            return dividend // divisor
+        return Time(dividend, divisor)
+    return dividend / divisor
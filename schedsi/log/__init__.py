@@ -2,7 +2,7 @@
 
 # this is to import the replay functions
 from . import binarylog
-from .binarylog import BinaryLog
+from .binarylog import BinaryLog, LegacyBinaryLog
 from .ganttlog import GanttLog
 from .graphlog import GraphLog
 from .modulegraphlog import ModuleGraphLog
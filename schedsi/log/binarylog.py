@@ -1,11 +1,33 @@
 #!/usr/bin/env python3
-"""Defines the :class:`BinaryLog` and the :func:`replay` function."""
+"""Defines the :class:`BinaryLog` and the :func:`replay` function.
+
+There are two formats:
+
+    * the compact format written by :class:`BinaryLog`;
+      it starts with a header containing the :data:`FORMAT_VERSION`
+    * the original format written by :class:`LegacyBinaryLog` (version 1)
+
+:func:`replay` and :func:`get_thread_statistics` read both.
+"""
 
 import collections
 import enum
+import itertools
+import math
 import msgpack
 from schedsi.cpu.time import Time, TimeType
 
+#: The version of the format written by :class:`BinaryLog`
+FORMAT_VERSION = 2
+
+#: The default number of bytes between checkpoints in the index of a :class:`BinaryLog`
+INDEX_INTERVAL = 1 << 20
+
+# the first entry of a log in the compact format is (_MAGIC, FORMAT_VERSION)
+_MAGIC = 'schedsi-binarylog'
+# the first entry of an index is (_INDEX_MAGIC, FORMAT_VERSION)
+_INDEX_MAGIC = 'schedsi-binarylog-index'
+
 _EntryType = enum.Enum('_EntryType', ['event', 'thread_statistics', 'cpu_statistics'])
 _Event = enum.Enum('_Event', [
     'init_core',
@@ -18,11 +40,38 @@ _Event = enum.Enum('_Event', [
 
 _GenericEvent = collections.namedtuple('_GenericEvent', 'cpu event')
 
+# the compact format consists of arrays starting with one of these tags
+_Tag = enum.IntEnum('_Tag', [
+    'module',
+    'thread',
+    'init_core',
+    'context_split',
+    'context_append',
+    'thread_execute',
+    'thread_yield',
+    'cpu_idle',
+    'timer_interrupt',
+    'thread_statistics',
+    'cpu_statistics',
+    'checkpoint'
+], start=0)
+
 
 def _encode_time(frac):
     """Encode :class:`~schedsi.cpu.time.Time`."""
     return {'numerator': int(frac.numerator), 'denominator': int(frac.denominator)}
 
+
+def _encode_compact_time(time):
+    """Encode :class:`~schedsi.cpu.time.Time` for the compact format.
+
+    Integers are stored as is, fractions as a (numerator, denominator) pair.
+    """
+    if time.denominator == 1:
+        return int(time.numerator)
+    return (int(time.numerator), int(time.denominator))
+
+
 def _encode_cpu(cpu):
     """Encode a :class:`~schedsi.cpu.Core` to a :obj:`dict`."""
     return {
@@ -126,10 +175,210 @@ def _encode_stats(stats):
 
 
 class BinaryLog:
-    """Binary logger using MessagePack."""
+    """Binary logger using MessagePack.
+
+    This writes the compact format:
+    Each entry is an array starting with an integer tag.
+    :class:`Modules <schedsi.module.Module>` and :class:`Threads <schedsi.threads.Thread>`
+    are declared once and referred to by an ID afterwards.
+    The time of an event is stored as the difference to the previous event of that
+    :class:`~schedsi.cpu.core.Core`.
+
+    Optionally, an index is written to a separate stream.
+    It contains the declarations, the offsets of the statistics and periodic checkpoints
+    of the time and context chain of each :class:`~schedsi.cpu.core.Core`.
+    With it, :func:`replay` and :func:`get_thread_statistics` can seek instead
+    of reading the whole log.
+    """
+
+    def __init__(self, stream, index=None, *, index_interval=INDEX_INTERVAL):
+        """Create a :class:`BinaryLog`.
+
+        `index` is an optional stream to write the index to.
+        `index_interval` is the (approximate) number of bytes between two checkpoints.
+        """
+        self.stream = stream
+        self.packer = msgpack.Packer()
+        self._module_ids = {}
+        self._thread_ids = {}
+        self._core_times = {}
+        self._core_chains = {}
+        self._offset = 0
+        self._index = index
+        self._indexed = index is not None
+        self._index_offset = 0
+        self._index_interval = index_interval
+        self._next_checkpoint = index_interval if index is not None else math.inf
+        self._write((_MAGIC, FORMAT_VERSION))
+        if index is not None:
+            self._write_index((_INDEX_MAGIC, FORMAT_VERSION))
+
+    def _write(self, data):
+        """Write data to the MessagePack file."""
+        packed = self.packer.pack(data)
+        self.stream.write(packed)
+        self._offset += len(packed)
+
+    def _write_index(self, data):
+        """Write data to the index."""
+        packed = self.packer.pack(data)
+        self._index.write(packed)
+        self._index_offset += len(packed)
+
+    @property
+    def offset(self):
+        """The number of bytes written to the log stream."""
+        return self._offset
+
+    @property
+    def index_offset(self):
+        """The number of bytes written to the index stream."""
+        return self._index_offset
+
+    def __getstate__(self):
+        """Return the state for :mod:`pickle`, without the streams.
+
+        The unpickled :class:`BinaryLog` writes nothing until it is resumed (see :meth:`resume`).
+        """
+        state = self.__dict__.copy()
+        del state['packer']
+        state['stream'] = None
+        state['_index'] = None
+        return state
+
+    def __setstate__(self, state):
+        """Restore the state from :mod:`pickle`."""
+        self.__dict__.update(state)
+        self.packer = msgpack.Packer()
+
+    def resume(self, stream, index=None):
+        """Continue writing to `stream` and `index`.
+
+        The streams must already contain what this :class:`BinaryLog` has written,
+        i.e. :attr:`offset` and :attr:`index_offset` bytes, e.g. from before a checkpoint
+        (see :mod:`schedsi.checkpoint`).
+        An index is required if and only if this :class:`BinaryLog` writes one.
+        """
+        if (index is None) == self._indexed:
+            raise RuntimeError('Cannot resume a binary log with a different index setup.')
+        self.stream = stream
+        self._index = index
+
+    def _declare(self, declaration):
+        """Write a declaration to the MessagePack file and the index."""
+        self._write(declaration)
+        if self._index is not None:
+            self._write_index(declaration)
+
+    def _checkpoint(self):
+        """Write a checkpoint of all :class:`Cores <schedsi.cpu.core.Core>` to the index."""
+        cores = [(uid, _encode_compact_time(self._core_times[uid]), chain)
+                 for uid, chain in self._core_chains.items()]
+        self._write_index((_Tag.checkpoint, self._offset, cores))
+        self._next_checkpoint = self._offset + self._index_interval
+
+    def _module_id(self, module):
+        """Return the ID of `module`.
+
+        Declares the :class:`~schedsi.module.Module` (and its parents) if necessary.
+        """
+        module_id = self._module_ids.get(module)
+        if module_id is None:
+            parent_id = None if module.parent is None else self._module_id(module.parent)
+            module_id = len(self._module_ids)
+            self._module_ids[module] = module_id
+            self._declare((_Tag.module, module_id, module.name, parent_id))
+        return module_id
+
+    def _thread_id(self, thread):
+        """Return the ID of `thread`.
+
+        Declares the :class:`~schedsi.threads.Thread` if necessary.
+        """
+        thread_id = self._thread_ids.get(thread)
+        if thread_id is None:
+            module_id = self._module_id(thread.module)
+            thread_id = len(self._thread_ids)
+            self._thread_ids[thread] = thread_id
+            self._declare((_Tag.thread, thread_id, module_id, thread.tid))
+        return thread_id
+
+    def _thread_ids_of(self, contexts):
+        """Return the IDs of the threads of `contexts`."""
+        return [self._thread_id(context.thread) for context in contexts]
+
+    def _encode(self, tag, cpu, *args):
+        """Encode an event and write data to the MessagePack file.
+
+        `args` are appended to the tag, the core's ID and the time difference.
+        """
+        if self._offset >= self._next_checkpoint:
+            self._checkpoint()
+        current_time = cpu.status.current_time
+        delta = current_time - self._core_times[cpu.uid]
+        self._core_times[cpu.uid] = current_time
+        self._write((tag, cpu.uid, _encode_compact_time(delta)) + args)
+
+    def init_core(self, cpu):
+        """Register a :class:`Core`."""
+        self._core_times[cpu.uid] = 0
+        chain = self._thread_ids_of(cpu.status.chain.contexts)
+        self._encode(_Tag.init_core, cpu, chain)
+        self._core_chains[cpu.uid] = chain
+
+    def context_switch(self, cpu, split_index, appendix, time):
+        """Log an context switch event."""
+        chain = self._core_chains[cpu.uid]
+        if appendix is None:
+            assert split_index is not None
+            self._encode(_Tag.context_split, cpu, split_index, _encode_compact_time(time))
+            del chain[split_index + 1:]
+        else:
+            assert split_index is None
+            thread_ids = self._thread_ids_of(appendix.contexts)
+            self._encode(_Tag.context_append, cpu, thread_ids, _encode_compact_time(time))
+            chain += thread_ids
+
+    def thread_execute(self, cpu, runtime):
+        """Log an thread execution event."""
+        self._encode(_Tag.thread_execute, cpu, _encode_compact_time(runtime))
+
+    def thread_yield(self, cpu):
+        """Log an thread yielded event."""
+        self._encode(_Tag.thread_yield, cpu)
+
+    def cpu_idle(self, cpu, idle_time):
+        """Log an CPU idle event."""
+        self._encode(_Tag.cpu_idle, cpu, _encode_compact_time(idle_time))
+
+    def timer_interrupt(self, cpu, idx, delay):
+        """Log an timer interrupt event."""
+        self._encode(_Tag.timer_interrupt, cpu, idx, _encode_compact_time(delay))
+
+    def _statistics(self, tag, stats):
+        """Write statistics and record their offset in the index."""
+        if self._index is not None:
+            self._write_index((tag, self._offset))
+        self._write((tag, stats))
+
+    def thread_statistics(self, stats):
+        """Log thread statistics."""
+        self._statistics(_Tag.thread_statistics, _encode_stats(stats))
+
+    def cpu_statistics(self, stats):
+        """Log CPU statistics."""
+        self._statistics(_Tag.cpu_statistics, list(map(_encode_stats, stats)))
+
+
+class LegacyBinaryLog:
+    """Binary logger using MessagePack.
+
+    This writes the original format (version 1),
+    in which every entry is a self-contained map.
+    """
 
     def __init__(self, stream):
-        """Create a :class:`BinaryLog`."""
+        """Create a :class:`LegacyBinaryLog`."""
         self.stream = stream
         self.packer = msgpack.Packer()
 
@@ -380,10 +629,315 @@ def _decode_stats(stats):
     return stats
 
 
-def replay(binary, log):
-    """Play a MessagePack file to another log."""
+def _decode_compact_time(entry):
+    """Decode :class:`~schedsi.cpu.time.Time` from the compact format."""
+    if isinstance(entry, int):
+        return Time(entry)
+    return Time(*entry)
+
+
+def _unpacker(binary):
+    """Return a :class:`msgpack.Unpacker` for `binary`."""
+    return msgpack.Unpacker(binary, read_size=16 * 1024, encoding='utf-8', use_list=False)
+
+
+def _open(binary):
+    """Start reading a MessagePack file.
+
+    Returns a tuple of the format version and an iterator over the entries.
+    """
+    entries = _unpacker(binary)
+    first = next(entries, None)
+    if isinstance(first, tuple) and len(first) == 2 and first[0] == _MAGIC:
+        if first[1] != FORMAT_VERSION:
+            raise RuntimeError('Unsupported binary log version ' + str(first[1]))
+        return FORMAT_VERSION, entries
+    if first is None:
+        return 1, entries
+    return 1, itertools.chain([first], entries)
+
+
+#: The contents of an index written by :class:`BinaryLog`
+#:
+#: `declarations` is a list of the :class:`~schedsi.module.Module` and
+#: :class:`~schedsi.threads.Thread` declarations,
+#: `checkpoints` a list of (offset, cores) tuples ordered by offset and
+#: `statistics` maps the tags of the statistics entries to their offset.
+Index = collections.namedtuple('Index', 'declarations checkpoints statistics')
+
+
+def read_index(index):
+    """Read the index written by a :class:`BinaryLog` from the stream `index`.
+
+    Returns an :class:`Index`.
+    """
+    entries = _unpacker(index)
+    header = next(entries, None)
+    if not (isinstance(header, tuple) and len(header) == 2 and header[0] == _INDEX_MAGIC):
+        raise RuntimeError('Not a binary log index')
+    if header[1] != FORMAT_VERSION:
+        raise RuntimeError('Unsupported binary log index version ' + str(header[1]))
+    declarations = []
+    checkpoints = []
+    statistics = {}
+    for entry in entries:
+        tag = entry[0]
+        if tag == _Tag.checkpoint:
+            checkpoints.append(entry[1:])
+        elif tag in (_Tag.thread_statistics, _Tag.cpu_statistics):
+            statistics[tag] = entry[1]
+        else:
+            declarations.append(entry)
+    return Index(declarations, checkpoints, statistics)
+
+
+class _EndOfWindow(Exception):
+    """Raised by :class:`_TimeWindow` when all cores are past its end."""
+    pass
+
+
+class _TimeWindow:
+    """Log proxy forwarding only the events within a time window.
+
+    A :class:`Core`'s :meth:`init_core` is forwarded right before its first event
+    within the window, so the log receives the context chain at that point.
+    """
+
+    def __init__(self, log, start, end):
+        """Create a :class:`_TimeWindow`.
+
+        The window is half-open, i.e. events at `end` are not within the window.
+        `start` and `end` may be `None` for an open window.
+        """
+        self._log = log
+        self._start = start
+        self._end = end
+        self._cores = set()
+        self._active = set()
+        self._done = set()
+
+    def _forward(self, cpu):
+        """Return whether an event of `cpu` at its current time is within the window."""
+        time = cpu.status.current_time
+        if self._end is not None and time >= self._end:
+            self._done.add(cpu.uid)
+            if self._done == self._cores:
+                raise _EndOfWindow()
+            return False
+        if self._start is not None and time < self._start:
+            return False
+        if cpu.uid not in self._active:
+            self._active.add(cpu.uid)
+            self._log.init_core(cpu)
+        return True
+
+    def init_core(self, cpu):
+        """Register a :class:`Core`."""
+        self._cores.add(cpu.uid)
+
+    def context_switch(self, cpu, split_index, appendix, time):
+        """Log an context switch event."""
+        if self._forward(cpu):
+            self._log.context_switch(cpu, split_index, appendix, time)
+
+    def thread_execute(self, cpu, runtime):
+        """Log an thread execution event."""
+        if self._forward(cpu):
+            self._log.thread_execute(cpu, runtime)
+
+    def thread_yield(self, cpu):
+        """Log an thread yielded event."""
+        if self._forward(cpu):
+            self._log.thread_yield(cpu)
+
+    def cpu_idle(self, cpu, idle_time):
+        """Log an CPU idle event."""
+        if self._forward(cpu):
+            self._log.cpu_idle(cpu, idle_time)
+
+    def timer_interrupt(self, cpu, idx, delay):
+        """Log an timer interrupt event."""
+        if self._forward(cpu):
+            self._log.timer_interrupt(cpu, idx, delay)
+
+    def thread_statistics(self, stats):
+        """Log thread statistics."""
+        self._log.thread_statistics(stats)
+
+    def cpu_statistics(self, stats):
+        """Log CPU statistics."""
+        self._log.cpu_statistics(stats)
+
+
+def replay(binary, log, start=None, end=None, *, index=None):
+    """Play a MessagePack file to another log.
+
+    If `start` or `end` are set, only the events at or after `start` and before `end`
+    are played. The statistics are played regardless.
+
+    `index` is an optional stream containing the index written along with `binary`
+    (see :class:`BinaryLog`), or an :class:`Index`.
+    With it, replay starts at the last checkpoint before `start`,
+    which requires `binary` to be seekable.
+    """
+    window_log = log
+    if start is not None or end is not None:
+        window_log = _TimeWindow(log, start, end)
+    if index is not None:
+        if not isinstance(index, Index):
+            index = read_index(index)
+        try:
+            _replay_indexed(binary, window_log, index, start)
+        except _EndOfWindow:
+            _replay_indexed_statistics(binary, log, index)
+        return
+    version, entries = _open(binary)
+    try:
+        if version == 1:
+            _replay_legacy(entries, window_log)
+        else:
+            _CompactReplay().replay(entries, window_log)
+    except _EndOfWindow:
+        _replay_statistics(version, entries, log)
+
+
+def _replay_statistics(version, entries, log):
+    """Play only the statistics of `entries` to `log`.
+
+    This is used to skip the events after the end of a time window.
+    """
+    for entry in entries:
+        if version == 1:
+            tag = entry['type']
+            if tag == _EntryType.thread_statistics.name:
+                log.thread_statistics(_decode_stats(entry['stats']))
+            elif tag == _EntryType.cpu_statistics.name:
+                log.cpu_statistics(map(_decode_stats, entry['stats']))
+        elif entry[0] == _Tag.thread_statistics:
+            log.thread_statistics(_decode_stats(entry[1]))
+        elif entry[0] == _Tag.cpu_statistics:
+            log.cpu_statistics(map(_decode_stats, entry[1]))
+
+
+def _replay_indexed_statistics(binary, log, index):
+    """Play the statistics of a MessagePack file in the compact format to `log`.
+
+    The statistics are read directly at the offsets in the `index`,
+    which requires `binary` to be seekable.
+    """
+    for offset in sorted(index.statistics.values()):
+        binary.seek(offset)
+        _replay_statistics(FORMAT_VERSION, itertools.islice(_unpacker(binary), 1), log)
+
+
+def _replay_indexed(binary, log, index, start):
+    """Play a MessagePack file in the compact format from the last checkpoint before `start`.
+
+    See :func:`replay`.
+    """
+    replayer = _CompactReplay()
+    for declaration in index.declarations:
+        replayer.declare(declaration)
+
+    checkpoint = None
+    if start is not None:
+        for offset, cores in index.checkpoints:
+            # all events before the checkpoint must come before `start`
+            if any(_decode_compact_time(time) >= start for _, time, _ in cores):
+                break
+            checkpoint = (offset, cores)
+
+    if checkpoint is None:
+        binary.seek(0)
+        version, entries = _open(binary)
+        assert version == FORMAT_VERSION
+    else:
+        offset, cores = checkpoint
+        binary.seek(offset)
+        entries = _unpacker(binary)
+        for uid, time, thread_ids in cores:
+            replayer.restore_core(log, uid, _decode_compact_time(time), thread_ids)
+    replayer.replay(entries, log)
+
+
+class _CompactReplay:
+    """Replay state for the compact format.
+
+    This keeps the declared :class:`Modules <_Module>` and :class:`Threads <_Thread>`,
+    as well as the emulated :class:`Cores <_Core>`.
+    """
+
+    def __init__(self):
+        """Create a :class:`_CompactReplay`."""
+        self.modules = {}
+        self.contexts = {}
+        self.cores = {}
+
+    def declare(self, entry):
+        """Process a :class:`~schedsi.module.Module` or :class:`~schedsi.threads.Thread` \
+        declaration."""
+        if entry[0] == _Tag.module:
+            _, module_id, name, parent_id = entry
+            module = _Module(name)
+            if parent_id is not None:
+                module.parent = self.modules[parent_id]
+            self.modules[module_id] = module
+        else:
+            assert entry[0] == _Tag.thread
+            _, thread_id, module_id, tid = entry
+            self.contexts[thread_id] = _CPUContext(_Thread(tid, self.modules[module_id]))
+
+    def restore_core(self, log, uid, time, thread_ids):
+        """Create a :class:`_Core` with the specified state and register it with `log`."""
+        if uid in self.cores:
+            raise RuntimeError('init_core found twice for same core')
+        cpu = _Core(uid, _CPUStatus(time))
+        cpu.status.chain.contexts = [self.contexts[thread_id] for thread_id in thread_ids]
+        self.cores[uid] = cpu
+        log.init_core(cpu)
+
+    def replay(self, entries, log):
+        """Play `entries` to `log`."""
+        contexts = self.contexts
+        cores = self.cores
+        for entry in entries:
+            tag = entry[0]
+            if tag in (_Tag.module, _Tag.thread):
+                self.declare(entry)
+            elif tag == _Tag.thread_statistics:
+                log.thread_statistics(_decode_stats(entry[1]))
+            elif tag == _Tag.cpu_statistics:
+                log.cpu_statistics(map(_decode_stats, entry[1]))
+            elif tag == _Tag.init_core:
+                _, uid, time, thread_ids = entry
+                self.restore_core(log, uid, _decode_compact_time(time), thread_ids)
+            else:
+                cpu = cores[entry[1]]
+                cpu.status.current_time += _decode_compact_time(entry[2])
+                if tag == _Tag.context_split:
+                    split_index = entry[3]
+                    log.context_switch(cpu, split_index, None, _decode_compact_time(entry[4]))
+                    del cpu.status.chain.contexts[split_index + 1:]
+                elif tag == _Tag.context_append:
+                    appendix = _ContextChain([contexts[thread_id] for thread_id in entry[3]])
+                    log.context_switch(cpu, None, appendix, _decode_compact_time(entry[4]))
+                    cpu.status.chain.contexts += appendix.contexts
+                elif tag == _Tag.thread_execute:
+                    log.thread_execute(cpu, _decode_compact_time(entry[3]))
+                elif tag == _Tag.thread_yield:
+                    log.thread_yield(cpu)
+                elif tag == _Tag.cpu_idle:
+                    log.cpu_idle(cpu, _decode_compact_time(entry[3]))
+                elif tag == _Tag.timer_interrupt:
+                    log.timer_interrupt(cpu, entry[3], _decode_compact_time(entry[4]))
+                else:
+                    print('Unknown entry:', entry)
+
+
+def _replay_legacy(entries, log):
+    """Play entries in the original format to another log."""
     contexts = {}
-    for entry in msgpack.Unpacker(binary, read_size=16 * 1024, encoding='utf-8', use_list=False):
+    for entry in entries:
         event = _decode_generic_event(entry)
         if event is not None:
             if event.event == _Event.init_core.name:
@@ -421,8 +975,93 @@ def replay(binary, log):
             print('Unknown entry:', entry)
 
 
-def get_thread_statistics(binary):
-    """Read thread statistics from a MessagePack file."""
-    for entry in msgpack.Unpacker(binary, read_size=16 * 1024, encoding='utf-8', use_list=False):
-        if entry['type'] == _EntryType.thread_statistics.name:
-            return entry['stats']
+class _EndTime:
+    """Log recording the time the last event ends."""
+
+    def __init__(self):
+        """Create a :class:`_EndTime`."""
+        self.time = None
+
+    def _update(self, cpu, duration=0):
+        """Record an event of `cpu` lasting `duration`."""
+        time = cpu.status.current_time + duration
+        if self.time is None or time > self.time:
+            self.time = time
+
+    def init_core(self, cpu):
+        """Register a :class:`Core`."""
+        self._update(cpu)
+
+    def context_switch(self, cpu, _split_index, _appendix, time):
+        """Log an context switch event."""
+        self._update(cpu, time)
+
+    def thread_execute(self, cpu, runtime):
+        """Log an thread execution event."""
+        self._update(cpu, runtime)
+
+    def thread_yield(self, cpu):
+        """Log an thread yielded event."""
+        self._update(cpu)
+
+    def cpu_idle(self, cpu, idle_time):
+        """Log an CPU idle event."""
+        self._update(cpu, idle_time)
+
+    def timer_interrupt(self, cpu, _idx, _delay):
+        """Log an timer interrupt event."""
+        self._update(cpu)
+
+    def thread_statistics(self, stats):
+        """Log thread statistics."""
+        pass
+
+    def cpu_statistics(self, stats):
+        """Log CPU statistics."""
+        pass
+
+
+def get_end_time(binary, *, index=None):
+    """Return the time the last event in a MessagePack file ends.
+
+    Returns `None` if there are no events.
+
+    `index` is an optional stream containing the index written along with `binary`
+    (see :class:`BinaryLog`), or an :class:`Index`.
+    With it, only the events after the last checkpoint are read,
+    which requires `binary` to be seekable.
+    """
+    end_time = _EndTime()
+    if index is not None:
+        if not isinstance(index, Index):
+            index = read_index(index)
+        # start at the last checkpoint
+        _replay_indexed(binary, end_time, index, math.inf)
+    else:
+        replay(binary, end_time)
+    return end_time.time
+
+
+def get_thread_statistics(binary, *, index=None):
+    """Read thread statistics from a MessagePack file.
+
+    `index` is an optional stream containing the index written along with `binary`
+    (see :class:`BinaryLog`), or an :class:`Index`.
+    With it, the statistics are read directly, which requires `binary` to be seekable.
+    """
+    if index is not None:
+        if not isinstance(index, Index):
+            index = read_index(index)
+        offset = index.statistics.get(_Tag.thread_statistics)
+        if offset is None:
+            return None
+        binary.seek(offset)
+        return _decode_stats(next(_unpacker(binary))[1])
+
+    version, entries = _open(binary)
+    for entry in entries:
+        if version == 1:
+            if entry['type'] == _EntryType.thread_statistics.name:
+                return _decode_stats(entry['stats'])
+        elif entry[0] == _Tag.thread_statistics:
+            return _decode_stats(entry[1])
@@ -1,6 +1,7 @@
 #!/usr/bin/env python3
 """Defines the :class:`GraphLog`."""
 
+import math
 import pyx
 
 
@@ -26,6 +27,8 @@ TEXT_ATTR = [pyx.text.mathmode, pyx.text.halign.boxcenter, pyx.color.rgb.black]
 
 # height in graph for context switch
 LEVEL = 3
+# distance between the labels on the time axis
+TICK = 5
 
 
 class _Background:  # pylint: disable=too-few-public-methods
@@ -54,6 +57,9 @@ class GraphLog:
 
     Finally we have a list of active background tasks,
     so that we can draw a single contiguous block when the children finish.
+
+    The graph starts at the time of the first registered :class:`Core`,
+    which need not be at the start of the simulation (see :meth:`init_core`).
     """
 
     def __init__(self, *, text_scale=1, exec_colors=None, bg_colors=None, name_module=True):
@@ -63,6 +69,7 @@ class GraphLog:
         self.canvas = pyx.canvas.canvas()
         self.top = pyx.canvas.canvas()
         self.cursor = [0, 0]
+        self.origin = None
         self.level = 0
         self.background_tasks = []
         self.task_executed = False
@@ -106,10 +113,13 @@ class GraphLog:
         path = pyx.path.path(pyx.path.moveto(0, 0), pyx.path.rlineto(self.cursor[0], 0))
         canvas.stroke(path, [pyx.style.linecap.square, pyx.style.linewidth.THICk,
                              pyx.color.rgb.black])
-        for point in range(0, int(self.cursor[0] + 1), 5):
+        origin = self.origin or 0
+        first_tick = math.ceil(origin / TICK) * TICK
+        for tick in range(first_tick, math.floor(origin + self.cursor[0]) + 1, TICK):
+            point = float(tick - origin)
             line = pyx.path.line(point, 0, point, -0.5)
             canvas.stroke(line, [pyx.style.linewidth.THICk, pyx.color.rgb.black])
-            canvas.text(point, -1.1, point, self.text_attr)
+            canvas.text(point, -1.1, tick, self.text_attr)
 
         # and done
         canvas.writeSVGfile(stream)
@@ -277,9 +287,24 @@ class GraphLog:
         self.top.text(*self.cursor, self._name_thread(thread), self.text_attr)
         self._move(0, -LEVEL - 0.5)
 
-    def init_core(self, _cpu):
-        """Register a :class:`Core`."""
-        pass
+    def init_core(self, cpu):
+        """Register a :class:`Core`.
+
+        The graph starts at the current time of the first :class:`Core`.
+        If its context chain spans multiple modules, e.g. when replaying a time window,
+        the threads at the module-borders become active background tasks.
+        """
+        if self.origin is not None:
+            return
+        self.origin = cpu.status.current_time
+
+        current = cpu.status.chain.bottom
+        for ctx in cpu.status.chain.contexts[1:]:
+            if ctx.thread.module is not current.module:
+                self.background_tasks.append(_Background(current, 0))
+            current = ctx.thread
+        self.level = len(self.background_tasks) * LEVEL
+        self._move(0, self.level)
 
     def context_switch(self, cpu, split_index, appendix, time):
         """Log an context switch event."""
@@ -160,4 +160,8 @@ class TextLog:
         for sstats, core in zip(sorted(stat.items() for stat in stats), itertools.count()):
             self.stream.write('Core {}\n'.format(core))
             for name, stat in sorted(sstats):
-                self.stream.write('\t{}: {}\n'.format(name, self.intify(stat)))
+                if isinstance(stat, dict):
+                    stat = self.to_json(stat, '\n\t')
+                else:
+                    stat = self.intify(stat)
+                self.stream.write('\t{}: {}\n'.format(name, stat))
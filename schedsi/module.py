@@ -33,14 +33,20 @@ class Module:
         This is called when a parent adds a :class:`~schedsi.threads.VCPUThread`
         to schedule this module.
 
+        Multiple VCPUs are only supported for :class:`Cores <schedsi.cpu.core.Core>`.
+        Each of them gets their own scheduler thread, sharing the scheduler.
+
         Returns the scheduler thread.
         """
-        if len(self._vcpus) == 1:
-            raise RuntimeError('Does not support more than 1 vcpu yet.')
+        if self._vcpus and not isinstance(vcpu, core.Core):
+            raise RuntimeError('Does not support more than 1 vcpu for child modules yet.')
         if not isinstance(vcpu, (threads.VCPUThread, core.Core)):
             print(self.name, 'expected a VCPU, got', type(vcpu).__name__, '.', file=sys.stderr)
-        self._vcpus.append((vcpu, self._scheduler_thread))
-        return self._scheduler_thread
+        scheduler_thread = self._scheduler_thread
+        if self._vcpus:
+            scheduler_thread = scheduler_thread.fork('scheduler' + str(len(self._vcpus)))
+        self._vcpus.append((vcpu, scheduler_thread))
+        return scheduler_thread
 
     def attach_module(self, child):
         """Attach a child module."""
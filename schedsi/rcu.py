@@ -18,10 +18,35 @@ class RCU:
         Updates can only happen through :class:`RCUCopy` and :meth:`apply`.
         Updates are protected via an "update" id that signifies when the
         RCU data has been updated.
+
+        Until :meth:`share` is called, there is only a single reader and writer.
+        :meth:`copy` then hands out the contained data itself instead of a copy,
+        so updates happen in place and cannot conflict.
         """
         self._uid = 0
         self._data = data
         self._lock = threading.Lock()
+        self._shared = False
+
+    def __getstate__(self):
+        """Return the state for :mod:`pickle`, without the lock."""
+        state = self.__dict__.copy()
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state):
+        """Restore the state from :mod:`pickle`."""
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def share(self):
+        """Allow multiple readers and writers.
+
+        From then on :meth:`copy` actually copies the data
+        and concurrent updates are detected.
+        """
+        with self._lock:
+            self._shared = True
 
     def _changed(self):
         """Update :attr:`uid:`."""
@@ -35,12 +60,20 @@ class RCU:
         """Return the contained data. \
         Do not modify.
         """
+        if not self._shared:
+            return self._data
         return self.copy().data
 
     def copy(self):
-        """Obtain an :class:`RCUCopy` of the contained data."""
+        """Obtain an :class:`RCUCopy` of the contained data.
+
+        If the :class:`RCU` is not shared, the :class:`RCUCopy` contains the data itself.
+        """
+        if not self._shared:
+            return RCUCopy(self._uid, self._data)
         with self._lock:
-            return RCUCopy(self)
+            # FIXME: deepcopy?
+            return RCUCopy(self._uid, copy.copy(self._data))
 
     def update(self, new):
         """Update the data via an :class:`RCUCopy`.
@@ -48,7 +81,13 @@ class RCU:
         Returns a flag indicating success.
         On failure you typically want to obtain a fresh :class:`RCUCopy`
         and reapply your modifications to try again.
+        Updates of an unshared :class:`RCU` always succeed.
         """
+        if not self._shared:
+            assert new.data is self._data
+            self._changed()
+            new._uid = self._uid
+            return True
         with self._lock:
             if self._uid != new._uid:
                 return False
@@ -59,6 +98,10 @@ class RCU:
 
     def apply(self, updater):
         """Apply a transformation to the contained data."""
+        if not self._shared:
+            ret = updater(self._data)
+            self._changed()
+            return ret
         with self._lock:
             ret = updater(self._data)
             self._changed()
@@ -69,7 +112,7 @@ class RCU:
 
         Do not modify the data with the looker.
         """
-        return looker(self.copy().data)
+        return looker(self.read())
 
 
 class RCUCopy:  # pylint: disable=too-few-public-methods
@@ -77,15 +120,16 @@ class RCUCopy:  # pylint: disable=too-few-public-methods
 
     Uses :mod:`copy` to do a *shallow copy* of the data,
     so take care that you do not accidentally modify shared references.
+    For an unshared :class:`RCU` the data is not copied at all.
 
     Contained :attr:`data` can be freely modified
     and should be written back via :meth:`RCU.update`.
     """
 
-    def __init__(self, rcu):
-        """Create a :class:`RCUCopy`."""
-        # pylint: disable=protected-access
-        assert rcu._lock.locked
-        self._uid = rcu._uid
-        # FIXME: deepcopy?
-        self.data = copy.copy(rcu._data)
+    def __init__(self, uid, data):
+        """Create a :class:`RCUCopy`.
+
+        This is done by :meth:`RCU.copy`.
+        """
+        self._uid = uid
+        self.data = data
@@ -6,36 +6,39 @@ from schedsi.cpu.request import Request as CPURequest, Type as CPURequestType
 from ..scheduler import Scheduler
 
 
-_PENALTY_SCHEDULER_CLASS_TEMPLATE = """\
-from schedsi.schedulers.addons import addon
-import {addon_cls_module}
-import {scheduler_cls_module}
-
-class {typename}Meta(type):
-    '''Metaclass of :class:`{typename}`.
-
-    Provides a custom method resolution order.
-    '''
-    def mro(cls):
-        'Return the mro of :class:`{typename}`.'
-        order = super().mro()
-        # put AddonSchedulerBase just before Scheduler
-        base = order.index(addon.AddonSchedulerBase)
-        superbaseidx = order.index(addon.AddonSchedulerBase.__base__)
-        order = order[:base] + order[base + 1:superbaseidx] \\
-              + [addon.AddonSchedulerBase] + order[superbaseidx:]
-        return order
-
-
-class {typename}(addon.AddonScheduler, {scheduler_cls_module}.{scheduler_cls},
-                 metaclass={typename}Meta):
-    ':class:`{scheduler_cls}` with :class:`~{addon_cls}` attached.'
-
-    def __init__({init_args}):
-        'Create a :class:`{typename}`.'
-        super().__init__({scheduler_forward}, {addon_cls_module}.{addon_cls}(self, {addon_forward}),
-                         {scheduler_kwforward})
-"""
+# (typename, addon class, scheduler class) -> scheduler class with addon attached
+_ATTACHED_CLASSES = {}
+
+
+# tuple of addon data classes -> class joining them
+_ADDON_DATA_CLASSES = {}
+
+
+def _addon_data_class(addon_data):
+    """Return a class joining all the classes in the tuple `addon_data`.
+
+    See :meth:`Addon.transmute_rcu_data`.
+    The class is cached, so its instances can be pickled.
+    """
+    result = _ADDON_DATA_CLASSES.get(addon_data)
+    if result is not None:
+        return result
+
+    class AddonData(*addon_data):  # pylint: disable=too-few-public-methods
+        """Joins all `addon_data` into one class."""
+
+        def __reduce__(self):
+            """Pickle the joined classes instead of this local class."""
+            return _new_addon_data, (addon_data,), self.__dict__
+
+    _ADDON_DATA_CLASSES[addon_data] = AddonData
+    return AddonData
+
+
+def _new_addon_data(addon_data):
+    """Create an uninitialized instance of the class joining `addon_data` for :mod:`pickle`."""
+    cls = _addon_data_class(addon_data)
+    return cls.__new__(cls)
 
 
 class AddonSchedulerBase(Scheduler):
@@ -70,16 +73,29 @@ class AddonSchedulerBase(Scheduler):
         return rcu_copy, rcu_copy.data.ready_chains, idx
 
 
-class AddonScheduler(AddonSchedulerBase):
+class AddonScheduler(Scheduler):
     """Scheduler with addon.
 
     This can be used to add scheduler addons via multiple inheritance.
-    A metaclass is required to implement the desired MRO. Use :meth:`Addon.attach`
-    to generate a scheduler-class with an addon attached.
+    Use :meth:`Addon.attach` to generate a scheduler-class with an addon attached.
+    Its bases are this class, the scheduler-class and :class:`AddonSchedulerBase`,
+    so :class:`AddonSchedulerBase` ends up just before :class:`Scheduler` in the MRO.
+
+    The :attr:`addon_cls` is instantiated with the keyword arguments in :attr:`addon_params`,
+    the other arguments are forwarded to the scheduler.
     """
 
-    def __init__(self, module, addon, *args, **kwargs):
-        """Create a :class:``."""
+    #: The :class:`Addon` class to attach
+    addon_cls = None
+    #: The names of the keyword arguments for :attr:`addon_cls`
+    addon_params = frozenset()
+    #: Whether :attr:`addon_cls` overrides :meth:`Addon.repeat`
+    addon_repeats = False
+
+    def __init__(self, module, *args, **kwargs):
+        """Create a :class:`AddonScheduler`."""
+        addon_kwargs = {name: kwargs.pop(name) for name in self.addon_params if name in kwargs}
+        addon = self.addon_cls(self, **addon_kwargs)  # pylint: disable=not-callable
         super().__init__(module, *args, **kwargs)
         self.addon = addon
         addon.transmute_rcu_data(self._rcu._data)
@@ -89,6 +105,13 @@ class AddonScheduler(AddonSchedulerBase):
         # FIXME: this should probably be in a rcu_copy though
         self._prev_run_time = 0
 
+    def add_vcpu(self):
+        """See :meth:`Scheduler.add_vcpu`.
+
+        Addons keep per-decision state in the scheduler, so this is not supported.
+        """
+        raise RuntimeError('Schedulers with addons do not support multiple VCPUs.')
+
     def add_thread(self, thread, rcu_data=None, **kwargs):
         """See :meth:`Scheduler.add_thread`."""
         super_add_thread = super().add_thread
@@ -106,6 +129,8 @@ class AddonScheduler(AddonSchedulerBase):
         And set it up if so.
         """
         self._repeat = (None, None)
+        if not self.addon_repeats:
+            return
 
         rcu_copy = self._start_schedule_rcu_copy
         if rcu_copy is None:
@@ -175,15 +200,15 @@ class AddonScheduler(AddonSchedulerBase):
             if self._repeat[0] is not None:
                 # block repeating
                 self.addon.repeat(rcu_copy.data, 0, True)
-            return
+            return None, None
 
         schedule = super()._schedule(idx, time_slice, next_ready_time, rcu_copy)
         answer = None
         while True:
             try:
                 request = schedule.send(answer)
-            except StopIteration:
-                break
+            except StopIteration as decision:
+                return decision.value
 
             if request.rtype == CPURequestType.timer:
                 delta = None
@@ -218,11 +243,15 @@ class Addon():
 
         A new class named `typename` is returned, which represents the `scheduler_cls`
         with the addon attached.
+        The class is cached, so attaching the same addon to the same scheduler-class
+        under the same name again returns the same class.
         """
-        signature = inspect.signature(cls.__init__)
-        init_args = ', '.join(map(str, signature.parameters.values())) + ', **kwargs'
+        key = (typename, cls, scheduler_cls)
+        result = _ATTACHED_CLASSES.get(key)
+        if result is not None:
+            return result
 
-        parameters = signature.parameters.copy()
+        parameters = inspect.signature(cls.__init__).parameters.copy()
         # pop self-parameter
         parameters.popitem(0)
         # pop *args
@@ -232,29 +261,23 @@ class Addon():
         if any(arg.kind is inspect.Parameter.VAR_KEYWORD for arg in parameters.values()):
             raise NotImplementedError('**kwargs for addon parameters not implemented.')
 
-        addon_forward = ', '.join(param.name + '=' + param.name for param in parameters.values())
-
-        # this mirrors how the pure-python stdlib does dynamic class creation
-        class_definition = _PENALTY_SCHEDULER_CLASS_TEMPLATE.format(
-            typename=typename,
-            addon_cls_module=cls.__module__,
-            addon_cls=cls.__name__,
-            scheduler_cls_module=scheduler_cls.__module__,
-            scheduler_cls=scheduler_cls.__name__,
-            init_args=init_args,
-            scheduler_forward='*args',
-            scheduler_kwforward='**kwargs',
-            addon_forward=addon_forward,
-        )
-        namespace = {'__name__': 'schedaddon_' + typename}
-        exec(class_definition, namespace)  # pylint: disable=exec-used
-        result = namespace[typename]
-        result._source = class_definition
+        bases = (AddonScheduler, scheduler_cls, AddonSchedulerBase)
+        if scheduler_cls is Scheduler:
+            bases = (AddonScheduler, AddonSchedulerBase)
+        namespace = {
+            '__doc__': ':class:`{}` with :class:`~{}` attached.'.format(scheduler_cls.__name__,
+                                                                      cls.__name__),
+            'addon_cls': cls,
+            'addon_params': frozenset(parameters.keys()),
+            'addon_repeats': cls.repeat is not Addon.repeat,
+        }
         try:
-            result.__module__ = sys._getframe(1).f_globals.get('__name__', '__main__')  # pylint: disable=protected-access
+            namespace['__module__'] = sys._getframe(1).f_globals.get('__name__', '__main__')  # pylint: disable=protected-access
         except (AttributeError, ValueError):
             pass
+        result = type(typename, bases, namespace)
 
+        _ATTACHED_CLASSES[key] = result
         return result
 
     def transmute_rcu_data(self, original, *addon_data):  # pylint: disable=no-self-use
@@ -268,11 +291,7 @@ class Addon():
         if len(addon_data) == 0:
             return
 
-        class AddonData(*addon_data):  # pylint: disable=too-few-public-methods
-            """Joins all `addon_data` into one class."""
-
-            pass
-        original.__class__ = AddonData
+        original.__class__ = _addon_data_class(addon_data)
         for data in addon_data:
             data.__init__(original)
 
@@ -315,8 +334,7 @@ class Addon():
 
         )
         The :class:`AddonScheduler` captures the :class:`requests <schedsi.cpu.request.Request>`
-        yielded from :meth:`Scheduler._schedule` to filter the resume-chain request and override
-        the timer request.
+        yielded from :meth:`Scheduler._schedule` to override the timer request.
         Care should be taken for the case the same chain is selected again.
         """
         return True, time_slice
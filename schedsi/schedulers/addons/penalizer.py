@@ -4,6 +4,7 @@
 Unlike the :class:`PenaltyTracker`, this addon only tracks time debt.
 """
 
+from schedsi import checks
 from . import time_slice_fixer
 from schedsi.cpu.time import Time
 
@@ -33,9 +34,9 @@ class Penalizer(time_slice_fixer.TimeSliceFixer):
 
         `block` is a function that takes the niceness of the scheduled thread
         as selected by the :class:`Scheduler`, a `dict` of the `niceness`es of all
-        ready threads and a `list` of :class:`Thread`-ids currently blocked and returns
+        ready threads and a `list` of :class:`Threads <Thread>` currently blocked and returns
         a `bool` indicating whether to block the selected :class:`Thread`.
-        The `dict` of `niceness`es has :class:`Thread`-id's as keys.
+        The `dict` of `niceness`es has the :class:`Threads <Thread>` as keys.
         """
         super().__init__(*args, override_time_slice=override_time_slice)
         assert tolerance <= 0
@@ -49,41 +50,40 @@ class Penalizer(time_slice_fixer.TimeSliceFixer):
         """See :meth:`Addon.add_thread`."""
         assert not thread in rcu_data.niceness
         if not thread.is_finished():
-            rcu_data.niceness[id(thread)] = 0
+            rcu_data.niceness[thread] = 0
 
     def start_schedule(self, prev_run_time, rcu_data, last_chain_queue, last_chain_idx):
         """See :meth:`Addon.start_schedule`."""
         super().start_schedule(prev_run_time, rcu_data, last_chain_queue, last_chain_idx)
         last_chain = self._get_last_chain(rcu_data, last_chain_queue, last_chain_idx)
         last_thread = last_chain and last_chain.bottom
-        last_id = id(last_thread)
 
         niceness = 0
-        if last_chain is not None and last_id not in rcu_data.sat_out_threads:
+        if last_chain is not None and last_thread not in rcu_data.sat_out_threads:
             if last_thread.is_finished():
-                last_niceness = rcu_data.niceness.pop(last_id)
+                last_niceness = rcu_data.niceness.pop(last_thread)
                 if last_niceness >= 0 and rcu_data.niceness:
                     niceness = max(rcu_data.niceness.values())
             elif rcu_data.last_time_slice is not None:
                 if prev_run_time == 0:
                     # probably was blocked by another addon
-                    rcu_data.sat_out_threads.append(last_id)
+                    rcu_data.sat_out_threads.append(last_thread)
                 else:
                     delta = rcu_data.last_time_slice - prev_run_time
                     if delta < 0:
-                        rcu_data.niceness[last_id] += delta
-                    niceness = rcu_data.niceness[last_id]
+                        rcu_data.niceness[last_thread] += delta
+                    niceness = rcu_data.niceness[last_thread]
         rcu_data.last_time_slice = None
 
         if rcu_data.sat_out_threads:
             assert last_chain
-            if last_id != rcu_data.sat_out_threads[-1]:
+            if last_thread != rcu_data.sat_out_threads[-1]:
                 assert prev_run_time > 0
-                for tid in rcu_data.sat_out_threads:
-                    if rcu_data.niceness[tid] < 0:
+                for thread in rcu_data.sat_out_threads:
+                    if rcu_data.niceness[thread] < 0:
                         # TODO: do we want to keep niceness <= 0 with min?
-                        rcu_data.niceness[tid] += min(-rcu_data.niceness[tid], prev_run_time)
-                        niceness = max(niceness, rcu_data.niceness[tid])
+                        rcu_data.niceness[thread] += min(-rcu_data.niceness[thread], prev_run_time)
+                        niceness = max(niceness, rcu_data.niceness[thread])
                 rcu_data.sat_out_threads.clear()
 
         # shift back to 0
@@ -92,8 +92,9 @@ class Penalizer(time_slice_fixer.TimeSliceFixer):
             if max_niceness >= niceness:
                 for k in rcu_data.niceness.keys():
                     rcu_data.niceness[k] -= max_niceness
-        assert not rcu_data.niceness or 0 in rcu_data.niceness.values()
-        assert all(v <= 0 for v in rcu_data.niceness.values())
+        if checks.ENABLED:
+            assert not rcu_data.niceness or 0 in rcu_data.niceness.values()
+            assert all(v <= 0 for v in rcu_data.niceness.values())
 
     def schedule(self, idx, time_slice, rcu_data):
         """See :meth:`TimeSliceFixer.schedule`.
@@ -104,16 +105,16 @@ class Penalizer(time_slice_fixer.TimeSliceFixer):
         if idx is None:
             return super().schedule(idx, time_slice, rcu_data)
 
-        tid = id(rcu_data.ready_chains[idx].bottom)
+        thread = rcu_data.ready_chains[idx].bottom
 
-        if tid in rcu_data.sat_out_threads:
+        if thread in rcu_data.sat_out_threads:
             # scheduler selected a thread that we wanted to stall again
             # allow it to run then
             # TODO: retry & count retries to self.max_retries
             rcu_data.sat_out_threads.clear()
         elif len(rcu_data.ready_chains) > 1:
-            if rcu_data.niceness[tid] < self.tolerance:
-                rcu_data.sat_out_threads.append(tid)
+            if rcu_data.niceness[thread] < self.tolerance:
+                rcu_data.sat_out_threads.append(thread)
                 # we don't set it to None because another addon may have
                 # repeated the thread previously, so we need to keep the time-slice
                 # rcu_data.last_time_slice = None
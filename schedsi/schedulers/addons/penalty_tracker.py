@@ -8,6 +8,8 @@ The Penalizer is however not perfectly suited for all configurations, due to the
 threads regain credit. This is likely not generally solvable with this limited addon interface.
 """
 
+from schedsi import checks
+from schedsi.cpu import time as cputime
 from . import time_slice_fixer
 
 
@@ -21,6 +23,15 @@ class PenaltyTrackerData():  # pylint: disable=too-few-public-methods
         self.niceness = {}
 
 
+def _block_worst(niceness, nicenesses, _blocked):
+    """Check if the thread with `niceness` should be blocked.
+
+    Default for :attr:`PenaltyTracker.block`: Just block the worst one.
+    """
+    worst = min(list(nicenesses.values()))
+    return worst != 0 and niceness == worst
+
+
 class PenaltyTracker(time_slice_fixer.TimeSliceFixer):
     """Penalty tracking scheduler-addon.
 
@@ -36,19 +47,13 @@ class PenaltyTracker(time_slice_fixer.TimeSliceFixer):
 
         `block` is a function that takes the niceness of the scheduled thread
         as selected by the :class:`Scheduler`, a `dict` of the `niceness`es of all
-        ready threads and a `list` of :class:`Thread`-ids currently blocked and returns
+        ready threads and a `list` of :class:`Threads <Thread>` currently blocked and returns
         a `bool` indicating whether to block the selected :class:`Thread`.
-        The `dict` of `niceness`es has :class:`Thread`-id's as keys.
+        The `dict` of `niceness`es has the :class:`Threads <Thread>` as keys.
         """
         super().__init__(*args, override_time_slice=override_time_slice)
         if block is None:
-            def block(niceness, nicenesses, _blocked):  # pylint: disable=function-redefined
-                """Check if `tid` should be blocked.
-
-                Default: Just block the worst one.
-                """
-                worst = min(list(nicenesses.values()))
-                return worst != 0 and niceness == worst
+            block = _block_worst
         self.block = block
 
     def transmute_rcu_data(self, original, *addon_data):  # pylint: disable=no-self-use
@@ -59,7 +64,7 @@ class PenaltyTracker(time_slice_fixer.TimeSliceFixer):
         """See :meth:`Addon.add_thread`."""
         assert not thread in rcu_data.niceness
         if not thread.is_finished():
-            rcu_data.niceness[id(thread)] = 0
+            rcu_data.niceness[thread] = 0
 
     def start_schedule(self, prev_run_time, rcu_data, last_chain_queue, last_chain_idx):
         """See :meth:`Addon.start_schedule`."""
@@ -71,31 +76,31 @@ class PenaltyTracker(time_slice_fixer.TimeSliceFixer):
             return
         last_chain = self._get_last_chain(rcu_data, last_chain_queue, last_chain_idx)
         last_thread = last_chain and last_chain.bottom
-        last_id = id(last_thread)
 
         niceness = 0
-        if last_chain is not None and last_id not in rcu_data.sat_out_threads:
+        if last_chain is not None and last_thread not in rcu_data.sat_out_threads:
             if last_thread.is_finished():
-                last_niceness = rcu_data.niceness.pop(last_id)
+                last_niceness = rcu_data.niceness.pop(last_thread)
                 if last_niceness >= 0 and rcu_data.niceness:
                     niceness = max(rcu_data.niceness.values())
             else:
                 if prev_run_time == 0:
                     # probably was blocked by another addon
-                    rcu_data.sat_out_threads.append(last_id)
+                    rcu_data.sat_out_threads.append(last_thread)
                 else:
-                    #rcu_data.niceness[last_id] += rcu_data.last_time_slice - prev_run_time
-                    rcu_data.niceness[last_id] += (rcu_data.last_time_slice - prev_run_time) / rcu_data.last_time_slice
-                    niceness = rcu_data.niceness[last_id]
+                    #rcu_data.niceness[last_thread] += rcu_data.last_time_slice - prev_run_time
+                    rcu_data.niceness[last_thread] += cputime.div(
+                        rcu_data.last_time_slice - prev_run_time, rcu_data.last_time_slice)
+                    niceness = rcu_data.niceness[last_thread]
 
         if rcu_data.sat_out_threads:
             assert last_chain
-            if last_id != rcu_data.sat_out_threads[-1]:
+            if last_thread != rcu_data.sat_out_threads[-1]:
                 assert prev_run_time > 0
-                for tid in rcu_data.sat_out_threads:
-                    #rcu_data.niceness[tid] += prev_run_time
-                    rcu_data.niceness[tid] += prev_run_time / rcu_data.last_time_slice
-                    niceness = max(niceness, rcu_data.niceness[tid])
+                for thread in rcu_data.sat_out_threads:
+                    #rcu_data.niceness[thread] += prev_run_time
+                    rcu_data.niceness[thread] += cputime.div(prev_run_time, rcu_data.last_time_slice)
+                    niceness = max(niceness, rcu_data.niceness[thread])
                 rcu_data.sat_out_threads.clear()
         rcu_data.last_time_slice = None
 
@@ -111,8 +116,9 @@ class PenaltyTracker(time_slice_fixer.TimeSliceFixer):
         if max_niceness is not None:
             for k in rcu_data.niceness.keys():
                 rcu_data.niceness[k] -= max_niceness
-        assert not rcu_data.niceness or 0 in rcu_data.niceness.values()
-        assert all(v <= 0 for v in rcu_data.niceness.values())
+        if checks.ENABLED:
+            assert not rcu_data.niceness or 0 in rcu_data.niceness.values()
+            assert all(v <= 0 for v in rcu_data.niceness.values())
 
     def schedule(self, idx, time_slice, rcu_data):
         """See :meth:`TimeSliceFixer.schedule`.
@@ -123,18 +129,17 @@ class PenaltyTracker(time_slice_fixer.TimeSliceFixer):
         if idx is None:
             return super().schedule(idx, time_slice, rcu_data)
 
-        tid = id(rcu_data.ready_chains[idx].bottom)
+        thread = rcu_data.ready_chains[idx].bottom
 
-        if tid in rcu_data.sat_out_threads:
+        if thread in rcu_data.sat_out_threads:
             # scheduler selected a thread that we wanted to stall again
             # allow it to run then
             # TODO: retry & count retries to self.max_retries
             rcu_data.sat_out_threads.clear()
         elif len(rcu_data.ready_chains) > 1:
-            nicenesses = {tid: rcu_data.niceness[tid] for tid in
-                          (id(t.bottom) for t in rcu_data.ready_chains)}
-            if self.block(nicenesses[tid], nicenesses, rcu_data.sat_out_threads):
-                rcu_data.sat_out_threads.append(tid)
+            nicenesses = {t.bottom: rcu_data.niceness[t.bottom] for t in rcu_data.ready_chains}
+            if self.block(nicenesses[thread], nicenesses, rcu_data.sat_out_threads):
+                rcu_data.sat_out_threads.append(thread)
                 # we don't set it to None because another addon may have
                 # repeated the thread previously, so we need to keep the time-slice
                 # rcu_data.last_time_slice = None
@@ -19,17 +19,49 @@ class CFSData(scheduler.SchedulerData):  # pylint: disable=too-few-public-method
         self.vruntimes = {}
         self.min_vruntime = None
         self.shares = {}
+        # the sum of the shares of the ready chains
+        self.ready_shares = 0
         # threads may have moved in the queues after _start_schedule()
         # these are the new indices
         self.waiting_idx = None
         self.ready_idx = None
 
 
+class _Vruntimes:  # pylint: disable=too-few-public-methods
+    """A sequence of the vruntimes of a list of chains.
+
+    This allows to :mod:`bisect` the chains without building a list of their vruntimes.
+    """
+
+    def __init__(self, chains, vruntimes, key=None):
+        """Create a :class:`_Vruntimes` sequence.
+
+        `key` is applied to each vruntime, if set.
+        """
+        self.chains = chains
+        self.vruntimes = vruntimes
+        self.key = key
+
+    def __len__(self):
+        """Return the number of chains."""
+        return len(self.chains)
+
+    def __getitem__(self, idx):
+        """Return the vruntime of the chain at `idx`."""
+        vruntime = self.vruntimes[self.chains[idx].bottom]
+        if self.key is not None:
+            return self.key(vruntime)
+        return vruntime
+
+
 class CFS(scheduler.Scheduler):
     """Completely Fair Scheduler.
 
     Both CFSData.ready_chains and CFSData.waiting_chains
-    are sorted by their vruntime.
+    are sorted by their vruntime, so previously executed chains are inserted by bisection.
+    Newly ready chains are inserted by a linear scan, as the ready queue
+    is not necessarily sorted after its head.
+    The sum of the shares of the ready chains is maintained in CFSData.ready_shares.
 
     This scheduler uses time-slices and can thus not be used outside
     the kernel with the single timer scheduling strategy.
@@ -121,6 +153,9 @@ class CFS(scheduler.Scheduler):
             # check if we need to update min_vruntime
             update_min_vruntime = rcu_data.min_vruntime < rcu_data.vruntimes[thread]
 
+            if last_queue is not rcu_data.ready_chains:
+                rcu_data.ready_shares -= rcu_data.shares[thread]
+
         if last_queue is rcu_data.waiting_chains:
             assert prev_run_time is not None
             rcu_data.waiting_idx = self._update_waiting(rcu_data.waiting_chains,
@@ -180,9 +215,10 @@ class CFS(scheduler.Scheduler):
         runtime = runtimes[chain.bottom]
 
         # treat None as a value bigger than runtime for bisection
-        idx = bisect.bisect([runtimes[c.bottom] or runtime + 1 for c in waiting_chains], runtime)
+        idx = bisect.bisect(_Vruntimes(waiting_chains, runtimes, lambda v: v or runtime + 1),
+                            runtime)
 
-        waiting_chains[idx:idx] = [chain]
+        waiting_chains.insert(idx, chain)
 
         return idx
 
@@ -196,7 +232,7 @@ class CFS(scheduler.Scheduler):
         Returns the index of the previously executed thread in `ready_chains`.
         """
         chain = ready_chains.pop(0)
-        idx = bisect.bisect([runtimes[c.bottom] for c in ready_chains], runtimes[chain.bottom])
+        idx = bisect.bisect(_Vruntimes(ready_chains, runtimes), runtimes[chain.bottom])
         if idx == 0 and len(ready_chains) > 1:
             # force reschedule
             idx = 1
@@ -219,7 +255,11 @@ class CFS(scheduler.Scheduler):
         if rcu_data.last_idx != 0:
             idx = 0
         def insertion_index(vruntime):
-            """Calculate insertion index for `vruntime`."""
+            """Calculate insertion index for `vruntime`.
+
+            The queue after `idx` is not necessarily sorted,
+            so this is a linear scan instead of a bisection.
+            """
             return next((i + 1 for i, c in enumerate(ready_chains[idx:])
                          if rcu_data.vruntimes[c.bottom] > vruntime), len(ready_chains))
         for chain in new_chains:
@@ -229,13 +269,30 @@ class CFS(scheduler.Scheduler):
                 vruntime = 0
             vruntime += rcu_data.min_vruntime
             rcu_data.vruntimes[chain.bottom] = vruntime
+            rcu_data.ready_shares += rcu_data.shares[chain.bottom]
             ready_chains.insert(insertion_index(vruntime), chain)
 
+    def _take_chain(self, rcu_data, idx):
+        """See :meth:`Scheduler._take_chain`.
+
+        This override removes the shares of the chain from the ready shares.
+        """
+        chain, token = super()._take_chain(rcu_data, idx)
+        rcu_data.ready_shares -= rcu_data.shares[chain.bottom]
+        return chain, token
+
+    def _return_chain(self, rcu_data, idx, chain, token):
+        """See :meth:`Scheduler._return_chain`.
+
+        This override adds the shares of the chain back to the ready shares.
+        """
+        super()._return_chain(rcu_data, idx, chain, token)
+        rcu_data.ready_shares += rcu_data.shares[chain.bottom]
+
     @staticmethod
     def _get_ratio(thread, rcu_data):
         """Calculate the share ratio of a thread."""
-        return Fraction(rcu_data.shares[thread], sum(rcu_data.shares[c.bottom]
-                                                     for c in rcu_data.ready_chains))
+        return Fraction(rcu_data.shares[thread], rcu_data.ready_shares)
 
     def _get_slice(self, thread, rcu_data):
         """Calculate the slice for the thread."""
@@ -2,10 +2,139 @@
 """Defines a multi-level feedback queue scheduler."""
 
 import itertools
+from schedsi import checks
 from schedsi.schedulers import scheduler
 from schedsi.cpu.request import Request as CPURequest
 
 
+def _first_level(bitmap, start=0):
+    """Return the lowest level with its bit set in `bitmap`, beginning at `start`.
+
+    Returns `None` if there is none.
+    """
+    bitmap = bitmap >> start << start
+    if not bitmap:
+        return None
+    return (bitmap & -bitmap).bit_length() - 1
+
+
+def _levels(bitmap):
+    """Return a generator yielding the levels with their bit set in `bitmap`, in order."""
+    while bitmap:
+        lowest = bitmap & -bitmap
+        yield lowest.bit_length() - 1
+        bitmap ^= lowest
+
+
+class _ConcatenatedQueue:
+    """A queue consisting of other queues, one after another.
+
+    A priority boost moves the queues of all levels to the top level.
+    Instead of copying the chains, the queues are concatenated lazily.
+    The queues are either :obj:`list`\\ s of ready chains
+    or :class:`~schedsi.schedulers.scheduler.WaitingChains`.
+
+    Chains are appended to the last queue.
+    Other queues are dropped once they are empty.
+    """
+
+    def __init__(self, queues):
+        """Create a :class:`_ConcatenatedQueue` of the non-empty `queues`."""
+        assert len(queues) > 1
+        self.queues = queues
+
+    def __len__(self):
+        """Return the number of chains."""
+        return sum(map(len, self.queues))
+
+    def __bool__(self):
+        """Return whether there are any chains."""
+        return any(self.queues)
+
+    def __iter__(self):
+        """Return an iterator over the chains, in queue order."""
+        return itertools.chain.from_iterable(self.queues)
+
+    def _locate(self, idx):
+        """Return the queue containing the chain at `idx` and the index within that queue."""
+        if idx < 0:
+            for queue in reversed(self.queues):
+                idx += len(queue)
+                if idx >= 0:
+                    return queue, idx
+        else:
+            for queue in self.queues:
+                if idx < len(queue):
+                    return queue, idx
+                idx -= len(queue)
+        raise IndexError('queue index out of range')
+
+    def _drop_empty(self):
+        """Remove empty queues, except for the last one."""
+        *queues, last = self.queues
+        self.queues = [queue for queue in queues if queue]
+        self.queues.append(last)
+
+    def __getitem__(self, idx):
+        """Return the chain at `idx`."""
+        queue, idx = self._locate(idx)
+        return queue[idx]
+
+    def __setitem__(self, idx, chain):
+        """Replace the chain at `idx`."""
+        queue, idx = self._locate(idx)
+        queue[idx] = chain
+
+    def append(self, chain):
+        """Append `chain`."""
+        self.queues[-1].append(chain)
+
+    def extend(self, chains):
+        """Append all `chains`."""
+        self.queues[-1].extend(chains)
+
+    def __iadd__(self, chains):
+        """Append all `chains`."""
+        self.extend(chains)
+        return self
+
+    def insert(self, idx, chain):
+        """Insert `chain` before `idx`."""
+        if idx >= len(self):
+            self.append(chain)
+            return
+        queue, idx = self._locate(idx)
+        queue.insert(idx, chain)
+
+    def pop(self, idx=-1):
+        """Remove and return the chain at `idx`."""
+        queue, idx = self._locate(idx)
+        chain = queue.pop(idx)
+        if not queue:
+            self._drop_empty()
+        return chain
+
+    def clear(self):
+        """Remove all chains."""
+        for queue in self.queues:
+            queue.clear()
+        del self.queues[:-1]
+
+    def next_waiting(self):
+        """See :meth:`WaitingChains.next_waiting() <scheduler.WaitingChains.next_waiting>`."""
+        candidates = filter(None, (queue.next_waiting() for queue in self.queues))
+        return min(candidates, key=lambda chain: chain.bottom.ready_time, default=None)
+
+    def pop_ready(self, time):
+        """See :meth:`WaitingChains.pop_ready() <scheduler.WaitingChains.pop_ready>`."""
+        ready = []
+        for queue in self.queues:
+            ready += queue.pop_ready(time)
+        if ready:
+            self._drop_empty()
+        return ready
+
+
 class MLFQData(scheduler.SchedulerData):  # pylint: disable=too-few-public-methods
     """Mutable data for the :class:`MLFQ` scheduler."""
 
@@ -21,10 +150,15 @@ class MLFQData(scheduler.SchedulerData):  # pylint: disable=too-few-public-metho
         # TODO: rr_index per ready_queue
         for _ in range(0, levels):
             self.ready_queues.append([])
-            self.waiting_queues.append([])
+            self.waiting_queues.append(scheduler.WaitingChains())
 
         assert not self.ready_chains
         self.ready_chains = self.ready_queues[0]
+        self.ready_level = 0
+        # bit i is set if ready_queues[i] is not empty
+        self.ready_bitmap = 0
+        # bit i is set if waiting_queues[i] might not be empty
+        self.waiting_bitmap = 0
         # we keep waiting_chains its dedicated list and empty it on demand
         # assert not self.waiting_chains
         # self.waiting_chains = self.waiting_queues[0]
@@ -38,6 +172,11 @@ class MLFQData(scheduler.SchedulerData):  # pylint: disable=too-few-public-metho
 class MLFQ(scheduler.Scheduler):
     """Multi-level feedback queue scheduler.
 
+    The non-empty levels are tracked in bitmaps (like the Linux O(1) scheduler),
+    so finding the highest priority ready queue does not scan the levels.
+    A priority boost concatenates the queues of the levels instead of moving the chains,
+    so its cost does not depend on the number of threads.
+
     If `level_time_slices` is specified for :meth:`__init__`, this scheduler
     will use time-slices and can thus not be used outside the kernel with the
     single timer scheduling strategy.
@@ -45,11 +184,13 @@ class MLFQ(scheduler.Scheduler):
     :class:`~schedulers.addons.TimeSliceFixer` for this case.
     """
 
-    def __init__(self, module, *, level_time_slices=None, priority_boost_time, **kwargs):
-        """Create a class:`MLFQ`."""
-        if level_time_slices is None:
-            levels = 8
-        else:
+    def __init__(self, module, *, level_time_slices=None, priority_boost_time, levels=8,
+                 **kwargs):
+        """Create a class:`MLFQ`.
+
+        `levels` is the number of levels if `level_time_slices` is not specified.
+        """
+        if level_time_slices is not None:
             levels = len(level_time_slices)
         assert levels > 0
 
@@ -81,6 +222,7 @@ class MLFQ(scheduler.Scheduler):
             data.waiting_chains = data.waiting_queues[0]
             super_add_thread(thread, data)
             data.waiting_chains = waiting_tmp
+            data.waiting_bitmap |= 1
         if rcu_data is None:
             self._rcu.apply(appliance)
         else:
@@ -91,7 +233,8 @@ class MLFQ(scheduler.Scheduler):
         rcu_data = self._rcu.read()
         return (ctx.bottom for queue in itertools.chain(rcu_data.ready_queues,
                                                         rcu_data.waiting_queues,
-                                                        (rcu_data.finished_chains,))
+                                                        (rcu_data.finished_chains,
+                                                         rcu_data.running_chains))
                 for ctx in queue)
 
     @classmethod
@@ -102,12 +245,22 @@ class MLFQ(scheduler.Scheduler):
         Switching to the highest priority queue is handled in
         :meth:`_start_schedule`.
         """
-        for (ready, waiting) in zip(rcu_data.ready_queues, rcu_data.waiting_queues):
+        for level in _levels(rcu_data.waiting_bitmap):
+            ready = rcu_data.ready_queues[level]
+            waiting = rcu_data.waiting_queues[level]
             cls._update_ready_chain_queues(time, ready, waiting)
-
-        # do a sanity check while we're here
-        assert all((not t.bottom.is_finished() for t in ready)
-                   for ready in rcu_data.ready_queues)
+            if ready:
+                rcu_data.ready_bitmap |= 1 << level
+            if not waiting:
+                rcu_data.waiting_bitmap &= ~(1 << level)
+
+        if checks.ENABLED:
+            cls._check_chains(rcu_data)
+
+    @staticmethod
+    def _check_chains(rcu_data):
+        """See :meth:`Scheduler._check_chains`."""
+        assert not any(t.bottom.is_finished() for ready in rcu_data.ready_queues for t in ready)
         assert all(t.bottom.is_finished() for t in rcu_data.finished_chains)
 
     def get_next_waiting(self, rcu_data):
@@ -115,8 +268,8 @@ class MLFQ(scheduler.Scheduler):
         next_waiting = None
         assert not rcu_data.waiting_chains
         waiting_queue = rcu_data.waiting_chains
-        for queue in rcu_data.waiting_queues:
-            rcu_data.waiting_chains = queue
+        for level in _levels(rcu_data.waiting_bitmap):
+            rcu_data.waiting_chains = rcu_data.waiting_queues[level]
             candidate = super().get_next_waiting(rcu_data)
             if candidate is not None:
                 if next_waiting is None or \
@@ -136,11 +289,12 @@ class MLFQ(scheduler.Scheduler):
 
         prev_still_ready = last_queue is rcu_data.ready_chains
         prev_has_run = prev_run_time is not None and prev_run_time > 0
-        prev_level = next(i for i, v in enumerate(rcu_data.ready_queues)
-                          if v is rcu_data.ready_chains)
+        prev_level = rcu_data.ready_level
+        assert rcu_data.ready_chains is rcu_data.ready_queues[prev_level]
+        # the last chain may have left the queue
+        self._update_ready_bitmap(rcu_data, prev_level)
 
         if prev_has_run:
-            # important: == vs is; empty arrays will compare equal with ==
             current_time = (yield CPURequest.current_time())
 
             if self._priority_boost(rcu_data, prev_level, current_time) \
@@ -153,8 +307,7 @@ class MLFQ(scheduler.Scheduler):
             last_idx = len(last_queue) - 1
 
         # switch to highest priority queue
-        rcu_data.ready_chains = next((x for x in rcu_data.ready_queues if x),
-                                     rcu_data.ready_queues[0])
+        self._select_level(rcu_data, self._highest_level(rcu_data))
 
         if prev_has_run and not last_queue[-1].bottom.is_finished():
             # and (rcu_data.last_prio_boost is None or rcu_data.last_prio_boost != current_time) ?
@@ -164,10 +317,52 @@ class MLFQ(scheduler.Scheduler):
             assert last_queue is rcu_data.waiting_chains
             last_queue = rcu_data.waiting_queues[prev_level]
             last_queue.append(rcu_data.waiting_chains.pop())
+            rcu_data.waiting_bitmap |= 1 << prev_level
             assert not rcu_data.waiting_chains
 
         return rcu_copy, last_queue, last_idx
 
+    def _take_chain(self, rcu_data, idx):
+        """See :meth:`Scheduler._take_chain`.
+
+        The token is the level of the chain.
+        """
+        level = rcu_data.ready_level
+        chain, _ = super()._take_chain(rcu_data, idx)
+        self._update_ready_bitmap(rcu_data, level)
+        return chain, level
+
+    def _return_chain(self, rcu_data, idx, chain, level):
+        """See :meth:`Scheduler._return_chain`.
+
+        Also restores :attr:`MLFQData.ready_chains` to the level of the chain.
+        """
+        self._select_level(rcu_data, level)
+        super()._return_chain(rcu_data, idx, chain, None)
+        rcu_data.ready_bitmap |= 1 << level
+
+    @staticmethod
+    def _select_level(rcu_data, level):
+        """Make the ready queue of `level` the :attr:`MLFQData.ready_chains`."""
+        rcu_data.ready_level = level
+        rcu_data.ready_chains = rcu_data.ready_queues[level]
+
+    @staticmethod
+    def _update_ready_bitmap(rcu_data, level):
+        """Update the bit of `level` in :attr:`MLFQData.ready_bitmap`."""
+        if rcu_data.ready_queues[level]:
+            rcu_data.ready_bitmap |= 1 << level
+        else:
+            rcu_data.ready_bitmap &= ~(1 << level)
+
+    @staticmethod
+    def _highest_level(rcu_data):
+        """Return the highest priority level with ready chains.
+
+        Returns the top level if there are no ready chains.
+        """
+        return _first_level(rcu_data.ready_bitmap) or 0
+
     def _get_last_chain(self, _rcu_data, last_chain_queue, _last_chain_idx):
         """See :meth:`Scheduler._get_last_chain`."""
         # the last chain is always at the end
@@ -193,14 +388,11 @@ class MLFQ(scheduler.Scheduler):
         if rcu_data.prio_boost_time <= delta:
             boosted = True
 
-            for old_queues in (rcu_data.ready_queues, rcu_data.waiting_queues):
-                # the order only really matters for ready_queues
-                new_queue = []
-                for _ in map(new_queue.extend, old_queues[prev_level:] + old_queues[:prev_level]):
-                    pass
-                old_queues[0] = new_queue
-                for queue in old_queues[1:]:
-                    queue.clear()
+            self._boost_queues(rcu_data.ready_queues, rcu_data.ready_bitmap, prev_level, list)
+            self._boost_queues(rcu_data.waiting_queues, rcu_data.waiting_bitmap, prev_level,
+                               scheduler.WaitingChains)
+            rcu_data.ready_bitmap = 1 if rcu_data.ready_queues[0] else 0
+            rcu_data.waiting_bitmap = 1 if rcu_data.waiting_queues[0] else 0
 
             rcu_data.prio_boost_time = self.prio_boost_time - (delta - rcu_data.prio_boost_time)
         else:
@@ -210,6 +402,32 @@ class MLFQ(scheduler.Scheduler):
 
         return boosted
 
+    @staticmethod
+    def _boost_queues(queues, bitmap, prev_level, new_queue):
+        """Move the chains of all `queues` to the top level.
+
+        The levels are concatenated starting with `prev_level`, wrapping around.
+        `bitmap` must have the bits of all non-empty levels set.
+        The chains are not moved individually, but the queues of the levels are concatenated
+        with a :class:`_ConcatenatedQueue`; this does not depend on the number of chains.
+        The emptied levels get new queues created by calling `new_queue`.
+        """
+        levels = itertools.chain(_levels(bitmap >> prev_level << prev_level),
+                                 _levels(bitmap & ((1 << prev_level) - 1)))
+        boosted = []
+        for level in levels:
+            queue = queues[level]
+            if isinstance(queue, _ConcatenatedQueue):
+                boosted += queue.queues
+            else:
+                boosted.append(queue)
+            queues[level] = new_queue()
+        boosted = [queue for queue in boosted if queue]
+        if len(boosted) > 1:
+            queues[0] = _ConcatenatedQueue(boosted)
+        elif boosted:
+            queues[0] = boosted[0]
+
     def _no_priority_boost(self, _rcu_data, _prev_level, _current_time):  # pylint: disable=no-self-use
         """Overwrite :meth:`_priority_boost` if :attr:`prio_boost_time` is `None`.
 
@@ -256,19 +474,25 @@ class MLFQ(scheduler.Scheduler):
             assert last_queue in (None, rcu_data.finished_chains)
 
         if next_chain_queue is not None:
+            # after a priority boost the chain is at the top level
+            last_level = 0 if last_queue is rcu_data.ready_queues[0] else prev_level
             next_chain_queue.append(last_queue.pop())
             last_queue = next_chain_queue
+            if prev_still_ready:
+                self._update_ready_bitmap(rcu_data, last_level)
+                rcu_data.ready_bitmap |= 1 << next_queue_idx
+            else:
+                rcu_data.waiting_bitmap |= 1 << next_queue_idx
 
             assert not rcu_data.waiting_chains
 
             # do not leave an empty ready_chains
             if not rcu_data.ready_chains:
                 if prev_still_ready:
-                    rcu_data.ready_chains = last_queue
+                    self._select_level(rcu_data, next_queue_idx)
                 else:
-                    candidates = rcu_data.ready_queues[next_queue_idx:]
-                    rcu_data.ready_chains = next((x for x in candidates if x),
-                                                 rcu_data.ready_queues[0])
+                    level = _first_level(rcu_data.ready_bitmap, next_queue_idx)
+                    self._select_level(rcu_data, level or 0)
 
         return last_queue
 
@@ -282,9 +506,7 @@ class MLFQ(scheduler.Scheduler):
         if not rcu_data.ready_chains:
             return None, None
 
-        # important: == vs is; empty arrays will compare equal with ==
-        level = next(i for i, v in enumerate(rcu_data.ready_queues)
-                     if v is rcu_data.ready_chains)
+        level = rcu_data.ready_level
 
         time_slice = self.level_time_slices[level]
         rcu_data.last_finish_time = None
@@ -19,13 +19,9 @@ class PSJF(shortest_job_first.SJF):
         idx, time_slice = yield from super()._sched_loop(rcu_copy)
         if idx is not None:
             assert idx == 0
-            threads = (c.bottom for c in rcu_copy.data.waiting_chains)
-            next_thread = next(threads, None)
-            for thread in threads:
-                if thread.ready_time < next_thread.ready_time or (
-                        thread.ready_time == next_thread.ready_time
-                        and thread.remaining < next_thread.remaining):
-                    next_thread = thread
+            # the shortest of the threads becoming ready next
+            next_chain = rcu_copy.data.waiting_chains.next_waiting()
+            next_thread = next_chain.bottom if next_chain is not None else None
             current_remaining = rcu_copy.data.ready_chains[0].bottom.remaining
             if next_thread is not None and next_thread.remaining is not None and (
                     current_remaining is None or next_thread.remaining < current_remaining):
@@ -1,12 +1,178 @@
 #!/usr/bin/env python3
 """Defines the base class for schedulers."""
 
+import functools
+import heapq
 import itertools
-from schedsi import rcu
+from schedsi import checks, rcu
 from schedsi.cpu import context
 from schedsi.cpu.request import Request as CPURequest
 
 
+class WaitingChains:
+    """A queue of waiting :class:`context.Chains <schedsi.context.Chain>`.
+
+    The chains keep the order they are inserted in, like a :obj:`list`.
+    Additionally they are kept in a heap by the ready time of their bottom thread,
+    so the next chain to become ready is found without scanning the queue.
+    Chains that become ready leave a gap in the queue, found via the recorded position
+    of each chain, so removing them does not scan the queue either.
+    The gaps are closed once they make up half of the queue,
+    or before accessing the queue by index.
+
+    The ready time of a thread must not change while its chain is waiting.
+    """
+
+    def __init__(self, chains=()):
+        """Create a :class:`WaitingChains` queue containing `chains`."""
+        # the queue, with None for the gaps left by ready chains
+        self._chains = []
+        self._gaps = 0
+        # chain -> index in _chains, None if it needs to be recorded again
+        self._slots = {}
+        # chain -> sequence number of its valid heap entry
+        self._entries = {}
+        # (ready_time, ..., sequence number, chain), removed chains leave stale entries
+        self._heap = []
+        self._sequence = itertools.count()
+        self.extend(chains)
+
+    def __len__(self):
+        """Return the number of waiting chains."""
+        return len(self._chains) - self._gaps
+
+    def __iter__(self):
+        """Return an iterator over the waiting chains, in queue order."""
+        if self._gaps:
+            return (chain for chain in self._chains if chain is not None)
+        return iter(self._chains)
+
+    def __getitem__(self, idx):
+        """Return the chain at `idx` in queue order."""
+        self._close_gaps()
+        return self._chains[idx]
+
+    def _close_gaps(self):
+        """Remove the gaps from the queue."""
+        if self._gaps:
+            self._chains = [chain for chain in self._chains if chain is not None]
+            self._gaps = 0
+            # the chains moved
+            self._slots = None
+
+    def _push(self, chain):
+        """Add `chain` to the heap."""
+        sequence = next(self._sequence)
+        self._entries[chain] = sequence
+        heapq.heappush(self._heap, self._heap_entry(chain, sequence))
+
+    def _heap_entry(self, chain, sequence):  # pylint: disable=no-self-use
+        """Return the heap entry for `chain`.
+
+        The entry is a tuple starting with the ready time of the chain
+        and ending with the `sequence` number and the chain.
+        Subclasses may add elements in between to order chains that become ready at the same time,
+        which are otherwise in the order they were added.
+        """
+        return chain.bottom.ready_time, sequence, chain
+
+    def append(self, chain):
+        """Append `chain` to the end of the queue."""
+        if self._slots is not None:
+            self._slots[chain] = len(self._chains)
+        self._chains.append(chain)
+        self._push(chain)
+
+    def insert(self, idx, chain):
+        """Insert `chain` before `idx`."""
+        self._close_gaps()
+        chains = self._chains
+        chains.insert(idx, chain)
+        if self._slots is not None:
+            if chains[-1] is chain:
+                self._slots[chain] = len(chains) - 1
+            else:
+                # the chains after idx moved
+                self._slots = None
+        self._push(chain)
+
+    def extend(self, chains):
+        """Append all `chains`."""
+        for chain in chains:
+            self.append(chain)
+
+    def pop(self, idx=-1):
+        """Remove and return the chain at `idx`."""
+        self._close_gaps()
+        chains = self._chains
+        chain = chains.pop(idx)
+        del self._entries[chain]
+        if self._slots is not None and self._slots.pop(chain) != len(chains):
+            # the chains after idx moved
+            self._slots = None
+        return chain
+
+    def clear(self):
+        """Remove all chains."""
+        self._chains.clear()
+        self._gaps = 0
+        self._slots = {}
+        self._entries.clear()
+        self._heap.clear()
+
+    def _discard_stale(self):
+        """Pop heap entries of removed chains from the top of the heap."""
+        heap = self._heap
+        entries = self._entries
+        while heap and entries.get(heap[0][-1]) != heap[0][-2]:
+            heapq.heappop(heap)
+
+    def next_waiting(self):
+        """Return the chain that is next in line to become ready.
+
+        Chains that become ready at the same time are ordered by their heap entry
+        (see :meth:`_heap_entry`).
+        Returns `None` if the queue is empty.
+        """
+        self._discard_stale()
+        if not self._heap:
+            return None
+        return self._heap[0][-1]
+
+    def pop_ready(self, time):
+        """Remove and return the chains that are ready at `time`.
+
+        The chains are returned as a :obj:`list` in queue order.
+        """
+        heap = self._heap
+        if not heap or heap[0][0] > time:
+            return []
+        entries = self._entries
+        ready = []
+        while heap and heap[0][0] <= time:
+            *_, sequence, chain = heapq.heappop(heap)
+            if entries.get(chain) == sequence:
+                assert chain.bottom.ready_time <= time
+                del entries[chain]
+                ready.append(chain)
+        if not ready:
+            return ready
+
+        chains = self._chains
+        slots = self._slots
+        if slots is None:
+            slots = self._slots = {chain: idx for idx, chain in enumerate(chains)
+                                   if chain is not None}
+        indices = sorted(slots.pop(chain) for chain in ready)
+        ready = [chains[idx] for idx in indices]
+        for idx in indices:
+            chains[idx] = None
+        self._gaps += len(indices)
+        if self._gaps * 2 > len(chains):
+            self._close_gaps()
+        return ready
+
+
 class SchedulerData:  # pylint: disable=too-few-public-methods
     """Mutable data for the :class:`Scheduler`.
 
@@ -17,11 +183,21 @@ class SchedulerData:  # pylint: disable=too-few-public-methods
     def __init__(self):
         """Create a :class:`SchedulerRCU`."""
         self.ready_chains = []
-        self.waiting_chains = []
+        self.waiting_chains = WaitingChains()
         self.finished_chains = []
+        # with multiple VCPUs, running chains are taken out of the ready queue
+        self.running_chains = []
         self.last_idx = None
 
 
+def _build(cls, args, kwargs, module):
+    """Create a `cls` for `module`.
+
+    See :meth:`Scheduler.builder`.
+    """
+    return cls(module, *args, **kwargs)
+
+
 class Scheduler:
     """Scheduler base-class.
 
@@ -44,6 +220,7 @@ class Scheduler:
         self._rcu = rcu.RCU(rcu_storage)
         self.module = module
         self.time_slice = time_slice
+        self.num_vcpus = 1
 
     @classmethod
     def builder(cls, *args, **kwargs):
@@ -52,11 +229,18 @@ class Scheduler:
         Returns a function taking a single argument:
         the :class:`Module` of the scheduler to create.
         `args` and `kwargs` are then also forwarded to :meth:`__init__`.
+        The function can be pickled if `args` and `kwargs` can.
         """
-        def make(module):
-            """The creator function to be returned."""
-            return cls(module, *args, **kwargs)
-        return make
+        return functools.partial(_build, cls, args, kwargs)
+
+    def add_vcpu(self):
+        """Register another VCPU executing this scheduler.
+
+        See :meth:`SchedulerThread.fork <schedsi.threads.SchedulerThread.fork>`.
+        The VCPUs share :attr:`_rcu`, so from then on it copies the data for updates.
+        """
+        self.num_vcpus += 1
+        self._rcu.share()
 
     def num_threads(self):
         """Return total number of threads.
@@ -84,7 +268,16 @@ class Scheduler:
         """Move threads becoming ready to the ready chains list."""
         cls._update_ready_chain_queues(time, rcu_data.ready_chains, rcu_data.waiting_chains)
 
-        # do a sanity check while we're here
+        if checks.ENABLED:
+            cls._check_chains(rcu_data)
+
+    @staticmethod
+    def _check_chains(rcu_data):
+        """Check the invariants of the chain queues.
+
+        This scans all ready and finished chains,
+        so it is only called in the checked mode (see :mod:`schedsi.checks`).
+        """
         assert not (0, None) in ((c.bottom.remaining, c.bottom.ready_time)
                                for c in rcu_data.ready_chains)
         assert all(ctx.bottom.is_finished() for ctx in rcu_data.finished_chains)
@@ -93,18 +286,18 @@ class Scheduler:
     def _update_ready_chain_queues(time, ready_queue, waiting_queue):
         """Move threads becoming ready to the respective queues.
 
+        `waiting_queue` is a :class:`WaitingChains` queue.
+
         See :meth:`Scheduler._update_ready_chains`.
         """
-        for i in range(-len(waiting_queue), 0):
-            if waiting_queue[i].bottom.ready_time <= time:
-                ready_queue.append(waiting_queue.pop(i))
+        ready_queue += waiting_queue.pop_ready(time)
 
     def all_threads(self):
         """Return a generator yielding every thread."""
         rcu_data = self._rcu.read()
         return (ctx.bottom for ctx in
                 itertools.chain(rcu_data.finished_chains, rcu_data.waiting_chains,
-                                rcu_data.ready_chains))
+                                rcu_data.ready_chains, rcu_data.running_chains))
 
     def get_thread_statistics(self, current_time):
         """Obtain statistics of all threads."""
@@ -114,7 +307,7 @@ class Scheduler:
 
     def get_next_waiting(self, rcu_data):  # pylint: disable=no-self-use
         """Return (one of) the thread(s) that is next in line to become ready."""
-        return min(rcu_data.waiting_chains, key=lambda c: c.bottom.ready_time, default=None)
+        return rcu_data.waiting_chains.next_waiting()
 
     def _start_schedule(self, _prev_run_time):
         """Prepare making a scheduling decision.
@@ -181,11 +374,12 @@ class Scheduler:
     def _schedule(self, idx, time_slice, next_ready_time, rcu_copy):
         """Update :attr:`_rcu` and schedule the chain at `idx`.
 
-        If `idx` is `None`, yield an idle request.
+        If `idx` is `None`, idle instead.
 
         `next_ready_time` should be forwarded from :meth:`schedule`.
 
         Yields a :class:`~schedsi.cpurequest.Request`.
+        Returns the decision (see :meth:`schedule`).
         """
         rcu_data = rcu_copy.data
 
@@ -194,7 +388,7 @@ class Scheduler:
         # FIXME: we need to take it out of the ready_chains for multi-vcpu
         #        else we might try to run the same chain in parallel
         if not self._rcu.update(rcu_copy):
-            return
+            return None, None
 
         if idx is None:
             next_chain = self.get_next_waiting(rcu_copy.data)
@@ -207,36 +401,95 @@ class Scheduler:
                 yield CPURequest.timer(delta)
             else:
                 next_ready_time[0] = None
+                if rcu_data.running_chains:
+                    # the other VCPUs may return their chains any time
+                    next_ready_time[0] = yield CPURequest.current_time()
 
-            yield CPURequest.idle()
-            return
+            return CPURequest.idle(), None
         next_ready_time[0] = 0
 
         yield CPURequest.timer(time_slice)
 
-        chain = yield CPURequest.resume_chain(rcu_data.ready_chains[idx])
+        if self.num_vcpus == 1:
+            return (CPURequest.resume_chain(rcu_data.ready_chains[idx]),
+                    functools.partial(self._update_chain, idx))
+
+        # don't let other VCPUs run the chain in parallel
+        taken, token = self._rcu.apply(lambda data: self._take_chain(data, idx))
+        return (CPURequest.resume_chain(taken),
+                functools.partial(self._give_back_chain, idx, taken, token))
+
+    def _update_chain(self, idx, chain):
+        """Update the executed chain at `idx`.
+
+        This continues a decision of :meth:`_schedule` with a single VCPU.
+        """
         def appliance(data):
             """Update executed chain."""
             data.ready_chains[idx] = chain
         self._rcu.apply(appliance)
 
+    def _give_back_chain(self, idx, taken, token, chain):
+        """Return the executed chain, which was `taken` from `idx`.
+
+        This continues a decision of :meth:`_schedule` with multiple VCPUs.
+        """
+        def give_back(data):
+            """Return executed chain."""
+            data.running_chains.remove(taken)
+            self._return_chain(data, idx, chain, token)
+        self._rcu.apply(give_back)
+
+    def _take_chain(self, rcu_data, idx):  # pylint: disable=no-self-use
+        """Move the chain at `idx` from the ready queue to the running chains.
+
+        This is used with multiple VCPUs, so a running chain is not selected by another VCPU.
+
+        Returns a tuple (chain, token for :meth:`_return_chain`).
+        """
+        chain = rcu_data.ready_chains.pop(idx)
+        rcu_data.running_chains.append(chain)
+        rcu_data.last_idx = None
+        return chain, None
+
+    def _return_chain(self, rcu_data, idx, chain, _token):  # pylint: disable=no-self-use
+        """Put a chain taken by :meth:`_take_chain` back into the ready queue.
+
+        The chain is inserted at `idx` (or the end, if the queue shrunk)
+        and :attr:`SchedulerData.last_idx` is set, as if it was never taken out.
+        """
+        ready_chains = rcu_data.ready_chains
+        idx = min(idx, len(ready_chains))
+        ready_chains.insert(idx, chain)
+        rcu_data.last_idx = idx
+
     def schedule(self, prev_run_time, next_ready_time):
-        """Schedule the next :class:`context.Chain <schedsi.context.Chain>`.
+        """Make a decision which :class:`context.Chain <schedsi.context.Chain>` to schedule.
 
         This simply calls :meth:`_start_schedule`, :meth:`_sched_loop` and
-        :meth:`_schedule` in a loop, passing appropriate arguments.
+        :meth:`_schedule`, passing appropriate arguments.
+        `prev_run_time` is how long the previous decision ran.
+        `next_ready_time` is a :obj:`list` with a single element,
+        which is set to the time the scheduler is ready again if it idles.
 
         Yields a :class:`~schedsi.cpurequest.Request`.
         Consumes the current time.
+
+        Returns the decision as a tuple (
+
+            * the resume-chain or idle :class:`~schedsi.cpurequest.Request`
+              (or `None` to make another decision)
+            * a function to call with the reply to the request (or `None`)
+
+        ).
+        Since the returned request takes time, it is not yielded.
+        This way, the scheduler does not wait in a coroutine while the decision runs,
+        and its state can be saved (see :mod:`schedsi.snapshot`).
         """
-        assert len(prev_run_time) == 1
-        assert len(next_ready_time) == 1
-        assert next_ready_time[0] is None
-        while True:
-            rcu_copy, *_ = yield from self._start_schedule(*prev_run_time)
-            idx, time_slice = yield from self._sched_loop(rcu_copy)
+        rcu_copy, *_ = yield from self._start_schedule(prev_run_time)
+        idx, time_slice = yield from self._sched_loop(rcu_copy)
 
-            yield from self._schedule(idx, time_slice, next_ready_time, rcu_copy)
+        return (yield from self._schedule(idx, time_slice, next_ready_time, rcu_copy))
 
     def _sched_loop(self, rcu_copy, _last_chain_queue, _last_chain_idx):  # pylint: disable=no-self-use
         """Schedule the next :class:`context.Chain <schedsi.context.Chain>`.
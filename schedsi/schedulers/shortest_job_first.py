@@ -2,11 +2,67 @@
 """Defines a shortest job first scheduler."""
 
 import bisect
-from schedsi.schedulers import first_come_first_serve
+import math
+from schedsi.schedulers import first_come_first_serve, scheduler
+
+
+class _Remaining:  # pylint: disable=too-few-public-methods
+    """A sequence of the remaining times of a list of chains.
+
+    Infinitely executing threads have an infinite remaining time.
+    This allows to :mod:`bisect` the chains without building a list of their remaining times.
+    """
+
+    def __init__(self, chains):
+        """Create a :class:`_Remaining` sequence."""
+        self.chains = chains
+
+    def __len__(self):
+        """Return the number of chains."""
+        return len(self.chains)
+
+    def __getitem__(self, idx):
+        """Return the remaining time of the chain at `idx`."""
+        remaining = self.chains[idx].bottom.remaining
+        if remaining is None:
+            return math.inf
+        return remaining
+
+
+class SJFWaitingChains(scheduler.WaitingChains):
+    """A :class:`~schedsi.schedulers.scheduler.WaitingChains` queue for the :class:`SJF` scheduler.
+
+    Chains that become ready at the same time are ordered by their remaining time,
+    so :meth:`next_waiting` returns the shortest of them.
+    """
+
+    def _heap_entry(self, chain, sequence):
+        """See :meth:`WaitingChains._heap_entry`."""
+        remaining = chain.bottom.remaining
+        if remaining is None:
+            remaining = math.inf
+        return chain.bottom.ready_time, remaining, sequence, chain
+
+
+class SJFData(scheduler.SchedulerData):  # pylint: disable=too-few-public-methods
+    """Mutable data for the :class:`SJF` scheduler."""
+
+    def __init__(self):
+        """Create a :class:`SJFData`."""
+        super().__init__()
+        self.waiting_chains = SJFWaitingChains()
 
 
 class SJF(first_come_first_serve.FCFS):
-    """Shortest job first scheduler."""
+    """Shortest job first scheduler.
+
+    The ready chains are sorted by remaining time,
+    infinitely executing threads are at the end.
+    """
+
+    def __init__(self, module, **kwargs):
+        """Create a :class:`SJF` scheduler."""
+        super().__init__(module, rcu_storage=SJFData(), **kwargs)
 
     def _update_ready_chains(self, time, rcu_data):
         """See :meth:`FCFS._update_ready_chains`.
@@ -19,28 +75,28 @@ class SJF(first_come_first_serve.FCFS):
         new_idx = len(ready_chains)
         super()._update_ready_chains(time, rcu_data)
 
+        if len(ready_chains) == new_idx:
+            return
+
         new_chains = ready_chains[new_idx:]
         del ready_chains[new_idx:]
 
         # we sort the list to make insertion easier
         new_chains = sorted(new_chains, key=lambda c: c.bottom.remaining or -1)
 
-        # remaining_list should contain the remaining times of all non-infinitly threads
-        inf_idx = next((i for i, c in enumerate(ready_chains) if c.bottom.remaining is None), None)
-        remaining_list = list(c.bottom.remaining for c in ready_chains[:inf_idx])
-
         # filter out the infinitly executing ones from new_chains
         inf_idx = next((i for i, c in enumerate(new_chains) if c.bottom.remaining is not None),
                        len(new_chains))
-        ready_chains += new_chains[:inf_idx]
+        infinite_chains = new_chains[:inf_idx]
         new_chains = new_chains[inf_idx:]
 
+        remaining = _Remaining(ready_chains)
         idx = 0
-        count = 0
         for ctx in new_chains:
             if ctx.bottom.is_finished():
                 finished_chains.append(ctx)
                 continue
-            idx = bisect.bisect(remaining_list, ctx.bottom.remaining, idx)
-            ready_chains.insert(idx + count, ctx)
-            count += 1
+            idx = bisect.bisect(remaining, ctx.bottom.remaining, idx)
+            ready_chains.insert(idx, ctx)
+            idx += 1
+        ready_chains += infinite_chains
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""Snapshots of a running :class:`~schedsi.world.World`.
+
+Between the steps of a simulation, the threads and schedulers keep their state in plain objects
+(see :meth:`Thread.next_request <schedsi.threads.Thread.next_request>`
+and :meth:`Scheduler.schedule <schedsi.schedulers.Scheduler.schedule>`),
+so the whole state of a :class:`~schedsi.world.World` can be pickled (see :mod:`pickle`).
+Only threads of classes that still use an execution coroutine
+(see :class:`~schedsi.cpu.context.Context`) cannot be saved once they ran.
+
+A :class:`Snapshot` holds the pickled state.
+It can be restored any number of times, also in other processes,
+e.g. to explore several branches after a common warm-up::
+
+    def run_branch(the_world, units):
+        kernel = the_world.cores[0].kernel
+        kernel.add_thread(threads.Thread(kernel, ready_time=9000, units=units))
+        the_world.run_until(10000)
+        return the_world.get_statistics()
+
+    the_world.run_until(9000)
+    snap = the_world.snapshot()
+    results = snap.restore_all(run_branch, [(10,), (100,), (1000,)])
+
+Each branch runs in a worker process and returns its result to the caller,
+so the result must be picklable.
+The function is sent to the worker processes, so it must be picklable too,
+i.e. defined at module level.
+The same goes for the classes of the simulation, like schedulers created by
+:meth:`Addon.attach <schedsi.schedulers.addons.Addon.attach>`.
+
+The log is not part of the snapshot.
+Each restored :class:`~schedsi.world.World` gets its own log,
+which by default is a :class:`~schedsi.log.binarylog.BinaryLog` to memory.
+
+A :class:`Snapshot` can also be written to a file and restored by another process
+with the same version of schedsi and the same module-level settings,
+like :data:`LOG_INDIVIDUAL <schedsi.threads.thread.LOG_INDIVIDUAL>`.
+Since :mod:`pickle` can execute arbitrary code, only load snapshots you trust.
+"""
+
+import functools
+import io
+import multiprocessing
+import pickle
+from schedsi.log import binarylog
+
+
+def _restore_branch(snap, function, args):
+    """Return `function(the_world, *args)`, called with a world restored from `snap`.
+
+    This is used with :func:`functools.partial` to pass a picklable function to the pool.
+    """
+    return function(snap.restore(), *args)
+
+
+class Snapshot:
+    """A snapshot of a running :class:`~schedsi.world.World`.
+
+    See :meth:`World.snapshot <schedsi.world.World.snapshot>`.
+    The :attr:`data` is the pickled :class:`~schedsi.world.World`.
+    """
+
+    def __init__(self, data):
+        """Create a :class:`Snapshot` of the pickled :class:`~schedsi.world.World` `data`."""
+        self.data = data
+
+    @classmethod
+    def load(cls, file_name):
+        """Read a :class:`Snapshot` written by :meth:`save` from `file_name`."""
+        with open(file_name, 'rb') as snapshot_file:
+            return cls(snapshot_file.read())
+
+    def save(self, file_name):
+        """Write the :class:`Snapshot` to `file_name`."""
+        with open(file_name, 'wb') as snapshot_file:
+            snapshot_file.write(self.data)
+
+    def restore(self, log=None):
+        """Return a new :class:`~schedsi.world.World` restored from the snapshot.
+
+        See :meth:`World.restore <schedsi.world.World.restore>`.
+        """
+        the_world = pickle.loads(self.data)
+        if log is None:
+            log = binarylog.BinaryLog(io.BytesIO())
+        the_world.set_log(log)
+        return the_world
+
+    def restore_all(self, function, args_list, *, processes=None):
+        """Return a list of `function(the_world, *args)` for each of `args_list`.
+
+        Each call gets its own restored :class:`~schedsi.world.World`.
+        `processes` is the number of worker processes, defaulting to the number of CPUs.
+        If it is `1`, the calls run in this process.
+        """
+        run = functools.partial(_restore_branch, self, function)
+        if processes == 1:
+            return list(map(run, args_list))
+        with multiprocessing.Pool(processes) as pool:
+            return pool.map(run, args_list)
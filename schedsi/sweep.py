@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""Run simulations over a grid of parameters in parallel.
+
+Tuning scheduler parameters takes many independent simulations,
+so these are distributed over a :class:`multiprocessing.Pool`.
+
+A sweep needs a factory that creates the kernel :class:`~schedsi.module.Module`
+from the parameters of a point, e.g. to sweep over CFS parameters::
+
+    def make_kernel(min_period, min_slice):
+        kernel = hierarchy_builder.ModuleBuilder(
+            scheduler=schedulers.CFS.builder(default_shares=400, min_period=min_period,
+                                             min_slice=min_slice, time_slice=None))
+        kernel.add_thread(threads.Thread, {'shares': 1000})
+        return kernel.module
+
+    results = sweep.sweep(make_kernel, sweep.grid(min_period=[20, 30], min_slice=[2, 6]), 1000,
+                          local_timer_scheduling=True)
+
+The factory is sent to the worker processes, so it must be picklable,
+i.e. defined at module level.
+"""
+
+import collections
+import functools
+import itertools
+import multiprocessing
+from schedsi import world
+
+#: The statistics of one simulation run
+#:
+#: `params` are the parameters the kernel was created with,
+#: `threads` and `cores` are the statistics returned by
+#: :meth:`World.get_statistics <schedsi.world.World.get_statistics>`.
+Result = collections.namedtuple('Result', ['params', 'threads', 'cores'])
+
+
+def grid(**axes):
+    """Return a list of the points of the grid spanned by `axes`.
+
+    Each keyword argument is a parameter name mapped to a sequence of its values.
+    Each point is a `dict` mapping all parameter names to one of their values.
+    """
+    names = list(axes.keys())
+    return [dict(zip(names, values)) for values in itertools.product(*axes.values())]
+
+
+class _NullLog:
+    """Log that discards everything.
+
+    Only the statistics are of interest for a sweep,
+    which are gathered from the :class:`~schedsi.world.World` directly.
+    """
+
+    def init_core(self, cpu):
+        """Register a :class:`Core`."""
+        pass
+
+    def context_switch(self, cpu, split_index, appendix, time):
+        """Log an context switch event."""
+        pass
+
+    def thread_execute(self, cpu, runtime):
+        """Log an thread execution event."""
+        pass
+
+    def thread_yield(self, cpu):
+        """Log a thread yield event."""
+        pass
+
+    def cpu_idle(self, cpu, idle_time):
+        """Log an CPU idle event."""
+        pass
+
+    def timer_interrupt(self, cpu, idx, delay):
+        """Log an timer interrupt event."""
+        pass
+
+    def thread_statistics(self, stats):
+        """Log thread statistics."""
+        pass
+
+    def cpu_statistics(self, stats):
+        """Log CPU statistics."""
+        pass
+
+
+def run_point(make_kernel, params, until, *, cores=1, **world_kwargs):
+    """Run a single simulation of the kernel `make_kernel(**params)`.
+
+    The simulation runs until `until` (see :meth:`World.run_until <schedsi.world.World.run_until>`).
+    `world_kwargs` are forwarded to the :class:`~schedsi.world.World`.
+
+    Returns a :class:`Result`.
+    """
+    the_world = world.World(cores, make_kernel(**params), _NullLog(), **world_kwargs)
+    the_world.run_until(until)
+    return Result(params, *the_world.get_statistics())
+
+
+def sweep(make_kernel, points, until, *, processes=None, chunksize=1, **world_kwargs):
+    """Run a simulation for each of the `points` and collect the statistics.
+
+    `points` is a sequence of parameter `dict`\\ s (see :func:`grid`).
+    `processes` is the number of worker processes, defaulting to the number of CPUs.
+    If it is `1`, the simulations run in this process.
+    `chunksize` is the number of points sent to a worker at once.
+    The other parameters are passed to :func:`run_point`.
+
+    Returns a list of :class:`Result`\\ s in the order of `points`.
+    """
+    run = functools.partial(_run_point, make_kernel, until, world_kwargs)
+    if processes == 1:
+        return list(map(run, points))
+    with multiprocessing.Pool(processes) as pool:
+        return pool.map(run, points, chunksize)
+
+
+def _run_point(make_kernel, until, world_kwargs, params):
+    """Call :func:`run_point`.
+
+    This is used with :func:`functools.partial` to pass a picklable function to the pool.
+    """
+    return run_point(make_kernel, params, until, **world_kwargs)
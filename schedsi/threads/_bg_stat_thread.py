@@ -4,6 +4,7 @@ This should be used in favor of :class:`Thread` for non-worker threads.
 """
 
 from schedsi.threads.thread import Thread, LOG_INDIVIDUAL
+from schedsi.threads._samples import Kind
 import sys
 
 
@@ -17,20 +18,18 @@ class _BGStatThread(Thread):
             print('Warning: Did not specify tid for non-worker thread', self.module.name, self.tid,
                   '. Usually automatic naming is not desired here.', file=sys.stderr)
 
-        self.bg_times = [[]]
-
     def run_background(self, current_time, run_time):
         """Update runtime state.
 
         See :meth:`Thread.run_background`.
         """
         if LOG_INDIVIDUAL:
-            self.bg_times[-1].append(run_time)
+            self.stats.samples.append(Kind.bg, current_time - run_time, run_time)
         self._update_ready_time(current_time)
 
     def resume(self, current_time, returning):
         if LOG_INDIVIDUAL and returning:
-            self.bg_times.append([])
+            self.stats.samples.new_group(Kind.bg)
         super().resume(current_time, returning)
 
     def finish(self, current_time):
@@ -40,11 +39,11 @@ class _BGStatThread(Thread):
         """
         if self.module.parent is not None or self.tid != 0:
             if LOG_INDIVIDUAL:
-                self.bg_times.append([])
+                self.stats.samples.new_group(Kind.bg)
         else:
             # in single timer scheduling the kernel is restarted
             # but we already got a new list from resume() after the context switch
-            assert self.bg_times[-1] == []
+            assert self.stats.samples.last_group_len(Kind.bg) == 0
         super().finish(current_time)
 
     def get_statistics(self, current_time):
@@ -54,8 +53,6 @@ class _BGStatThread(Thread):
         """
         stats = super().get_statistics(current_time)
 
-        stats['bg'] = self.bg_times
-        if stats['bg'][-1] == []:
-            stats['bg'].pop()
+        stats['bg'] = self.stats.samples.grouped_durations(Kind.bg, trim=True)
 
         return stats
@@ -0,0 +1,210 @@
+"""Define the :class:`Samples` table and the :class:`Aggregates` for thread statistics.
+
+The individual times of a thread are stored in columns of machine integers
+instead of lists of boxed :class:`~schedsi.cpu.time.Time`\\ s.
+The nested lists of :meth:`Thread.get_statistics <schedsi.threads.Thread.get_statistics>`
+are only created on demand.
+
+Alternatively, :class:`Aggregates` keep only online statistics of the times.
+"""
+
+import array
+import enum
+from schedsi.cpu.time import Time
+from schedsi.util.online_stats import OnlineStats
+
+#: The kinds of samples
+Kind = enum.IntEnum('Kind', ['run', 'wait', 'ctxsw', 'bg'], start=0)
+
+
+class TimeColumn:
+    """A column of times.
+
+    The times are stored as numerator and denominator in :class:`array.array`\\ s.
+    The denominators are only stored once a fraction is appended.
+    If a time does not fit, the column falls back to a :obj:`list` of the times.
+    """
+
+    def __init__(self):
+        """Create an empty :class:`TimeColumn`."""
+        self._numerators = array.array('q')
+        self._denominators = None
+        self._objects = None
+        # whether integers are returned as Time or int
+        self._time = None
+
+    def __len__(self):
+        """Return the number of times in the column."""
+        if self._objects is not None:
+            return len(self._objects)
+        return len(self._numerators)
+
+    def append(self, value):
+        """Append the time `value`."""
+        if self._objects is not None:
+            self._objects.append(value)
+            return
+        if self._time is None:
+            self._time = not isinstance(value, int)
+        try:
+            numerator, denominator = value.numerator, value.denominator
+            if denominator != 1 and self._denominators is None:
+                self._denominators = array.array('q', [1]) * len(self._numerators)
+            self._numerators.append(numerator)
+            if self._denominators is not None:
+                self._denominators.append(denominator)
+        except (AttributeError, OverflowError):
+            self._objects = self.tolist()
+            self._objects.append(value)
+
+    def tolist(self):
+        """Return the times as a :obj:`list`."""
+        if self._objects is not None:
+            return list(self._objects)
+        if self._denominators is None:
+            if self._time:
+                return [Time(numerator) for numerator in self._numerators]
+            return self._numerators.tolist()
+        # an overflow might leave a numerator without denominator
+        return [self._restore(numerator, denominator)
+                for numerator, denominator in zip(self._numerators, self._denominators)]
+
+    def _restore(self, numerator, denominator):
+        """Return the time `numerator / denominator`."""
+        if denominator != 1 or self._time:
+            return Time(numerator, denominator)
+        return numerator
+
+
+class Samples:
+    """A table of the individual times of a thread.
+
+    Each row is a (start, duration, kind) triple, with the kind being a :class:`Kind`.
+    Samples of one kind can be grouped, e.g. all times a thread ran between two waits.
+    Rows are appended with amortized growth.
+    """
+
+    def __init__(self, *groups):
+        """Create an empty :class:`Samples` table.
+
+        `groups` are the :class:`Kind`\\ s that start out with an (empty) group.
+        """
+        self.start = TimeColumn()
+        self.duration = TimeColumn()
+        self.kind = array.array('B')
+        self._counts = [0] * len(Kind)
+        # the number of samples of the kind before the start of each group
+        self._groups = [array.array('Q', [0] if kind in groups else []) for kind in Kind]
+
+    def __len__(self):
+        """Return the number of rows."""
+        return len(self.kind)
+
+    def append(self, kind, start, duration):
+        """Append a sample.
+
+        It becomes part of the last group of its `kind`.
+        """
+        self.start.append(start)
+        self.duration.append(duration)
+        self.kind.append(kind)
+        self._counts[kind] += 1
+
+    def new_group(self, kind):
+        """Start a new group for samples of `kind`."""
+        self._groups[kind].append(self._counts[kind])
+
+    def last_group_len(self, kind):
+        """Return the number of samples in the last group of `kind`."""
+        return self._counts[kind] - self._groups[kind][-1]
+
+    def durations(self, kind):
+        """Return a :obj:`list` of the durations of all samples of `kind`."""
+        return [duration for duration, sample_kind in zip(self.duration.tolist(), self.kind)
+                if sample_kind == kind]
+
+    def grouped_durations(self, kind, *, trim=False):
+        """Return a :obj:`list` of the groups of `kind`.
+
+        Each group is a :obj:`list` of durations.
+        If `trim` is set, an empty last group is left out.
+        """
+        durations = self.durations(kind)
+        groups = self._groups[kind]
+        ends = groups[1:].tolist() + [len(durations)]
+        grouped = [durations[start:end] for start, end in zip(groups, ends)]
+        if trim and grouped and grouped[-1] == []:
+            grouped.pop()
+        return grouped
+
+
+class Aggregates:
+    """Online aggregates of the times of a thread.
+
+    This has the same interface as :class:`Samples`,
+    but keeps only :class:`~schedsi.util.online_stats.OnlineStats` instead of the times.
+    Per :class:`Kind` there are statistics of the sums of the groups,
+    and for the :attr:`SAMPLE_KINDS` also of the individual samples.
+    Empty groups are not counted.
+    """
+
+    #: The kinds whose individual samples are aggregated (see :meth:`durations`)
+    #:
+    #: The thread statistics only contain the individual samples of context switches.
+    SAMPLE_KINDS = frozenset([Kind.ctxsw])
+
+    def __init__(self, *_groups):
+        """Create empty :class:`Aggregates`.
+
+        The parameters are ignored, they are accepted for compatibility with :class:`Samples`.
+        """
+        self._samples = [OnlineStats() if kind in self.SAMPLE_KINDS else None for kind in Kind]
+        self._groups = [OnlineStats() for _ in Kind]
+        self._group_sums = [0] * len(Kind)
+        self._group_lens = [0] * len(Kind)
+
+    def append(self, kind, _start, duration):
+        """Add a sample.
+
+        It becomes part of the last group of its `kind`.
+        """
+        samples = self._samples[kind]
+        if samples is not None:
+            samples.add(duration)
+        self._group_sums[kind] += duration
+        self._group_lens[kind] += 1
+
+    def new_group(self, kind):
+        """Start a new group for samples of `kind`."""
+        if self._group_lens[kind]:
+            self._groups[kind].add(self._group_sums[kind])
+        self._group_sums[kind] = 0
+        self._group_lens[kind] = 0
+
+    def last_group_len(self, kind):
+        """Return the number of samples in the last group of `kind`."""
+        return self._group_lens[kind]
+
+    def durations(self, kind):
+        """Return the aggregates of all samples of `kind` as a :obj:`dict`.
+
+        `kind` must be one of the :attr:`SAMPLE_KINDS`.
+        See :meth:`OnlineStats.to_dict <schedsi.util.online_stats.OnlineStats.to_dict>`.
+        """
+        samples = self._samples[kind]
+        if samples is None:
+            raise RuntimeError('Individual samples of {} are not aggregated.'.format(kind.name))
+        return samples.to_dict()
+
+    def grouped_durations(self, kind, *, trim=False):  # pylint: disable=unused-argument
+        """Return the aggregates of the group sums of `kind` as a :obj:`dict`.
+
+        This includes the last group.
+        `trim` is accepted for compatibility with :class:`Samples`.
+        See :meth:`OnlineStats.to_dict <schedsi.util.online_stats.OnlineStats.to_dict>`.
+        """
+        groups = self._groups[kind]
+        if self._group_lens[kind]:
+            groups = groups.copy()
+            groups.add(self._group_sums[kind])
+        return groups.to_dict()
@@ -1,12 +1,14 @@
 """Define the :class:`PeriodicWorkThread`."""
 
-from schedsi.cpu import request as cpurequest
+from schedsi.cpu import request as cpurequest, time as cputime
 from schedsi.threads.thread import Thread
 
 
 class PeriodicWorkThread(Thread):
     """A thread needing periodic bursts of CPU."""
 
+    __slots__ = ('original_ready_time', 'period', 'burst')
+
     def __init__(self, module, *args, period, burst, **kwargs):
         """Create a :class:`PeriodicWorkThread`."""
         if period <= burst:
@@ -20,7 +22,7 @@ class PeriodicWorkThread(Thread):
 
     def ideal_activations(self, current_time):
         """Return ideal number of activations at `current_time`."""
-        return int((current_time - self.original_ready_time) / self.period) + 1
+        return int((current_time - self.original_ready_time) // self.period) + 1
 
     def _update_ready_time(self, current_time):
         """Update :attr:`ready_time` if the current burst is finished.
@@ -28,7 +30,7 @@ class PeriodicWorkThread(Thread):
         Requires :attr:`current_burst_left` to be up-to-date.
         """
         assert current_time >= self.original_ready_time
-        act_actual = self.stats.total_run / self.burst
+        act_actual = cputime.div(self.stats.total_run, self.burst)
 
         if self.ideal_activations(current_time) != act_actual:
             assert (self.ready_time is None and self.remaining == 0) \
@@ -36,6 +38,31 @@ class PeriodicWorkThread(Thread):
         else:
             self.ready_time = int(act_actual) * self.period + self.original_ready_time
 
+    def _quota(self, current_time):
+        """Return how long to run at `current_time` to catch up with the bursts.
+
+        This respects :attr:`remaining`.
+        """
+        assert current_time >= self.original_ready_time
+
+        def act_ideal_in(delta):
+            """Return ideal number of activations after `delta` units."""
+            return self.ideal_activations(current_time + delta)
+
+        ideal_run_time = act_ideal_in(0) * self.burst
+        if self.stats.total_run > ideal_run_time:
+            raise RuntimeError('Executed too much')
+
+        quota = 0
+        # loop until ideal_run_time no longer increases
+        while self.stats.total_run + quota < ideal_run_time:
+            quota = ideal_run_time - self.stats.total_run
+            ideal_run_time = act_ideal_in(quota) * self.burst
+
+        if self.remaining is not None:
+            quota = min(self.remaining, quota)
+        return quota
+
     # will run as long as the summed up bursts require
     def execute(self):
         """Simulate execution.
@@ -47,31 +74,23 @@ class PeriodicWorkThread(Thread):
 
         current_time = yield cpurequest.Request.current_time()
         while True:
-            assert current_time >= self.original_ready_time
-
-            def act_ideal_in(delta):
-                """Return ideal number of activations after `delta` units."""
-                return self.ideal_activations(current_time + delta)
-
-            ideal_run_time = act_ideal_in(0) * self.burst
-            if self.stats.total_run > ideal_run_time:
-                raise RuntimeError('Executed too much')
-
-            quota = 0
-            # loop until ideal_run_time no longer increases
-            while self.stats.total_run + quota < ideal_run_time:
-                quota = ideal_run_time - self.stats.total_run
-                ideal_run_time = act_ideal_in(quota) * self.burst
-
+            quota = self._quota(current_time)
             if quota == 0:
                 current_time = yield cpurequest.Request.idle()
                 continue
 
-            if self.remaining is not None:
-                quota = min(self.remaining, quota)
-
             current_time = yield from super()._execute(current_time, quota)
 
+    def next_request(self, current_time):
+        """See :meth:`Thread.next_request`."""
+        if current_time is None or self.is_finished():
+            return super().next_request(current_time)
+        quota = self._quota(current_time)
+        if quota == 0:
+            return cpurequest.Request.idle()
+        self._update_ready_time(current_time)
+        return cpurequest.Request.execute(quota)
+
     def run_crunch(self, current_time, run_time):
         """Update runtime state.
 
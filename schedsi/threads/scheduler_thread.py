@@ -15,38 +15,106 @@ class SchedulerThread(_BGStatThread):
         super().__init__(scheduler.module, *args, **kwargs)
         self._scheduler = scheduler
         self.last_bg_time = None
+        # the background time passed to the next decision of the scheduler
+        self._prev_run_time = None
+        # abusing a list as communication channel
+        self._next_ready_time = [None]
+        # the coroutine of the decision being made,
+        # or the function continuing the last decision with the reply to its request
+        self._decision = None
+        self._continuation = None
+        # the first request of the scheduler, waiting for the reply to our own first request
+        self._first_request = None
+
+    def __getstate__(self):
+        """Return the state for :mod:`pickle`.
+
+        The scheduler must not be in the middle of a decision.
+
+        See :meth:`Thread.__getstate__`.
+        """
+        if self._decision is not None:
+            raise RuntimeError('Cannot save the scheduler of {} while it makes a decision.'.format(
+                self.module.name))
+        return super().__getstate__()
+
+    @property
+    def scheduler(self):
+        """The scheduler the execution is forwarded to."""
+        return self._scheduler
 
     def execute(self):
         """Simulate execution.
 
-        Simply forward to the scheduler.
+        Yields the requests of :meth:`next_request`.
 
         See :meth:`Thread.execute`.
         """
-        locked = self.is_running.acquire(False)
-        assert locked
-
-        # abusing a list as communication channel
-        bg_time = [self.last_bg_time]
-        scheduler_ready_time = [None]
-
-        scheduler = self._scheduler.schedule(bg_time, scheduler_ready_time)
-        request = next(scheduler)
-        self._update_ready_time((yield cpurequest.Request.current_time()))
+        request = self.next_request(None)
         while True:
-            self.last_bg_time = 0
-
-            if request.rtype == cpurequest.Type.idle:
-                if scheduler_ready_time[0] is not None:
-                    self.ready_time = scheduler_ready_time[0]
-                else:
-                    self.remaining = 0
-                    self.end()
+            request = self.next_request((yield request))
 
-            answer = yield request
+    def _next_scheduler_request(self, answer):
+        """Return the next request of the scheduler.
 
-            bg_time[0] = self.last_bg_time
-            request = scheduler.send(answer)
+        `answer` is sent to the decision being made,
+        or passed to the continuation of the last decision before making the next one
+        (see :meth:`Scheduler.schedule <schedsi.schedulers.Scheduler.schedule>`).
+        """
+        while True:
+            if self._decision is None:
+                continuation = self._continuation
+                if continuation is not None:
+                    self._continuation = None
+                    continuation(answer)
+                answer = None
+                self._decision = self._scheduler.schedule(self._prev_run_time,
+                                                          self._next_ready_time)
+            try:
+                return self._decision.send(answer)
+            except StopIteration as decision:
+                self._decision = None
+                request, self._continuation = decision.value
+                if request is not None:
+                    return request
+
+    def next_request(self, reply):
+        """Return the next :class:`~schedsi.cpurequest.Request`.
+
+        Simply forward the requests of the scheduler.
+        Between the decisions of the scheduler, no coroutine is running.
+
+        See :meth:`Thread.next_request`.
+        """
+        if reply is None:
+            locked = self.is_running.acquire(False)
+            assert locked
+
+            self._prev_run_time = self.last_bg_time
+            self._next_ready_time = [None]
+            self._decision = None
+            self._continuation = None
+            self._first_request = self._next_scheduler_request(None)
+            return cpurequest.Request.current_time()
+
+        if self._first_request is not None:
+            self._update_ready_time(reply)
+            request = self._first_request
+            self._first_request = None
+        else:
+            self._prev_run_time = self.last_bg_time
+            request = self._next_scheduler_request(reply)
+
+        self.last_bg_time = 0
+
+        if request.rtype == cpurequest.Type.idle:
+            if self._next_ready_time[0] is not None:
+                self.ready_time = self._next_ready_time[0]
+            else:
+                self.remaining = 0
+                self.end()
+
+        return request
 
     def run_background(self, current_time, run_time):
         """Update runtime state.
@@ -56,6 +124,14 @@ class SchedulerThread(_BGStatThread):
         self.last_bg_time += run_time
         super().run_background(current_time, run_time)
 
+    def fork(self, tid):
+        """Create another :class:`SchedulerThread` for the same scheduler.
+
+        This is used to run the scheduler on another VCPU.
+        """
+        self._scheduler.add_vcpu()
+        return SchedulerThread(tid, scheduler=self._scheduler)
+
     def num_threads(self):
         """Return number of threads in :attr:`_scheduler`."""
         return self._scheduler.num_threads()
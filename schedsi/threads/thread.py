@@ -2,24 +2,37 @@
 
 import threading
 from schedsi.cpu import request as cpurequest
-from schedsi.cpu.time import Time
+from schedsi.threads._samples import Aggregates, Kind, Samples
 
 
 #: Whether to log individual times, or only the sum
+#:
+#: Set to :data:`AGGREGATE` to keep only online aggregates of the individual times
+#: (see :class:`~schedsi.util.online_stats.OnlineStats`).
+#: This must be set before the threads are created.
 LOG_INDIVIDUAL = True
 
+#: Value of :data:`LOG_INDIVIDUAL` to keep online aggregates
+AGGREGATE = 'aggregate'
+
 
 class _ThreadStats:  # pylint: disable=too-few-public-methods
-    """Thread statistics."""
+    """Thread statistics.
+
+    The individual times are kept in a :class:`~schedsi.threads._samples.Samples` table,
+    or in :class:`~schedsi.threads._samples.Aggregates` if :data:`LOG_INDIVIDUAL` is
+    :data:`AGGREGATE`.
+    """
+
+    __slots__ = ('finished_time', 'response_time', 'total_run', 'samples')
 
     def __init__(self):
         """Create a :class:`_ThreadStats`."""
         self.finished_time = None
         self.response_time = None
-        self.ctxsw = []
-        self.run = []
-        self.total_run = Time(0)
-        self.wait = [[]]
+        self.total_run = 0
+        samples_class = Aggregates if LOG_INDIVIDUAL == AGGREGATE else Samples
+        self.samples = samples_class(Kind.wait, Kind.bg)
 
 
 class Thread:
@@ -34,8 +47,23 @@ class Thread:
         * remaining workload (`None` if infinite)
         * a lock indicating whether this thread is currently active
         * :class:`_ThreadStats`
+
+    The requests of :meth:`execute` can also be obtained one by one from :meth:`next_request`,
+    which does not need a generator.
+    Subclasses overriding :meth:`execute` or :meth:`_execute` but not :meth:`next_request`
+    get :attr:`next_request` set to `None`, so that their generator is used.
     """
 
+    __slots__ = ('module', 'tid', 'ready_time', 'response_units', 'remaining', 'is_running',
+                 'stats')
+
+    def __init_subclass__(cls, **kwargs):
+        """Disable :meth:`next_request` if the subclass changes :meth:`execute`."""
+        super().__init_subclass__(**kwargs)
+        overrides = vars(cls)
+        if ('execute' in overrides or '_execute' in overrides) and 'next_request' not in overrides:
+            cls.next_request = None
+
     def __init__(self, module, tid=None, *, ready_time=0, units=None, response_units=None):
         """Create a :class:`Thread`."""
         assert ready_time >= 0
@@ -52,6 +80,31 @@ class Thread:
         self.is_running = threading.Lock()
         self.stats = _ThreadStats()
 
+    def __getstate__(self):
+        """Return the state for :mod:`pickle`.
+
+        The :attr:`is_running` lock is saved as whether it is held.
+        """
+        state = dict(getattr(self, '__dict__', {}))
+        for cls in type(self).__mro__:
+            for name in getattr(cls, '__slots__', ()):
+                if hasattr(self, name):
+                    state[name] = getattr(self, name)
+        state['is_running'] = self.is_running.locked()
+        return state
+
+    def __setstate__(self, state):
+        """Restore the state from :mod:`pickle`.
+
+        See :meth:`__getstate__`.
+        """
+        running = state.pop('is_running')
+        for name, value in state.items():
+            setattr(self, name, value)
+        self.is_running = threading.Lock()
+        if running:
+            self.is_running.acquire()
+
     def execute(self):
         """Simulate execution.
 
@@ -67,6 +120,21 @@ class Thread:
         while True:
             current_time = yield from self._execute(current_time, None)
 
+    def next_request(self, current_time):
+        """Return the next :class:`~schedsi.cpurequest.Request` :meth:`execute` would yield.
+
+        `current_time` is `None` for the first request,
+        otherwise it is the reply to the previous request.
+        """
+        if current_time is None:
+            locked = self.is_running.acquire(False)
+            assert locked
+            return cpurequest.Request.current_time()
+        if self.is_finished():
+            return cpurequest.Request.idle()
+        self._update_ready_time(current_time)
+        return cpurequest.Request.execute(self.remaining)
+
     def _update_ready_time(self, current_time):
         """Update ready_time while executing.
 
@@ -112,7 +180,7 @@ class Thread:
         """
         return self.remaining == 0
 
-    def run_ctxsw(self, _current_time, run_time):
+    def run_ctxsw(self, current_time, run_time):
         """Update runtime state.
 
         This should be called just after a context switch to another thread
@@ -126,7 +194,7 @@ class Thread:
             locked = self.is_running.acquire(False)
             assert locked
         if LOG_INDIVIDUAL:
-            self.stats.ctxsw.append(run_time)
+            self.stats.samples.append(Kind.ctxsw, current_time - run_time, run_time)
 
     def run_background(self, _current_time, _run_time):
         """Update runtime state.
@@ -149,8 +217,7 @@ class Thread:
 
         self.stats.total_run += run_time
         if LOG_INDIVIDUAL:
-            self.stats.run[-1].append(run_time)
-            assert self.stats.total_run == sum(map(sum, self.stats.run))
+            self.stats.samples.append(Kind.run, current_time - run_time, run_time)
 
         self.ready_time += run_time
         assert self.ready_time == current_time
@@ -190,7 +257,7 @@ class Thread:
         if self.is_running.locked():
             if LOG_INDIVIDUAL:
                 # only record waiting time if the thread has executed
-                self.stats.wait.append([])
+                self.stats.samples.new_group(Kind.wait)
             if self.ready_time is not None:
                 self.ready_time = max(self.ready_time, current_time)
             else:
@@ -214,8 +281,9 @@ class Thread:
             if current_time >= self.ready_time:
                 if LOG_INDIVIDUAL:
                     # we only want to record waiting time if the thread is ready to execute
-                    self.stats.wait[-1].append(current_time - self.ready_time)
-                    self.stats.run.append([])
+                    self.stats.samples.append(Kind.wait, self.ready_time,
+                                              current_time - self.ready_time)
+                    self.stats.samples.new_group(Kind.run)
                 # we can't use _update_ready_time() here because we might not yet be executing
                 self.ready_time = current_time
 
@@ -234,15 +302,20 @@ class Thread:
         """
         # the CPU should be locked during this
         # this means we can read data without locking self.is_running
-        stats = self.stats.__dict__.copy()
+        samples = self.stats.samples
+        stats = {
+            'finished_time': self.stats.finished_time,
+            'response_time': self.stats.response_time,
+            'total_run': self.stats.total_run,
+            'ctxsw': samples.durations(Kind.ctxsw),
+            'run': samples.grouped_durations(Kind.run),
+            'wait': samples.grouped_durations(Kind.wait, trim=True)
+        }
 
         if not self.is_finished() and current_time >= self.ready_time:
             assert self.ready_time is not None
             stats['waiting'] = current_time - self.ready_time
 
-        if stats['wait'] and stats['wait'][-1] == []:
-            stats['wait'].pop()
-
         stats['remaining'] = self.remaining
 
         return stats
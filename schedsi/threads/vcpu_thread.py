@@ -18,6 +18,8 @@ class VCPUThread(_BGStatThread):
             print(module.name, 'is adding a VCPUThread for', child.name,
                   'although it is not a direct descendant.', file=sys.stderr)
         self._chain = context.Chain.from_thread(child.register_vcpu(self))
+        # whether the child just returned
+        self._returned = False
         if not isinstance(self._chain.bottom, SchedulerThread):
             print('VCPUThread expected a SchedulerThread, got', type(self._thread).__name__, '.',
                   file=sys.stderr)
@@ -33,21 +35,41 @@ class VCPUThread(_BGStatThread):
     def execute(self):
         """Simulate execution.
 
-        Switch context and forward to child thread.
+        Yields the requests of :meth:`next_request`.
 
         See :meth:`Thread.execute`.
         """
-        locked = self.is_running.acquire(False)
-        assert locked
-
-        current_time = yield cpurequest.Request.current_time()
+        request = self.next_request(None)
         while True:
-            self._update_ready_time(current_time)
-            self._chain = yield cpurequest.Request.resume_chain(self._chain)
-            current_time = yield cpurequest.Request.current_time()
+            request = self.next_request((yield request))
+
+    def next_request(self, reply):
+        """Return the next :class:`~schedsi.cpurequest.Request`.
+
+        Switch context and forward to child thread.
+        When the child returns, idle until it is ready again.
+
+        See :meth:`Thread.next_request`.
+        """
+        if reply is None:
+            locked = self.is_running.acquire(False)
+            assert locked
+            self._returned = False
+            return cpurequest.Request.current_time()
+
+        if isinstance(reply, context.Chain):
+            self._chain = reply
+            self._returned = True
+            return cpurequest.Request.current_time()
+
+        if self._returned:
+            self._returned = False
             next_ready_time = self._thread.ready_time
-            if next_ready_time is None or next_ready_time > current_time:
-                current_time = yield cpurequest.Request.idle()
+            if next_ready_time is None or next_ready_time > reply:
+                return cpurequest.Request.idle()
+
+        self._update_ready_time(reply)
+        return cpurequest.Request.resume_chain(self._chain)
 
     def suspend(self, current_time):
         """Become suspended.
@@ -131,6 +131,30 @@ class ModuleBuilderThread(threads.Thread):
         super().__init__(parent, *self.init_args[0], **self.init_args[1])
         self.init_args = None
 
+    def __getstate__(self):
+        """Return the state for :mod:`pickle`.
+
+        The methods replaced by :meth:`disable_spawning` are not saved,
+        only whether spawning is disabled.
+
+        See :meth:`Thread.__getstate__`.
+        """
+        state = super().__getstate__()
+        for name in ('_execute', 'suspend', 'end'):
+            state.pop(name, None)
+        state['spawning_disabled'] = self.is_spawning_disabled()
+        return state
+
+    def __setstate__(self, state):
+        """Restore the state from :mod:`pickle`.
+
+        See :meth:`__getstate__`.
+        """
+        spawning_disabled = state.pop('spawning_disabled')
+        super().__setstate__(state)
+        if spawning_disabled:
+            self.disable_spawning()
+
     def disable_spawning(self):
         """Pass execution directly to `super()`.
 
@@ -171,6 +195,25 @@ class ModuleBuilderThread(threads.Thread):
             run_time = self.spawn_time - current_time
         return (yield from super()._execute(current_time, run_time))
 
+    def next_request(self, current_time):
+        """Return the next :class:`~schedsi.cpurequest.Request`.
+
+        See :meth:`Thread.next_request`.
+
+        Spawns the module when it's time, like :meth:`_execute`.
+        """
+        if current_time is None or self.is_spawning_disabled():
+            return super().next_request(current_time)
+        if self.spawn_time <= current_time:
+            self._spawn_module(current_time)
+            self.disable_spawning()
+            if super().is_finished():
+                self._update_ready_time(current_time)
+                return cpurequest.Request.idle()
+            return super().next_request(current_time)
+        self._update_ready_time(current_time)
+        return cpurequest.Request.execute(self.spawn_time - current_time)
+
     def suspend(self, current_time):  # pylint: disable=method-hidden
         """Become suspended.
 
@@ -221,8 +264,9 @@ class ModuleBuilderThread(threads.Thread):
                 thread = thread(child, *args, **kwargs)
             child.add_thread(thread)
 
-        for _ in range(0, self.vcpus):
-            self.module.add_thread(threads.VCPUThread(self.module, child=child))
+        for i in range(0, self.vcpus):
+            tid = child.name + '-VCPU' + str(i)
+            self.module.add_thread(threads.VCPUThread(self.module, child=child, tid=tid))
 
         self.spawn_skew = current_time - self.spawn_time
 
@@ -233,6 +277,7 @@ class ModuleBuilderThread(threads.Thread):
         """
         stats = super().get_statistics(current_time)
         stats.update({'spawn_skew': self.spawn_skew})
+        return stats
 
     def add_thread(self, thread, *args, **kwargs):
         """Add a :class:`Thread`.
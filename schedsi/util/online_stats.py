@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""Online statistics that do not keep the individual samples.
+
+:class:`OnlineStats` keeps the count, mean, variance, minimum and maximum
+of a stream of non-negative times, as well as a :class:`QuantileSketch`
+to estimate quantiles.
+Both can be merged, e.g. to aggregate multiple threads or simulation runs.
+"""
+
+import math
+
+#: The relative accuracy of the quantiles of a :class:`QuantileSketch`
+DEFAULT_ALPHA = 0.01
+
+#: The quantiles included in :meth:`OnlineStats.to_dict`
+QUANTILES = {'p50': 0.5, 'p99': 0.99, 'p999': 0.999}
+
+
+class QuantileSketch:
+    """A mergeable sketch to estimate quantiles of non-negative values.
+
+    Values are counted in logarithmically sized buckets, so that any quantile
+    is estimated with a relative error of at most `alpha`.
+    Zero gets a bucket of its own.
+    Memory depends only on the range of the values, not on their number.
+    """
+
+    def __init__(self, alpha=DEFAULT_ALPHA):
+        """Create an empty :class:`QuantileSketch`."""
+        assert 0 < alpha < 1
+        self.alpha = alpha
+        self._gamma = (1 + alpha) / (1 - alpha)
+        self._log_gamma = math.log(self._gamma)
+        self.count = 0
+        self.zeros = 0
+        self.buckets = {}
+
+    def add(self, value, count=1):
+        """Add `value` `count` times."""
+        self.count += count
+        if value <= 0:
+            self.zeros += count
+            return
+        idx = math.ceil(math.log(value) / self._log_gamma)
+        self.buckets[idx] = self.buckets.get(idx, 0) + count
+
+    def merge(self, other):
+        """Add all values of the :class:`QuantileSketch` `other`."""
+        if other.alpha != self.alpha:
+            raise RuntimeError('Cannot merge quantile sketches of different accuracy.')
+        self.count += other.count
+        self.zeros += other.zeros
+        for idx, count in other.buckets.items():
+            self.buckets[idx] = self.buckets.get(idx, 0) + count
+
+    def _value(self, idx):
+        """Return the value representing the bucket `idx`."""
+        return 2 * self._gamma ** idx / (self._gamma + 1)
+
+    def histogram(self):
+        """Return a list of (value, count) pairs, ordered by value.
+
+        Each value represents one bucket.
+        """
+        histogram = [(0, self.zeros)] if self.zeros else []
+        histogram += ((self._value(idx), count) for idx, count in sorted(self.buckets.items()))
+        return histogram
+
+    def quantile(self, quantile):
+        """Return an estimate of the `quantile` (between 0 and 1).
+
+        Returns `None` if the sketch is empty.
+        """
+        if not self.count:
+            return None
+        rank = quantile * (self.count - 1)
+        seen = 0
+        for value, count in self.histogram():
+            seen += count
+            if seen > rank:
+                return value
+        assert False, 'Quantile rank out of range'
+
+    def to_dict(self):
+        """Return the sketch as a :obj:`dict` for logging.
+
+        The bucket indices are converted to strings,
+        so the logs do not mistake the buckets for times.
+        """
+        return {
+            'alpha': self.alpha,
+            'zeros': self.zeros,
+            'buckets': {str(idx): count for idx, count in self.buckets.items()}
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        """Create a :class:`QuantileSketch` from the output of :meth:`to_dict`."""
+        sketch = cls(data['alpha'])
+        sketch.add(0, int(data['zeros']))
+        for idx, count in data['buckets'].items():
+            sketch.buckets[int(idx)] = int(count)
+            sketch.count += int(count)
+        return sketch
+
+
+class OnlineStats:
+    """Online aggregates of a stream of non-negative times.
+
+    Mean and variance are tracked as :obj:`float` using Welford's algorithm,
+    minimum and maximum are kept exactly.
+    """
+
+    def __init__(self, alpha=DEFAULT_ALPHA):
+        """Create an empty :class:`OnlineStats`.
+
+        `alpha` is the accuracy of the :class:`QuantileSketch`.
+        """
+        self.count = 0
+        self.mean = 0.0
+        self._sum_sq_diff = 0.0
+        self.min = None
+        self.max = None
+        self.sketch = QuantileSketch(alpha)
+
+    @property
+    def variance(self):
+        """The population variance."""
+        if not self.count:
+            return 0.0
+        return self._sum_sq_diff / self.count
+
+    def add(self, value):
+        """Add `value`."""
+        self.count += 1
+        float_value = float(value)
+        delta = float_value - self.mean
+        self.mean += delta / self.count
+        self._sum_sq_diff += delta * (float_value - self.mean)
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+        self.sketch.add(float_value)
+
+    def merge(self, other):
+        """Add all values of the :class:`OnlineStats` `other`."""
+        if not other.count:
+            return
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / count
+        self._sum_sq_diff += other._sum_sq_diff + delta * delta * self.count * other.count / count
+        self.count = count
+        if self.min is None or other.min < self.min:
+            self.min = other.min
+        if self.max is None or other.max > self.max:
+            self.max = other.max
+        self.sketch.merge(other.sketch)
+
+    def copy(self):
+        """Return a copy."""
+        copy = OnlineStats(self.sketch.alpha)
+        copy.merge(self)
+        return copy
+
+    def quantile(self, quantile):
+        """Return an estimate of the `quantile` (between 0 and 1).
+
+        This is the estimate of the :class:`QuantileSketch` clamped to the minimum and maximum.
+        Returns `None` if there are no values.
+        """
+        estimate = self.sketch.quantile(quantile)
+        if estimate is None:
+            return None
+        return min(max(estimate, float(self.min)), float(self.max))
+
+    def to_dict(self):
+        """Return the aggregates as a :obj:`dict` for logging.
+
+        This includes the estimates of the :data:`QUANTILES`.
+        """
+        stats = {
+            'count': self.count,
+            'mean': self.mean,
+            'variance': self.variance,
+            'min': self.min,
+            'max': self.max,
+            'sketch': self.sketch.to_dict()
+        }
+        stats.update((name, self.quantile(quantile)) for name, quantile in QUANTILES.items())
+        return stats
+
+    @classmethod
+    def from_dict(cls, data):
+        """Create an :class:`OnlineStats` from the output of :meth:`to_dict`."""
+        sketch = QuantileSketch.from_dict(data['sketch'])
+        stats = cls(sketch.alpha)
+        stats.sketch = sketch
+        stats.count = int(data['count'])
+        stats.mean = float(data['mean'])
+        stats._sum_sq_diff = float(data['variance']) * stats.count
+        stats.min = data['min']
+        stats.max = data['max']
+        return stats
@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+"""Functionality to validate :mod:`time backends <schedsi.cpu.time>` against each other."""
+
+import difflib
+import io
+from schedsi import world
+from schedsi.log import textlog
+
+
+def _text_log(make_kernel, until, time_backend, time_precision, world_kwargs):
+    """Run a :class:`~schedsi.world.World` and return its text log."""
+    text_buf = io.StringIO()
+    text_log = textlog.TextLog(text_buf, time_precision=time_precision)
+
+    the_world = world.World(1, make_kernel(), text_log, time_backend=time_backend, **world_kwargs)
+    the_world.run_until(until)
+    the_world.log_statistics()
+
+    return text_buf.getvalue().splitlines(keepends=True)
+
+
+def compare_time_backends(make_kernel, until, backends=('mpq', 'int'), *,
+                          time_precision=16, **world_kwargs):
+    """Run the same simulation with each time backend and diff the text logs.
+
+    `make_kernel` is called once per backend and must return a fresh kernel
+    :class:`~schedsi.module.Module` each time, since a hierarchy can only be simulated once.
+    The simulation runs until `until` (see :meth:`World.run_until <schedsi.world.World.run_until>`).
+    `world_kwargs` are forwarded to the :class:`~schedsi.world.World`.
+
+    Returns a list of unified diff lines between the first and each other backend;
+    it is empty if all logs match.
+    """
+    reference, *others = backends
+    expected = _text_log(make_kernel, until, reference, time_precision, world_kwargs)
+    diff = []
+    for backend in others:
+        result = _text_log(make_kernel, until, backend, time_precision, world_kwargs)
+        diff += difflib.unified_diff(expected, result, reference, backend)
+    return diff
@@ -1,41 +1,189 @@
 #!/usr/bin/env python3
 """Defines the :class:`World`."""
 
+import heapq
 import io
+import pickle
+from schedsi import snapshot
 from schedsi.log import binarylog
-from schedsi.cpu import core as cpucore
+from schedsi.cpu import core as cpucore, profile as cpuprofile
 
 
 class World:
     """The world keeps data to enable execution."""
 
-    def __init__(self, cores, kernel, log=binarylog.BinaryLog(io.BytesIO()), *,
-                 local_timer_scheduling):
-        """Create a :class:`World`."""
-        if cores > 1:
-            raise RuntimeError('Does not support more than 1 core yet.')
-        self.cores = [cpucore.Core(idx, kernel._scheduler_thread, log,
-                                   local_timer_scheduling=local_timer_scheduling)
+    def __init__(self, cores, kernel, log=None, *,
+                 local_timer_scheduling, time_backend=None, profile=False):
+        """Create a :class:`World`.
+
+        `log` defaults to a :class:`~schedsi.log.binarylog.BinaryLog` to memory.
+        `time_backend` names the :mod:`time backend <schedsi.cpu.time>` to use.
+        If `profile` is set, each :class:`~schedsi.cpu.core.Core` records a
+        :class:`~schedsi.cpu.profile.Profile` (see :meth:`get_profile`).
+
+        With multiple `cores` the kernel schedules globally, i.e. all
+        :class:`Cores <schedsi.cpu.core.Core>` share the kernel's scheduler.
+        This requires `local_timer_scheduling`.
+        """
+        if cores > 1 and not local_timer_scheduling:
+            raise RuntimeError('Multiple cores require local timer scheduling.')
+        if log is None:
+            log = binarylog.BinaryLog(io.BytesIO())
+        peer_time = self._peer_time if cores > 1 else None
+        self.cores = [cpucore.Core(idx, kernel, log,
+                                   local_timer_scheduling=local_timer_scheduling,
+                                   time_backend=time_backend, peer_time=peer_time,
+                                   profile=profile)
                       for idx in range(0, cores)]
-        for core in self.cores:
-            kernel.register_vcpu(core)
+        # the cores are executed in the order of their current time
+        # the counter breaks ties round-robin and keeps cores from being compared
+        self._queue = [(core.status.current_time, idx, core) for idx, core in enumerate(self.cores)]
+        self._counter = len(self.cores)
         self.log = log
 
+    def __getstate__(self):
+        """Return the state for :mod:`pickle`, without the :attr:`log`.
+
+        See :meth:`snapshot`.
+        """
+        state = self.__dict__.copy()
+        state['log'] = None
+        return state
+
+    def _peer_time(self, after):
+        """Return the earliest current time of the other cores that could make progress.
+
+        These are the cores later than `after` and the cores at `after`
+        that are not waiting for other cores themselves.
+        While a :class:`~schedsi.cpu.core.Core` executes, it is not in the queue,
+        so the queue holds exactly the other cores.
+
+        Returns `None` if there is no such time.
+        """
+        return min((time for time, _, core in self._queue
+                    if time > after or (time == after and not core.status.waiting_for_peers)),
+                   default=None)
+
     def step(self):
-        """Execute one timer quantum for each :class:`~schedsi.cpu.core.Core` in the \
-        :class:`World`.
+        """Execute one step of the :class:`~schedsi.cpu.core.Core` that is the furthest behind.
 
-        Returns the current time."""
-        assert len(self.cores) == 1
-        core = self.cores[0]
+        Returns the current time, which is the time of the :class:`~schedsi.cpu.core.Core`
+        that is the furthest behind after the step."""
+        if len(self.cores) == 1:
+            core = self.cores[0]
+            core.execute()
+            return core.status.current_time
+
+        queue = self._queue
+        core = heapq.heappop(queue)[2]
         core.execute()
-        return core.status.current_time
+        heapq.heappush(queue, (core.status.current_time, self._counter, core))
+        self._counter += 1
+        return queue[0][0]
 
-    def log_statistics(self):
-        """Log statistics."""
+    def run_until(self, time):
+        """Execute until the current time exceeds `time`.
+
+        This is equivalent to, but cheaper than::
+
+            while world.step() <= time:
+                pass
+
+        The simulation does not stop exactly at `time`:
+        steps are not split, so the last step overshoots `time` by up to its whole length
+        (e.g. a thread executing or a CPU idling) and its events are logged.
+        This keeps the log the same as with single steps.
+
+        Returns the current time (see :meth:`step`), which exceeds `time`."""
+        if len(self.cores) != 1:
+            current_time = self.step()
+            while current_time <= time:
+                current_time = self.step()
+            return current_time
+
+        status = self.cores[0].status
+        execute = status.execute
+        while True:
+            execute()
+            if status.current_time > time:
+                return status.current_time
+
+    def run(self, max_events):
+        """Execute `max_events` steps.
+
+        This is equivalent to, but cheaper than calling :meth:`step` `max_events` times.
+
+        Returns the current time."""
+        if len(self.cores) != 1:
+            current_time = self._queue[0][0]
+            for _ in range(0, max_events):
+                current_time = self.step()
+            return current_time
+
+        status = self.cores[0].status
+        execute = status.execute
+        for _ in range(0, max_events):
+            execute()
+        return status.current_time
+
+    def get_statistics(self):
+        """Obtain statistics.
+
+        Returns a tuple of the thread statistics of the kernel
+        (see :meth:`Module.get_thread_statistics <schedsi.module.Module.get_thread_statistics>`)
+        and a list of the :class:`~schedsi.cpu.core.Core` statistics.
+        """
         kernel = self.cores[0].kernel
         # there should be only one kernel
         assert all(c.kernel == kernel for c in self.cores)
         current_time = max(core.status.current_time for core in self.cores)
-        self.log.thread_statistics(kernel.get_thread_statistics(current_time))
-        self.log.cpu_statistics(core.get_statistics() for core in self.cores)
+        return (kernel.get_thread_statistics(current_time),
+                [core.get_statistics() for core in self.cores])
+
+    def get_profile(self):
+        """Return the :class:`~schedsi.cpu.profile.Profile` of all cores merged.
+
+        Returns `None` if the :class:`World` is not profiling.
+        The :class:`~schedsi.cpu.core.Core` statistics include the individual profiles.
+        """
+        if self.cores[0].profile is None:
+            return None
+        merged = cpuprofile.Profile()
+        for core in self.cores:
+            merged.merge(core.profile)
+        return merged
+
+    def set_log(self, log, *, register=True):
+        """Replace the log of the :class:`World` and its :class:`Cores <schedsi.cpu.core.Core>`.
+
+        The cores are registered with the new `log` in their current state,
+        unless `register` is false, e.g. if `log` continues a log
+        in which they are registered already (see :mod:`schedsi.checkpoint`).
+        """
+        self.log = log
+        for core in self.cores:
+            core.log = log
+            if register:
+                log.init_core(core)
+
+    def snapshot(self):
+        """Return a :class:`~schedsi.snapshot.Snapshot` of the current state.
+
+        See :mod:`schedsi.snapshot`.
+        """
+        return snapshot.Snapshot(pickle.dumps(self, pickle.HIGHEST_PROTOCOL))
+
+    @staticmethod
+    def restore(snap, log=None):
+        """Return a new :class:`World` restored from the :class:`~schedsi.snapshot.Snapshot` `snap`.
+
+        `log` defaults to a :class:`~schedsi.log.binarylog.BinaryLog` to memory.
+        The cores are registered with `log` in their restored state.
+        """
+        return snap.restore(log)
+
+    def log_statistics(self):
+        """Log statistics."""
+        thread_stats, cpu_stats = self.get_statistics()
+        self.log.thread_statistics(thread_stats)
+        self.log.cpu_statistics(cpu_stats)
@@ -41,6 +41,10 @@ class TestExample(unittest.TestCase):
         """Test that the fixed-cfs example can run."""
         self.example('fixed_cfs')
 
+    def test_cfs_sweep(self):  # pylint: disable=no-self-use
+        """Test that the cfs-sweep example can run."""
+        self.example('cfs_sweep')
+
 
 if __name__ == '__main__':
     unittest.main()
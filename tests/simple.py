@@ -4,10 +4,81 @@
 import difflib
 import importlib
 import io
+import os
+import random
+import tempfile
 import unittest
-from schedsi import world
-from schedsi.log import textlog
+from schedsi import checkpoint, checks, schedulers, snapshot, sweep, threads, world
+from schedsi.cpu import core as cpucore, request as cpurequest
+from schedsi.log import binarylog, textlog
+from schedsi.schedulers.addons import penalty_tracker
+from schedsi.util import hierarchy_builder, time_validation
 from tests import common
+from benchmarks import suite
+from example import cfs
+
+_PTRR = penalty_tracker.PenaltyTracker.attach('PTRR', schedulers.RoundRobin)
+
+
+def _make_cfs_kernel(**params):
+    """Create the kernel of the CFS example with the specified parameters."""
+    return cfs.build_kernel(**params).module
+
+
+def _continue_world(the_world, until, textlog_align):
+    """Continue `the_world` until `until` and return the text log from there on."""
+    text_buf = io.StringIO()
+    the_world.set_log(textlog.TextLog(text_buf, textlog_align, time_precision=16))
+    the_world.run_until(until)
+    the_world.log_statistics()
+    return text_buf.getvalue()
+
+
+def _fail_world(the_world):
+    """Raise an exception."""
+    raise ValueError(the_world.cores[0].status.current_time)
+
+
+def _never_block(_niceness, _nicenesses, _blocked):
+    """Never block a thread.
+
+    This is the `block` function for the :class:`PenaltyTracker`.
+    """
+    return False
+
+
+def _make_penalty_tracker_kernel():
+    """Create a kernel with a :class:`PenaltyTracker` and a child module without time-slices."""
+    kernel = hierarchy_builder.ModuleBuilder(
+        scheduler=_PTRR.builder(time_slice=9, override_time_slice=10, block=_never_block))
+    top = kernel.add_module(scheduler=schedulers.RoundRobin.builder(time_slice=None))
+    kernel.add_thread(threads.Thread) \
+          .add_thread(threads.PeriodicWorkThread, ready_time=5, units=50, period=20, burst=5) \
+          .add_vcpus()
+    top.add_thread(threads.Thread, units=30) \
+       .add_thread(threads.Thread, ready_time=7, units=25) \
+       .add_vcpus()
+    return kernel.module
+
+
+class _CoroutineModuleBuilderThread(hierarchy_builder.ModuleBuilderThread):
+    """A :class:`ModuleBuilderThread` executing its coroutine instead of
+    :meth:`~ModuleBuilderThread.next_request`."""
+
+    _execute = hierarchy_builder.ModuleBuilderThread._execute
+
+
+def _make_spawning_kernel(local_timer_scheduling, spawner=hierarchy_builder.ModuleBuilderThread):
+    """Create a kernel with a `spawner` thread that spawns a module at time 30."""
+    kernel = hierarchy_builder.ModuleBuilder(
+        scheduler=schedulers.RoundRobin.builder(time_slice=10))
+    kernel.add_thread(threads.Thread)
+    time_slice = 5 if local_timer_scheduling else None
+    spawner(kernel.module, 'spawned', time=30, ready_time=10, units=40,
+            scheduler=schedulers.RoundRobin.builder(time_slice=time_slice)) \
+        .add_thread(threads.Thread, units=20) \
+        .add_thread(threads.Thread, ready_time=-5, units=10)
+    return kernel.module
 
 
 class TestExample(unittest.TestCase):
@@ -26,17 +97,33 @@ class TestExample(unittest.TestCase):
         spec.loader.exec_module(module)
         return module.KERNEL.module
 
-    def exec_world(self, log, *world_args, **world_kwargs):
-        """Create and run a world and test the produced log against a reference."""
+    def exec_world(self, log, *world_args, run_until=False, binary_log=None, **world_kwargs):
+        """Create and run a world and test the produced log against a reference.
+
+        If `run_until` is set, :meth:`World.run_until` is used instead of stepping.
+        If `binary_log` is set, it is the binary log class to use,
+        which is then replayed to the text log.
+        """
         text_buf = io.StringIO()
         text_log = textlog.TextLog(text_buf, self.textlog_align, time_precision=16)
 
-        the_world = world.World(*world_args, text_log, **world_kwargs)
-        while the_world.step() <= 400:
-            pass
+        if binary_log is not None:
+            binary_buf = io.BytesIO()
+            the_world = world.World(*world_args, binary_log(binary_buf), **world_kwargs)
+        else:
+            the_world = world.World(*world_args, text_log, **world_kwargs)
+        if run_until:
+            the_world.run_until(400)
+        else:
+            while the_world.step() <= 400:
+                pass
 
         the_world.log_statistics()
 
+        if binary_log is not None:
+            binary_buf.seek(0)
+            binarylog.replay(binary_buf, text_log)
+
         expected = open('tests/' + log, 'r')
         text_buf.seek(0)
         diff = difflib.unified_diff(text_buf.readlines(), expected.readlines(),
@@ -58,6 +145,507 @@ class TestExample(unittest.TestCase):
         self.exec_world('single_timer_scheduling.log', 1, self._get_kernel('singletimer_kernel'),
                         local_timer_scheduling=False)
 
+    def test_localtimer_run_until(self):
+        """Test that :meth:`World.run_until` executes like stepping with local timers."""
+        self.exec_world('local_timer_scheduling.log', 1, self._get_kernel('localtimer_kernel'),
+                        run_until=True, local_timer_scheduling=True)
+
+    def test_singletimer_run_until(self):
+        """Test that :meth:`World.run_until` executes like stepping with a single timer."""
+        self.exec_world('single_timer_scheduling.log', 1, self._get_kernel('singletimer_kernel'),
+                        run_until=True, local_timer_scheduling=False)
+
+    def test_localtimer_binary(self):
+        """Test that the local timer hierarchy replays as expected from a binary log."""
+        self.exec_world('local_timer_scheduling.log', 1, self._get_kernel('localtimer_kernel'),
+                        binary_log=binarylog.BinaryLog, local_timer_scheduling=True)
+
+    def test_localtimer_legacy_binary(self):
+        """Test that the local timer hierarchy replays as expected from a legacy binary log."""
+        self.exec_world('local_timer_scheduling.log', 1, self._get_kernel('localtimer_kernel'),
+                        binary_log=binarylog.LegacyBinaryLog, local_timer_scheduling=True)
+
+    def test_multicore_binary(self):
+        """Test that multiple cores replay as expected from a binary log."""
+        self.exec_world('multi_core_scheduling.log', 2, self._get_kernel('localtimer_kernel'),
+                        binary_log=binarylog.BinaryLog, local_timer_scheduling=True)
+
+    def test_default_log(self):
+        """Test that each world gets its own default log."""
+        first = world.World(1, self._get_kernel('localtimer_kernel'), local_timer_scheduling=True)
+        second = world.World(1, self._get_kernel('localtimer_kernel'), local_timer_scheduling=True)
+        self.assertIsNot(first.log, second.log)
+
+    def test_binary_index(self):
+        """Test that replaying a time window with an index matches replaying everything."""
+        binary_buf = io.BytesIO()
+        index_buf = io.BytesIO()
+        binary_log = binarylog.BinaryLog(binary_buf, index_buf, index_interval=1024)
+        the_world = world.World(2, self._get_kernel('localtimer_kernel'), binary_log,
+                                local_timer_scheduling=True)
+        the_world.run_until(1000)
+        the_world.log_statistics()
+
+        def replay_lines(**kwargs):
+            """Replay the binary log to a text log and return the lines."""
+            text_buf = io.StringIO()
+            binary_buf.seek(0)
+            binarylog.replay(binary_buf, textlog.TextLog(text_buf, time_precision=16), **kwargs)
+            return text_buf.getvalue().splitlines()
+
+        def replay_events(**kwargs):
+            """Replay the binary log to a text log and return the event lines."""
+            return [line for line in replay_lines(**kwargs) if line.startswith('cpu ')]
+
+        def replay_statistics(**kwargs):
+            """Replay the binary log to a text log and return the statistics lines."""
+            return [line for line in replay_lines(**kwargs) if not line.startswith('cpu ')]
+
+        index = binarylog.read_index(io.BytesIO(index_buf.getvalue()))
+        self.assertGreater(len(index.checkpoints), 1)
+
+        start, end = 500, 700
+        expected = [line for line in replay_events()
+                    if start <= float(line.split('@')[1].split(':')[0]) < end]
+        self.assertEqual(replay_events(start=start, end=end), expected)
+        self.assertEqual(replay_events(start=start, end=end, index=index), expected)
+
+        # adjacent windows do not overlap, even at an event exactly on their bound
+        events = replay_events()
+        times = [float(line.split('@')[1].split(':')[0]) for line in events]
+        bound = int(next(time for time in times[len(times) // 2:] if time.is_integer()))
+        self.assertEqual(replay_events(end=bound) + replay_events(start=bound, index=index),
+                         events)
+
+        expected = replay_statistics()
+        self.assertTrue(expected)
+        for kwargs in ({'end': 150}, {'start': 100, 'end': 150}, {'end': end}):
+            with self.subTest(**kwargs):
+                self.assertEqual(replay_statistics(**kwargs), expected)
+                self.assertEqual(replay_statistics(index=index, **kwargs), expected)
+
+        binary_buf.seek(0)
+        expected = binarylog.get_thread_statistics(binary_buf)
+        self.assertEqual(binarylog.get_thread_statistics(binary_buf, index=index), expected)
+
+        binary_buf.seek(0)
+        end_time = binarylog.get_end_time(binary_buf)
+        self.assertGreaterEqual(end_time, 1000)
+        self.assertEqual(binarylog.get_end_time(binary_buf, index=index), end_time)
+
+    def test_localtimer_multicore(self):
+        """Test that the local timer hierarchy executes as expected on multiple cores."""
+        self.exec_world('multi_core_scheduling.log', 2, self._get_kernel('localtimer_kernel'),
+                        local_timer_scheduling=True)
+
+    def test_singletimer_multicore(self):
+        """Test that multiple cores are rejected without local timers."""
+        with self.assertRaises(RuntimeError):
+            text_log = textlog.TextLog(io.StringIO(), time_precision=16)
+            world.World(2, self._get_kernel('singletimer_kernel'), text_log,
+                        local_timer_scheduling=False)
+
+    def test_sweep(self):
+        """Test that a parallel sweep produces the same statistics as a sequential one."""
+        points = sweep.grid(min_period=[20, 30], min_slice=[2, 6])
+        parallel = sweep.sweep(_make_cfs_kernel, points, 400, processes=2,
+                               local_timer_scheduling=True)
+        sequential = sweep.sweep(_make_cfs_kernel, points, 400, processes=1,
+                                 local_timer_scheduling=True)
+        self.assertEqual([result.params for result in parallel], points)
+        self.assertEqual(parallel, sequential)
+
+    def test_addon_attach(self):
+        """Test that attached scheduler-classes are cached and ordered as expected."""
+        penalty_cfs = schedulers.addons.Penalizer.attach('PCFS', schedulers.CFS)
+        self.assertIs(schedulers.addons.Penalizer.attach('PCFS', schedulers.CFS), penalty_cfs)
+        mro = penalty_cfs.__mro__
+        self.assertEqual(mro[1:3], (schedulers.addons.addon.AddonScheduler, schedulers.CFS))
+        self.assertEqual(mro[-3:-1], (schedulers.addons.addon.AddonSchedulerBase,
+                                      schedulers.Single))
+
+    def test_waiting_chains(self):
+        """Test that :class:`WaitingChains` behave like a :obj:`list` of the waiting chains."""
+        class Chain:  # pylint: disable=too-few-public-methods
+            """A chain with a bottom thread with a ready time."""
+
+            def __init__(self, ready_time):
+                """Create a :class:`Chain` becoming ready at `ready_time`."""
+                self.bottom = self
+                self.ready_time = ready_time
+
+        rng = random.Random(0)
+        waiting_chains = schedulers.scheduler.WaitingChains()
+        expected = []
+        for time in range(0, 2000):
+            operation = rng.randrange(6)
+            if operation < 3:
+                chain = Chain(time + rng.randrange(1, 50))
+                if operation == 0:
+                    waiting_chains.append(chain)
+                    expected.append(chain)
+                else:
+                    idx = rng.randrange(len(expected) + 1)
+                    waiting_chains.insert(idx, chain)
+                    expected.insert(idx, chain)
+            elif operation == 3 and expected:
+                idx = rng.choice([-1, rng.randrange(len(expected))])
+                self.assertIs(waiting_chains.pop(idx), expected.pop(idx))
+            elif operation == 4 and expected:
+                idx = rng.randrange(len(expected))
+                self.assertIs(waiting_chains[idx], expected[idx])
+            ready = [chain for chain in expected if chain.ready_time <= time]
+            self.assertEqual(waiting_chains.pop_ready(time), ready)
+            expected = [chain for chain in expected if chain.ready_time > time]
+            self.assertEqual(len(waiting_chains), len(expected))
+            self.assertEqual(list(waiting_chains), expected)
+            next_waiting = waiting_chains.next_waiting()
+            if expected:
+                self.assertEqual(next_waiting.ready_time,
+                                 min(chain.ready_time for chain in expected))
+            else:
+                self.assertIsNone(next_waiting)
+
+    def test_aggregate_statistics(self):
+        """Test that online aggregates agree with the individual times."""
+        def run_world(log=None):
+            """Run the CFS hierarchy and return the world."""
+            the_world = world.World(1, self._get_kernel('cfs'), log, local_timer_scheduling=True)
+            the_world.run_until(400)
+            return the_world
+
+        individual = run_world().get_statistics()[0]['0', 'scheduler']
+        binary_buf = io.BytesIO()
+        try:
+            threads.thread.LOG_INDIVIDUAL = threads.thread.AGGREGATE
+            aggregate_world = run_world(binarylog.BinaryLog(binary_buf))
+        finally:
+            threads.thread.LOG_INDIVIDUAL = True
+        aggregate_world.log_statistics()
+        all_aggregates = aggregate_world.get_statistics()[0]
+        aggregate = all_aggregates['0', 'scheduler']
+
+        self.assertEqual(aggregate['bg']['count'], len(individual['bg']))
+        for tid, stats in individual['children'].items():
+            for key in ('run', 'wait'):
+                sums = [sum(group) for group in stats[key] if group]
+                aggregated = aggregate['children'][tid][key]
+                self.assertEqual(aggregated['count'], len(sums))
+                if sums:
+                    self.assertEqual(aggregated['min'], min(sums))
+                    self.assertEqual(aggregated['max'], max(sums))
+                    self.assertAlmostEqual(aggregated['mean'], float(sum(sums)) / len(sums))
+                    self.assertLessEqual(aggregated['p50'], aggregated['p99'])
+
+        ctxsw = aggregate['ctxsw']
+        self.assertEqual(ctxsw['count'], len(individual['ctxsw']))
+        self.assertEqual(ctxsw['sketch']['zeros']
+                         + sum(ctxsw['sketch']['buckets'].values()), ctxsw['count'])
+
+        text_buf = io.StringIO()
+        textlog.TextLog(text_buf, time_precision=16).thread_statistics(aggregate)
+        text = text_buf.getvalue()
+        self.assertTrue(text.startswith('Thread stats:\n{'))
+        self.assertIn('"count": {}'.format(aggregate['bg']['count']), text)
+        self.assertIn('"p99": {}'.format(aggregate['bg']['p99']), text)
+        self.assertIn('"buckets": {', text)
+
+        binary_buf.seek(0)
+        self.assertEqual(binarylog.get_thread_statistics(binary_buf), all_aggregates)
+
+    def test_localtimer_coroutines(self):
+        """Test that the local timer hierarchy executes as expected without next_request()."""
+        worker_classes = (threads.Thread, threads.PeriodicWorkThread)
+        next_requests = [cls.next_request for cls in worker_classes]
+        try:
+            for cls in worker_classes:
+                cls.next_request = None
+            self.exec_world('local_timer_scheduling.log', 1,
+                            self._get_kernel('localtimer_kernel'), local_timer_scheduling=True)
+        finally:
+            for cls, next_request in zip(worker_classes, next_requests):
+                cls.next_request = next_request
+
+    def test_module_builder_thread_coroutine(self):
+        """Test that :meth:`ModuleBuilderThread.next_request` requests the same as its coroutine."""
+        for local_timer_scheduling in (True, False):
+            with self.subTest(local_timer_scheduling=local_timer_scheduling):
+                logs = []
+                for spawner in (hierarchy_builder.ModuleBuilderThread,
+                                _CoroutineModuleBuilderThread):
+                    text_buf = io.StringIO()
+                    text_log = textlog.TextLog(text_buf, self.textlog_align, time_precision=16)
+                    kernel = _make_spawning_kernel(local_timer_scheduling, spawner)
+                    the_world = world.World(1, kernel, text_log,
+                                            local_timer_scheduling=local_timer_scheduling)
+                    the_world.run_until(150)
+                    the_world.log_statistics()
+                    logs.append(text_buf.getvalue())
+                self.assertIn('spawned', logs[0])
+                self.assertEqual(logs[1], logs[0])
+
+    def test_request_handler_override(self):
+        """Test that a request handler overridden in a subclass is dispatched to."""
+        # pylint: disable=protected-access
+        class Status(cpucore._KernelTimerOnlyStatus):
+            """Status overriding the current-time handler."""
+
+            def _handle_current_time(self, request):
+                """Handle a current-time request."""
+                return False
+
+        self.assertIs(Status._dispatch[cpurequest.Type.current_time],
+                      Status._handle_current_time)
+        self.assertIs(Status._dispatch[cpurequest.Type.timer],
+                      cpucore._KernelTimerOnlyStatus._handle_timer)
+        self.assertIs(cpucore._Status._dispatch[cpurequest.Type.timer],
+                      cpucore._Status._handle_timer)
+
+    def test_localtimer_int_time(self):
+        """Test that the local timer hierarchy executes as expected with integer time."""
+        self.exec_world('local_timer_scheduling.log', 1, self._get_kernel('localtimer_kernel'),
+                        local_timer_scheduling=True, time_backend='int')
+
+    def test_time_backends_penalty_cfs(self):
+        """Test that the time backends produce the same log for fractional time-slices."""
+        diff = time_validation.compare_time_backends(lambda: self._get_kernel('penalty_cfs'), 400,
+                                                     local_timer_scheduling=False)
+        for line in common.color_diff(diff):
+            print(line, end='')
+        self.assertFalse(diff)
+
+    def test_int_time_penalty_tracker(self):
+        """Test that the niceness of the :class:`PenaltyTracker` stays exact with integer time."""
+        kernel = _make_penalty_tracker_kernel()
+        # pylint: disable=protected-access
+        rcu = kernel._scheduler_thread.scheduler._rcu
+        the_world = world.World(1, kernel, textlog.TextLog(io.StringIO(), time_precision=16),
+                                local_timer_scheduling=False, time_backend='int')
+        nicenesses = set()
+        while the_world.step() <= 400:
+            nicenesses.update(rcu.read().niceness.values())
+        self.assertTrue(any(niceness != int(niceness) for niceness in nicenesses))
+        self.assertFalse(any(isinstance(niceness, float) for niceness in nicenesses))
+
+        diff = time_validation.compare_time_backends(_make_penalty_tracker_kernel, 400,
+                                                     local_timer_scheduling=False)
+        for line in common.color_diff(diff):
+            print(line, end='')
+        self.assertFalse(diff)
+
+    def test_fast_mode(self):
+        """Test that the checked and the fast mode produce the same logs."""
+        def get_log(name, local_timer_scheduling, checked):
+            """Run the hierarchy `name` in the checked or fast mode and return its text log."""
+            text_buf = io.StringIO()
+            text_log = textlog.TextLog(text_buf, self.textlog_align, time_precision=16)
+            enabled = checks.ENABLED
+            try:
+                checks.ENABLED = checked
+                the_world = world.World(1, self._get_kernel(name), text_log,
+                                        local_timer_scheduling=local_timer_scheduling)
+                the_world.run_until(400)
+                the_world.log_statistics()
+            finally:
+                checks.ENABLED = enabled
+            return text_buf.getvalue()
+
+        for name, local_timer_scheduling in (('localtimer_kernel', True),
+                                             ('singletimer_kernel', False),
+                                             ('penalty_scheduler', False),
+                                             ('maximizing_scheduler', False),
+                                             ('penalty_cfs', True)):
+            with self.subTest(name=name):
+                self.assertEqual(get_log(name, local_timer_scheduling, True),
+                                 get_log(name, local_timer_scheduling, False))
+
+    def test_profile(self):
+        """Test that profiling records the requests without changing the simulation."""
+        for name, local_timer_scheduling, log in (
+                ('localtimer_kernel', True, 'local_timer_scheduling.log'),
+                ('singletimer_kernel', False, 'single_timer_scheduling.log')):
+            with self.subTest(name=name):
+                text_buf = io.StringIO()
+                text_log = textlog.TextLog(text_buf, self.textlog_align, time_precision=16)
+                the_world = world.World(1, self._get_kernel(name), text_log,
+                                        local_timer_scheduling=local_timer_scheduling,
+                                        profile=True)
+                the_world.run_until(400)
+                the_world.log_statistics()
+
+                events = text_buf.getvalue().split('Thread stats:')[0]
+                with open('tests/' + log, 'r') as expected:
+                    self.assertEqual(events, expected.read().split('Thread stats:')[0])
+
+                profile = the_world.get_profile().to_dict()
+                self.assertEqual(the_world.get_statistics()[1][0]['profile'], profile)
+                self.assertEqual(profile['requests']['execute']['count'],
+                                 events.count(' runs for '))
+                self.assertEqual(profile['timer_interrupts']['count'],
+                                 events.count(' timer elapsed.'))
+                self.assertEqual(sum(timer['count'] for timer in profile['requests'].values()),
+                                 sum(timer['count'] for timer in profile['threads'].values()))
+                self.assertEqual(sum(timer['count'] for timer in profile['modules'].values()),
+                                 sum(timer['count'] for timer in profile['threads'].values()))
+                self.assertEqual(sum(timer['count'] for timer in profile['schedulers'].values()),
+                                 profile['threads']['SchedulerThread']['count'])
+
+        the_world = world.World(1, self._get_kernel('localtimer_kernel'),
+                                local_timer_scheduling=True)
+        self.assertIsNone(the_world.get_profile())
+        self.assertNotIn('profile', the_world.get_statistics()[1][0])
+
+    def test_snapshot(self):
+        """Test that a restored snapshot continues like the original world."""
+        text_buf = io.StringIO()
+        text_log = textlog.TextLog(text_buf, self.textlog_align, time_precision=16)
+        the_world = world.World(1, self._get_kernel('localtimer_kernel'), text_log,
+                                local_timer_scheduling=True)
+        snapshot_time = the_world.run_until(200)
+        before = text_buf.getvalue()
+        snap = the_world.snapshot()
+        # the original world is not affected by the snapshot
+        the_world.run_until(400)
+        the_world.log_statistics()
+        with open('tests/local_timer_scheduling.log', 'r') as expected:
+            expected = expected.read()
+        self.assertEqual(text_buf.getvalue(), expected)
+
+        # a restored world does not write to the log of the snapshot
+        restored = world.World.restore(snap)
+        self.assertIsInstance(restored.log, binarylog.BinaryLog)
+        self.assertEqual(restored.cores[0].status.current_time, snapshot_time)
+
+        with tempfile.TemporaryDirectory() as directory:
+            file_name = os.path.join(directory, 'snapshot')
+            snap.save(file_name)
+            snap = snapshot.Snapshot.load(file_name)
+        branches = snap.restore_all(_continue_world, [(400, self.textlog_align)] * 2, processes=2)
+        self.assertEqual(before + branches[0], expected)
+        self.assertEqual(branches[1], branches[0])
+        with self.assertRaises(ValueError) as context:
+            snap.restore_all(_fail_world, [()], processes=1)
+        self.assertEqual(context.exception.args, (snapshot_time,))
+        self.assertEqual(text_buf.getvalue(), expected)
+
+    def test_snapshot_steps(self):
+        """Test that snapshots taken after any step continue like the original world."""
+        cases = [('penalty scheduler', 1, self._get_kernel('penalty_scheduler'), False),
+                 ('multi-core', 2, self._get_kernel('localtimer_kernel'), True),
+                 ('spawning', 1, _make_spawning_kernel(True), True),
+                 ('spawning single timer', 1, _make_spawning_kernel(False), False)]
+        for name, cores, kernel, local_timer_scheduling in cases:
+            with self.subTest(name=name):
+                text_buf = io.StringIO()
+                text_log = textlog.TextLog(text_buf, self.textlog_align, time_precision=16)
+                the_world = world.World(cores, kernel, text_log,
+                                        local_timer_scheduling=local_timer_scheduling)
+                snapshots = [(0, the_world.snapshot())]
+                while the_world.step() <= 150:
+                    snapshots.append((len(text_buf.getvalue()), the_world.snapshot()))
+                the_world.log_statistics()
+                expected = text_buf.getvalue()
+
+                for offset, snap in snapshots:
+                    restored_buf = io.StringIO()
+                    restored = world.World.restore(
+                        snap, textlog.TextLog(restored_buf, self.textlog_align,
+                                              time_precision=16))
+                    while restored.step() <= 150:
+                        pass
+                    restored.log_statistics()
+                    self.assertEqual(restored_buf.getvalue(), expected[offset:])
+
+    def test_snapshot_coroutine(self):
+        """Test that threads using their coroutine cannot be saved once they ran."""
+        for local_timer_scheduling in (True, False):
+            with self.subTest(local_timer_scheduling=local_timer_scheduling):
+                for spawner in (hierarchy_builder.ModuleBuilderThread,
+                                _CoroutineModuleBuilderThread):
+                    kernel = _make_spawning_kernel(local_timer_scheduling, spawner)
+                    text_log = textlog.TextLog(io.StringIO(), time_precision=16)
+                    the_world = world.World(1, kernel, text_log,
+                                            local_timer_scheduling=local_timer_scheduling)
+                    refused = 0
+                    while the_world.step() <= 150:
+                        try:
+                            the_world.snapshot()
+                        except RuntimeError:
+                            refused += 1
+                    self.assertEqual(refused > 0, spawner is _CoroutineModuleBuilderThread)
+
+    def test_checkpoint(self):
+        """Test that a run resumed from a checkpoint writes the same log as an uninterrupted one."""
+        log_buf = io.BytesIO()
+        the_world = world.World(1, _make_cfs_kernel(), binarylog.BinaryLog(log_buf),
+                                local_timer_scheduling=True)
+        the_world.run_until(400)
+        the_world.log_statistics()
+        expected = log_buf.getvalue()
+
+        class Crash(Exception):
+            """The simulated death of the process."""
+            pass
+
+        saved = []
+
+        def crashing_save(file_name, data):
+            """Save the checkpoint, then crash at the third one."""
+            save(file_name, data)
+            saved.append(data['time'])
+            if len(saved) == 3:
+                raise Crash()
+
+        save = checkpoint.save
+        with tempfile.TemporaryDirectory() as directory:
+            log_name = os.path.join(directory, 'log')
+            checkpoint_name = os.path.join(directory, 'checkpoint')
+            index_name = os.path.join(directory, 'index')
+            checkpoint.run(_make_cfs_kernel, 400, log_name, checkpoint_name, interval=50,
+                           index_file_name=index_name, local_timer_scheduling=True)
+            self.assertFalse(os.path.exists(checkpoint_name))
+            with open(log_name, 'rb') as log_file:
+                self.assertEqual(log_file.read(), expected)
+            with open(index_name, 'rb') as index_file:
+                expected_index = index_file.read()
+
+            checkpoint.save = crashing_save
+            try:
+                with self.assertRaises(Crash):
+                    checkpoint.run(_make_cfs_kernel, 400, log_name, checkpoint_name, interval=50,
+                                   index_file_name=index_name, local_timer_scheduling=True)
+            finally:
+                checkpoint.save = save
+            data = checkpoint.load(checkpoint_name)
+            self.assertEqual(data['time'], saved[-1])
+            self.assertGreater(data['time'], 150)
+            self.assertEqual(data['world'].cores[0].status.current_time, data['time'])
+            # the log written after the checkpoint is discarded
+            with open(log_name, 'ab') as log_file:
+                log_file.write(b'partial')
+            # the kernel is restored from the checkpoint, not created again
+            checkpoint.run(None, 400, log_name, checkpoint_name, interval=50,
+                           index_file_name=index_name, local_timer_scheduling=True)
+            with open(log_name, 'rb') as log_file:
+                self.assertEqual(log_file.read(), expected)
+            with open(index_name, 'rb') as index_file:
+                self.assertEqual(index_file.read(), expected_index)
+
+            # resuming from another format is refused
+            checkpoint.save(checkpoint_name, {'version': 1, 'time': 150})
+            with self.assertRaises(RuntimeError):
+                checkpoint.run(_make_cfs_kernel, 400, log_name, checkpoint_name, interval=50,
+                               index_file_name=index_name, local_timer_scheduling=True)
+
+    def test_benchmark_suite(self):
+        """Test that the benchmark workloads run with every scheduler."""
+        workload = suite.scaled(suite.WORKLOADS['flat'], 0.02)._replace(until=1000)
+        for scheduler_name in suite.SCHEDULERS:
+            with self.subTest(scheduler=scheduler_name):
+                result = suite.run_case(scheduler_name, workload, 1)
+                self.assertGreater(result.events, 0)
+                self.assertIsNone(result.error)
+
     def test_penalty_scheduler(self):
         """Test that the penalty scheduler executes as expected."""
         self.exec_world('penalty_scheduling.log', 1, self._get_kernel('penalty_scheduler'),
@@ -73,6 +661,11 @@ class TestExample(unittest.TestCase):
         self.exec_world('cfs_scheduling.log', 1, self._get_kernel('cfs'),
                         local_timer_scheduling=True)
 
+    def test_cfs_modules(self):
+        """Test that CFS executes as expected in many modules."""
+        kernel = suite.make_kernel('CFS', suite.scaled(suite.WORKLOADS['wide'], 0.3))
+        self.exec_world('cfs_modules_scheduling.log', 1, kernel, local_timer_scheduling=True)
+
     def test_localtimer_penalty_cfs(self):
         """Test that the penalty CFS executes as expected with local timers."""
         self.exec_world('penalty_cfs_local_timer_scheduling.log', 1,